@@ -0,0 +1,148 @@
+"""Micro-benchmarks of the physics and prediction hot paths, run with `python -m swingbye.benchmarks`.
+
+Each benchmark is a setup function registered with `@benchmark`, returning the function to time. Setups use fixed seeds,
+so that runs (and machines) time the same work. Timings are reported per call, in seconds."""
+
+import fnmatch
+import json
+import platform
+import statistics
+import sys
+from datetime import datetime, timezone
+from time import perf_counter
+
+SEED = 1234
+
+_benchmarks = {}  # name -> Benchmark
+
+
+class Skip(Exception):
+	"""Raised by a setup when the benchmark cannot run here (e.g. it needs a display)"""
+
+
+class Benchmark:
+	def __init__(self, name: str, setup, calls: int = 1):
+		self.name = name
+		self.setup = setup
+		self.calls = calls  # calls of the timed operation made by each run of the timed function
+
+
+def benchmark(name: str, calls: int = 1):
+	"""Registers `setup` as the benchmark `name`. `setup()` prepares the state and returns the function to time, which
+	performs `calls` calls of the benchmarked operation"""
+
+	def decorator(setup):
+		if name in _benchmarks:
+			raise ValueError(f'benchmark `{name}` is already registered')
+		_benchmarks[name] = Benchmark(name, setup, calls)
+		return setup
+
+	return decorator
+
+
+def benchmarks(patterns=None) -> list:
+	"""Registered benchmarks whose name matches any of the glob `patterns` (all if None), in registration order"""
+	from swingbye.benchmarks import cases  # registers the benchmarks
+
+	return [bench for name, bench in _benchmarks.items() if not patterns or any(fnmatch.fnmatch(name, pattern) for pattern in patterns)]
+
+
+def _calibrate(func, min_time: float) -> int:
+	"""Number of runs of `func` per sample so that a sample lasts at least `min_time`, like `timeit.Timer.autorange`"""
+	number = 1
+	while True:
+		start = perf_counter()
+		for _ in range(number):
+			func()
+		if perf_counter() - start >= min_time:
+			return number
+		number *= 2
+
+
+def run(bench: Benchmark, repeat: int = 20, warmup: int = 3, min_time: float = 2e-3) -> dict:
+	"""Times `bench` over `repeat` samples after `warmup` discarded ones, returns the statistics per call"""
+	func = bench.setup()
+	number = _calibrate(func, min_time)
+
+	samples = []
+	for i in range(warmup + repeat):
+		start = perf_counter()
+		for _ in range(number):
+			func()
+		elapsed = perf_counter() - start
+		if i >= warmup:
+			samples.append(elapsed / (number * bench.calls))
+
+	samples.sort()
+	return {
+		'min': samples[0],
+		'median': statistics.median(samples),
+		'mean': statistics.fmean(samples),
+		'stdev': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+		'p95': samples[min(len(samples) - 1, round(0.95 * (len(samples) - 1)))],
+		'max': samples[-1],
+		'repeat': repeat,
+		'number': number * bench.calls,
+	}
+
+
+def run_all(benches: list, repeat: int = 20, warmup: int = 3, min_time: float = 2e-3, log=print) -> dict:
+	"""Runs `benches`, returns the results as a JSON-serializable dict. Skipped benchmarks are listed with the reason"""
+	results = {}
+	skipped = {}
+	for bench in benches:
+		try:
+			results[bench.name] = run(bench, repeat, warmup, min_time)
+		except Skip as skip:
+			skipped[bench.name] = str(skip)
+			log(f'{bench.name:48s} skipped : {skip}')
+			continue
+		stats = results[bench.name]
+		log(f'{bench.name:48s} median {format_time(stats["median"])}  p95 {format_time(stats["p95"])}  stdev {format_time(stats["stdev"])}')
+
+	return {
+		'meta': {
+			'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+			'python': sys.version.split()[0],
+			'platform': platform.platform(),
+			'machine': platform.machine(),
+			'seed': SEED,
+			'repeat': repeat,
+			'warmup': warmup,
+		},
+		'results': results,
+		'skipped': skipped,
+	}
+
+
+def compare(results: dict, baseline: dict, tolerance: float = 0.25, statistic: str = 'min') -> list:
+	"""Compares the timings of `results` to the ones of `baseline`, returns the (name, baseline, current, ratio,
+	regressed) rows of the benchmarks present in both. A benchmark regressed if it is slower by more than `tolerance`.
+	The minimum is compared by default, being the least sensitive to the noise of other processes"""
+	rows = []
+	for name, stats in results['results'].items():
+		if name not in baseline['results']:
+			continue
+		before = baseline['results'][name][statistic]
+		after = stats[statistic]
+		ratio = after / before if before > 0 else float('inf')
+		rows.append((name, before, after, ratio, ratio > 1 + tolerance))
+	return rows
+
+
+def save(results: dict, path: str):
+	with open(path, 'w') as file:
+		json.dump(results, file, indent='\t')
+		file.write('\n')
+
+
+def load(path: str) -> dict:
+	with open(path) as file:
+		return json.load(file)
+
+
+def format_time(seconds: float) -> str:
+	for unit, scale in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+		if seconds >= scale:
+			return f'{seconds/scale:7.2f} {unit:2s}'
+	return f'{seconds/1e-9:7.2f} ns'
@@ -0,0 +1,57 @@
+import argparse
+import logging
+import os
+import sys
+from swingbye.benchmarks import benchmarks, run_all, compare, save, load, format_time
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+
+def main(argv=None) -> int:
+	parser = argparse.ArgumentParser(prog='python -m swingbye.benchmarks', description='Micro-benchmarks of the physics and prediction hot paths')
+	parser.add_argument('-k', dest='patterns', action='append', metavar='PATTERN', help='only run the benchmarks matching this glob pattern, can be repeated')
+	parser.add_argument('--list', action='store_true', help='list the benchmarks and exit')
+	parser.add_argument('--repeat', type=int, default=20, help='timed samples per benchmark (default: %(default)s)')
+	parser.add_argument('--warmup', type=int, default=3, help='discarded samples before timing (default: %(default)s)')
+	parser.add_argument('--min-time', type=float, default=2e-3, help='minimum duration of a sample in seconds (default: %(default)s)')
+	parser.add_argument('--output', '-o', metavar='FILE', help='save the results as JSON')
+	parser.add_argument('--baseline', '-b', metavar='FILE', nargs='?', const=BASELINE_PATH, help='compare the results to a JSON baseline (the stored one if no FILE is given), exit with 1 on regressions')
+	parser.add_argument('--tolerance', type=float, default=0.25, help='slowdown relative to the baseline counted as a regression (default: %(default)s)')
+	parser.add_argument('--statistic', choices=['min', 'median', 'mean', 'p95'], default='min', help='timing compared to the baseline (default: %(default)s)')
+	args = parser.parse_args(argv)
+
+	# time the work, not the logging
+	logging.getLogger('swingbye').setLevel(logging.ERROR)
+
+	if args.baseline and not os.path.exists(args.baseline):
+		parser.error(f'no baseline at {args.baseline}, record one on the reference machine with `-o {args.baseline}`')
+
+	benches = benchmarks(args.patterns)
+	if args.list:
+		for bench in benches:
+			print(bench.name)
+		return 0
+	if not benches:
+		parser.error('no benchmark matches the given patterns')
+
+	results = run_all(benches, repeat=args.repeat, warmup=args.warmup, min_time=args.min_time)
+
+	if args.output:
+		save(results, args.output)
+		print(f'results saved to {args.output}')
+
+	if args.baseline:
+		rows = compare(results, load(args.baseline), args.tolerance, args.statistic)
+		print(f'\n{args.statistic} compared to {args.baseline} (regression above +{args.tolerance:.0%})')
+		for name, before, after, ratio, regressed in rows:
+			print(f'{name:48s} {format_time(before)} -> {format_time(after)}  {ratio - 1:+7.1%}{"  REGRESSION" if regressed else ""}')
+		regressions = [row for row in rows if row[4]]
+		if regressions:
+			print(f'{len(regressions)} regression(s)')
+			return 1
+
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -0,0 +1,159 @@
+import json
+import os
+import numpy as np
+from swingbye.benchmarks import benchmark, Skip, SEED
+from swingbye.cphysics import World, Planet, Entity, vec2
+
+LEVEL_PATH = os.path.join(os.path.dirname(__file__), '..', 'levels', 'level1.json')
+
+ORBITS = {
+	'circular': dict(maxis=200.0, ecc=0.0),
+	'eccentric': dict(maxis=200.0, ecc=0.9),
+	'hyperbolic': dict(maxis=-200.0, ecc=1.5),
+}
+
+
+def _needs_display():
+	import pyglet
+	try:
+		pyglet.canvas.get_display()
+	except Exception as e:
+		raise Skip(f'needs a display ({type(e).__name__})')
+
+
+def _chain(orbit: str, depth: int) -> Planet:
+	"""Planet on an `orbit` at the end of a chain of `depth` planets, the others on circular orbits"""
+	parent = Planet(mass=1e4)
+	for level in range(1, depth):
+		planet = Planet(mass=1e4 / 10**level, maxis=5000.0 / 4**level, parg=0.3*level)
+		planet.set_parent(parent)
+		parent = planet
+	leaf = Planet(mass=1.0, **ORBITS[orbit])
+	leaf.set_parent(parent)  # the parents are kept alive by their children
+	return leaf
+
+
+def _world(n: int, seed: int = SEED) -> World:
+	"""A sun with `n` planets on random orbits, some with moons"""
+	rng = np.random.default_rng(seed)
+	world = World()
+	world.add_planet(mass=1000.0)
+	for i in range(n):
+		world.add_planet(mass=rng.uniform(0.1, 10.0), maxis=rng.uniform(200, 5000), ecc=rng.uniform(0, 0.7), parg=rng.uniform(0, 2*np.pi), time0=rng.uniform(0, 1000))
+		parent = world.planets[0] if i < 2 or rng.uniform() < 0.7 else world.planets[int(rng.integers(1, i+1))]
+		world.planets[-1].set_parent(parent)
+	world.time = 0.0
+	return world
+
+
+# Planet.pos_at
+
+def _register_pos_at(orbit: str, depth: int):
+	times = np.random.default_rng(SEED).uniform(0, 1e4, 256)
+
+	@benchmark(f'pos_at/{orbit}/depth{depth}', calls=len(times))
+	def setup():
+		pos_at = _chain(orbit, depth).pos_at
+		def func():
+			for t in times:
+				pos_at(t)
+		return func
+
+for orbit in ORBITS:
+	for depth in [1, 3, 6]:
+		_register_pos_at(orbit, depth)
+
+
+# World.forces_on and World.step
+
+def _register_forces_on(n: int):
+	@benchmark(f'forces_on/{n}planets')
+	def setup():
+		world = _world(n)
+		entity = Entity(pos=vec2(1000.0, 500.0), vel=vec2(0.0, 1.0), mass=1.0)
+		World.forces_on(entity, world, 0.0)  # the ephemeris is cached, this times the force sum
+		return lambda: World.forces_on(entity, world, 0.0)
+
+def _register_step(n: int):
+	@benchmark(f'step/{n}planets')
+	def setup():
+		world = _world(n)
+		world.add_entity(pos=vec2(1000.0, 500.0), vel=vec2(0.0, 1.0), mass=1.0)
+		return lambda: world.step(5.0)
+
+for n in [10, 100, 1000]:
+	_register_forces_on(n)
+	_register_step(n)
+
+
+# World.get_predictions
+
+def _register_get_predictions(samples: int):
+	@benchmark(f'get_predictions/{samples}samples')
+	def setup():
+		world = _world(20)
+		entity = Entity(pos=vec2(1000.0, 500.0), vel=vec2(0.0, 1.0), mass=1.0)
+		out = np.empty((samples, 2))
+		def func():
+			world.invalidate_ephemeris()  # as if the planets were edited, no ephemeris reuse between runs
+			world.get_predictions(entity, 0.0, 5.0*(samples-1), samples, out=out)
+		return func
+
+for samples in [100, 500, 2000]:
+	_register_get_predictions(samples)
+
+
+# Levels
+
+@benchmark('update_planets_prediction/level1')
+def setup():
+	from swingbye.levels.loader import load_level_file
+	world = load_level_file(LEVEL_PATH)
+	world.autoupdate_predictions = False
+	return world.update_planets_prediction
+
+@benchmark('load_level/level1')
+def setup():
+	from swingbye.levels.loader import load_level
+	with open(LEVEL_PATH) as file:
+		level = json.load(file)
+	return lambda: load_level(json.loads(json.dumps(level)))
+
+@benchmark('parse_level/level1')
+def setup():
+	_needs_display()
+	import pyglet
+	from swingbye.levels.parser import parse_level
+	with open(LEVEL_PATH) as file:
+		level = json.load(file)
+	batch = pyglet.graphics.Batch()
+	group = pyglet.graphics.OrderedGroup(0)
+
+	def func():
+		world = parse_level(json.loads(json.dumps(level)), batch, group)
+		for body in world.planets + world.entities:
+			body.delete()
+	return func
+
+
+# HUD
+
+@benchmark('LineGraph.update_data/3lines')
+def setup():
+	_needs_display()
+	import pyglet
+	from vecrec import Rect
+	from swingbye.pygletengine.components.graph import LineGraph
+
+	rng = np.random.default_rng(SEED)
+
+	class Graph(LineGraph):
+		rect = Rect.from_size(100, 100)  # laid out without a window
+
+	lines = [{'name': name, 'path': None, 'query': lambda: rng.uniform(-1, 1), 'color': (255, 255, 255, 255), 'samples': [], 'size': 100} for name in ['KE', 'PE', 'TOTAL']]
+	graph = Graph(100, 100, lines=lines)
+	graph.load()
+	graph.pause_sampling()
+	for _ in range(100):
+		graph.update_data(0)
+	return lambda: graph.update_data(0)
@@ -0,0 +1,150 @@
+#ifndef __BARNESHUT_HPP__
+#define __BARNESHUT_HPP__
+
+#include "vec2.hpp"
+#include "globals.h"
+#include <algorithm>
+#include <numeric>
+#include <vector>
+
+// Quadtree of attractors, approximating the distant groups by their monopoles (Barnes & Hut)
+class QuadTree {
+	struct Node {
+		vec2 center;
+		double half = 0.0;
+		std::size_t count = 0;
+		double mass = 0.0;
+		vec2 com;       // center of mass
+		vec2 centroid;  // unweighted, for the part of the force proportional to the entity mass
+		int children[4] = {-1, -1, -1, -1};
+		std::size_t begin = 0, end = 0;  // range of `order`, for leaves
+	};
+
+	std::vector<Node> nodes;
+	std::vector<std::size_t> order;
+	std::vector<vec2> pos;
+	std::vector<double> mass;
+
+	// Same force law as World::forces_on, for an attractor of mass `m` at relative position `r`
+	static vec2 attraction(vec2 const& r, double m) {
+		double d = r.length();
+		vec2 n = r/d;
+		double doff = d + GRAVITY_SINGULARITY_OFFSET;
+		return n * GRAVITY_CST * m / (doff*doff);
+	}
+
+	int build(std::size_t begin, std::size_t end, vec2 const& center, double half, unsigned int depth) {
+		int index = static_cast<int>(nodes.size());
+		nodes.emplace_back();
+		Node node;
+		node.center = center;
+		node.half = half;
+		node.count = end - begin;
+		node.begin = begin;
+		node.end = end;
+
+		for (std::size_t k = begin; k < end; ++k) {
+			std::size_t i = order[k];
+			node.mass += mass[i];
+			node.com += pos[i] * mass[i];
+			node.centroid += pos[i];
+		}
+		node.centroid /= static_cast<double>(node.count);
+		node.com = node.mass > 0 ? node.com / node.mass : node.centroid;
+
+		if (node.count > 1 && depth < 32) {
+			// Split the range in quadrants : x below the center first, then y below the center within each half
+			auto first = order.begin() + begin;
+			auto last = order.begin() + end;
+			auto mid_x = std::partition(first, last, [&](std::size_t i) { return pos[i].x < center.x; });
+			auto mid_y0 = std::partition(first, mid_x, [&](std::size_t i) { return pos[i].y < center.y; });
+			auto mid_y1 = std::partition(mid_x, last, [&](std::size_t i) { return pos[i].y < center.y; });
+			std::size_t bounds[5] = {
+				begin,
+				static_cast<std::size_t>(mid_y0 - order.begin()),
+				static_cast<std::size_t>(mid_x - order.begin()),
+				static_cast<std::size_t>(mid_y1 - order.begin()),
+				end
+			};
+			double q = half / 2;
+			vec2 centers[4] = {center + vec2(-q, -q), center + vec2(-q, q), center + vec2(q, -q), center + vec2(q, q)};
+			for (int c = 0; c < 4; ++c) {
+				if (bounds[c+1] > bounds[c]) {
+					node.children[c] = build(bounds[c], bounds[c+1], centers[c], q, depth + 1);
+				}
+			}
+		}
+
+		nodes[index] = node;
+		return index;
+	}
+
+public:
+	QuadTree(std::vector<vec2> const& pos_, std::vector<double> const& mass_) : pos(pos_), mass(mass_) {
+		if (pos.empty()) {
+			return;
+		}
+		order.resize(pos.size());
+		std::iota(order.begin(), order.end(), 0);
+
+		vec2 lower = pos[0], upper = pos[0];
+		for (vec2 const& p : pos) {
+			lower.x = std::min(lower.x, p.x);
+			lower.y = std::min(lower.y, p.y);
+			upper.x = std::max(upper.x, p.x);
+			upper.y = std::max(upper.y, p.y);
+		}
+		double half = std::max(upper.x - lower.x, upper.y - lower.y) / 2 + 1e-9;
+		nodes.reserve(2*pos.size());
+		build(0, pos.size(), (lower + upper) / 2, half, 0);
+	}
+
+	// Force on an entity of mass `entity_mass` at `at`. Groups seen under an angle (size over distance) below
+	// `theta` are approximated by their monopoles, theta = 0 gives back the direct sum
+	vec2 force(vec2 const& at, double entity_mass, double theta) const {
+		vec2 f;
+		if (nodes.empty()) {
+			return f;
+		}
+
+		int stack[32*4 + 4];
+		int top = 0;
+		stack[top++] = 0;
+
+		while (top > 0) {
+			Node const& node = nodes[stack[--top]];
+			bool leaf = node.children[0] < 0 && node.children[1] < 0 && node.children[2] < 0 && node.children[3] < 0;
+
+			if (leaf) {
+				for (std::size_t k = node.begin; k < node.end; ++k) {
+					std::size_t i = order[k];
+					f += attraction(pos[i] - at, entity_mass + mass[i]);
+				}
+				continue;
+			}
+
+			// Opened unless far enough, also accounting for how far off-center the mass is (offset criterion)
+			double offset = std::max((node.com - node.center).length(), (node.centroid - node.center).length());
+			double d = std::min((node.com - at).length(), (node.centroid - at).length());
+			if (2*node.half + theta*offset < theta*d) {
+				f += attraction(node.centroid - at, entity_mass * node.count);
+				if (node.mass > 0) {
+					f += attraction(node.com - at, node.mass);
+				}
+				continue;
+			}
+
+			for (int c = 0; c < 4; ++c) {
+				if (node.children[c] >= 0) {
+					stack[top++] = node.children[c];
+				}
+			}
+		}
+
+		return f;
+	}
+
+	std::size_t size() const { return nodes.size(); }
+};
+
+#endif
@@ -0,0 +1,54 @@
+#ifndef __COLLISIONS_HPP__
+#define __COLLISIONS_HPP__
+
+#include "vec2.hpp"
+#include <cmath>
+
+// Collision tests between points, disks and axis-aligned rectangles (given by their lower corner and dimensions)
+namespace Collisions {
+	bool disk_disk(vec2 const& pos1, double radius1, vec2 const& pos2, double radius2) {
+		return (pos1 - pos2).length() <= radius1 + radius2;
+	}
+
+	bool disk_point(vec2 const& pos, double radius, vec2 const& point) {
+		return (pos - point).length() <= radius;
+	}
+
+	bool rect_point(vec2 const& pos, vec2 const& dims, vec2 const& point) {
+		return pos.x <= point.x && point.x <= pos.x + dims.x && pos.y <= point.y && point.y <= pos.y + dims.y;
+	}
+
+	// Two disks move linearly over a step, from `from1` to `to1` and from `from2` to `to2`.
+	// Returns the fraction of the step in [0, 1] at which they first touch, or -1 if they don't
+	double time_of_impact(vec2 const& from1, vec2 const& to1, double radius1, vec2 const& from2, vec2 const& to2, double radius2) {
+		// Relative motion d(s) = d0 + s*v, solve |d(s)| = r for the smallest s
+		vec2 d0 = from1 - from2;
+		vec2 v = (to1 - from1) - (to2 - from2);
+		double r = radius1 + radius2;
+
+		double c = d0.x*d0.x + d0.y*d0.y - r*r;
+		double a = v.x*v.x + v.y*v.y;
+		double b = d0.x*v.x + d0.y*v.y;
+
+		// Already touching : an impact unless they are moving apart and no longer touch at the end of the step
+		// (e.g. a ship launched from the surface of a planet)
+		if (c <= 0) {
+			bool apart = b >= 0 && a + 2*b + c > 0;  // |d(1)|^2 - r^2
+			return apart ? -1.0 : 0.0;
+		}
+
+		// Not moving closer, or missing each other
+		if (b >= 0 || a == 0) {
+			return -1.0;
+		}
+		double discriminant = b*b - a*c;
+		if (discriminant < 0) {
+			return -1.0;
+		}
+
+		double s = c / (-b + std::sqrt(discriminant));  // smallest root, computed without cancellation
+		return s <= 1.0 ? s : -1.0;
+	}
+}
+
+#endif
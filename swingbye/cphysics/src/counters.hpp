@@ -0,0 +1,42 @@
+#ifndef __COUNTERS_HPP__
+#define __COUNTERS_HPP__
+
+#include "kepler.hpp"
+#include <atomic>
+
+// Work done by a world, cheap enough to stay on : relaxed atomic additions, made once per batch of work where possible.
+// Read concurrently with the predictions, so the values of a snapshot may be a few operations apart
+struct WorldCounters {
+	std::atomic<unsigned long> kepler_solves{0};
+	std::atomic<unsigned long> kepler_iterations{0};
+	std::atomic<unsigned long> kepler_max_iterations{0};
+	std::atomic<unsigned long> kepler_nonconverged{0};
+	std::atomic<unsigned long> forces_on{0};           // force evaluations, one per integrator stage
+	std::atomic<unsigned long> pos_at_cpp{0};          // planet positions computed in c++
+	std::atomic<unsigned long> pos_at_python{0};       // planet positions asked to custom orbits (python overrides)
+	std::atomic<unsigned long> steps{0};               // entity steps of World.step
+	std::atomic<unsigned long> prediction_samples{0};  // positions written by the predictions
+
+	static void add(std::atomic<unsigned long>& counter, unsigned long value) {
+		counter.fetch_add(value, std::memory_order_relaxed);
+	}
+
+	void add_kepler(Kepler::Stats const& stats) {
+		if (stats.solves == 0) {
+			return;
+		}
+		add(kepler_solves, stats.solves);
+		add(kepler_iterations, stats.iterations);
+		add(kepler_nonconverged, stats.nonconverged);
+		unsigned long max = kepler_max_iterations.load(std::memory_order_relaxed);
+		while (stats.max_iterations > max && !kepler_max_iterations.compare_exchange_weak(max, stats.max_iterations, std::memory_order_relaxed)) {}
+	}
+
+	void reset() {
+		for (std::atomic<unsigned long>* counter : {&kepler_solves, &kepler_iterations, &kepler_max_iterations, &kepler_nonconverged, &forces_on, &pos_at_cpp, &pos_at_python, &steps, &prediction_samples}) {
+			counter->store(0, std::memory_order_relaxed);
+		}
+	}
+};
+
+#endif
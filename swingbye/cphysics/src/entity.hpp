@@ -2,19 +2,36 @@
 #define __ENTITY_HPP__
 
 #include "vec2.hpp"
+#include <atomic>
+#include <cstddef>
 #include <string>
 
+class World;
+
 class Entity {
 public:
 	// Public in c++, but we don't expose them in python
 	vec2 pos, vel;
 	double mass = 1.0;
+	// Radius of the collision disk, 0 for a point
+	double radius = 0.0;
+
+	// Force at the end of the last Verlet step, which is the force at the start of the next one (see Integrator::Verlet)
+	struct ForceCache {
+		World const* world = nullptr;  // nullptr when empty
+		vec2 (*force_func)(Entity const&, World const&, double) = nullptr;
+		unsigned long version = 0;  // Integrator::forces_version of the world
+		double time = 0.0;
+		vec2 pos;
+		double mass = 0.0;
+		vec2 force;
+	} force_cache;
 
 	Entity() = default;
 	Entity(vec2 const& pos_, vec2 const& vel_, double mass_)
 		: pos(pos_), vel(vel_), mass(mass_) {}
 	Entity(double mass_) : mass(mass_) {}
-	Entity(Entity const& e) : pos(e.pos), vel(e.vel), mass(e.mass) {}
+	Entity(Entity const& e) : pos(e.pos), vel(e.vel), mass(e.mass), radius(e.radius), force_cache(e.force_cache) {}
 	virtual ~Entity() = default;
 
 	vec2 const& get_pos() const { return pos; }
@@ -23,17 +40,28 @@ public:
 	void set_pos(vec2 const& pos_) { pos = pos_; }
 	void set_vel(vec2 const& vel_) { vel = vel_; }
 	void set_mass(double const& mass_) { mass = mass_; }
+	// Incremented whenever a radius changes, so that the spatial indices know when to rebuild
+	static std::atomic<unsigned long> radius_epoch;
+	double get_radius() const { return radius; }
+	void set_radius(double radius_) { radius = radius_; radius_epoch += 1; }
 
 	virtual std::string str() const {
 		return "Entity(pos=" + pos.str() + ", vel=" + vel.str() + ", mass=" + std::to_string(mass) + ")";
 	}
 };
 
+std::atomic<unsigned long> Entity::radius_epoch{0};
+
 class ExplicitEntity : public Entity {
 protected:
 	double time = 0.0;
 
 public:
+	// Set when pos_at or vel_at is overridden (e.g. by a python subclass), so the motion can only be known by calling it
+	bool custom_orbit = false;
+	// Set once the overrides have been looked up (when added to a world), so that the trampolines can skip the lookup
+	bool orbit_checked = false;
+
 	ExplicitEntity() = default;
 	ExplicitEntity(double mass_) : Entity(mass_) {}
 	virtual ~ExplicitEntity() = default;
@@ -45,12 +73,26 @@ public:
 		vel = this->vel_at(time);
 	}
 
+	// Sets the time along with the already known state at that time, sparing its computation
+	void set_state(double time_, vec2 const& pos_, vec2 const& vel_) {
+		time = time_;
+		pos = pos_;
+		vel = vel_;
+	}
+
 	void set_pos(vec2 const& pos_) = delete;
 	void set_vel(vec2 const& vel_) = delete;
 	void set_mass(double const& mass_) = delete;
 
 	virtual vec2 pos_at(double time) const = 0;
 	virtual vec2 vel_at(double time) const = 0;
+
+	// Batched version of pos_at, fills `out` with the positions at each of the `n` `times`
+	virtual void pos_at_many(double const* times, vec2* out, std::size_t n) const {
+		for (std::size_t i = 0; i < n; ++i) {
+			out[i] = this->pos_at(times[i]);
+		}
+	}
 };
 
 #endif
@@ -0,0 +1,200 @@
+#ifndef __EPHEMERIS_HPP__
+#define __EPHEMERIS_HPP__
+
+#include "vec2.hpp"
+#include "globals.h"
+#include "barneshut.hpp"
+#include <array>
+#include <cmath>
+#include <cstddef>
+#include <algorithm>
+#include <deque>
+#include <memory>
+#include <mutex>
+#include <unordered_map>
+#include <vector>
+
+// Positions (and velocities, once requested) of all the planets of a world at a given time
+struct Ephemeris {
+	std::vector<vec2> pos;
+	std::vector<vec2> vel;  // empty until requested
+	std::vector<double> mass;  // masses of the planets when the positions were computed
+
+	// Quadtree of the positions for the Barnes-Hut forces, built by the first evaluation that needs it
+	mutable std::once_flag tree_once;
+	mutable std::unique_ptr<QuadTree> tree;
+};
+
+// Bounded time -> Ephemeris cache, evicting the oldest entries first. Safe to share between threads
+class EphemerisCache {
+	mutable std::mutex mutex;
+	std::size_t capacity = 2048;
+	unsigned long epoch = 0;
+	unsigned long generation = 0;  // incremented by `clear`
+	std::unordered_map<double, std::shared_ptr<Ephemeris const>> entries;
+	std::deque<double> order;
+
+public:
+	unsigned long hits = 0;
+	unsigned long misses = 0;
+
+	std::shared_ptr<Ephemeris const> find(double time) {
+		std::lock_guard<std::mutex> lock(mutex);
+		auto it = entries.find(time);
+		if (it == entries.end()) {
+			misses += 1;
+			return nullptr;
+		}
+		hits += 1;
+		return it->second;
+	}
+
+	// Stores `entry`, replacing the one at `time` if any. Entries computed for another `entry_epoch` than the one of
+	// the cache, or before a `clear` (`entry_generation`), are outdated and dropped
+	void insert(double time, std::shared_ptr<Ephemeris const> const& entry, unsigned long entry_epoch, unsigned long entry_generation) {
+		std::lock_guard<std::mutex> lock(mutex);
+		// NaN never compares equal, so it could never be found nor evicted
+		if (capacity == 0 || time != time || entry_epoch != epoch || entry_generation != generation) {
+			return;
+		}
+		auto it = entries.find(time);
+		if (it != entries.end()) {
+			it->second = entry;
+			return;
+		}
+		while (entries.size() >= capacity) {
+			entries.erase(order.front());
+			order.pop_front();
+		}
+		entries.emplace(time, entry);
+		order.push_back(time);
+	}
+
+	void clear() {
+		std::lock_guard<std::mutex> lock(mutex);
+		entries.clear();
+		order.clear();
+		generation += 1;
+	}
+
+	unsigned long get_generation() const {
+		std::lock_guard<std::mutex> lock(mutex);
+		return generation;
+	}
+
+	// Drops all the entries if they were computed for another version of the orbital elements, returns whether it did
+	bool sync(unsigned long new_epoch) {
+		std::lock_guard<std::mutex> lock(mutex);
+		if (epoch != new_epoch) {
+			entries.clear();
+			order.clear();
+			epoch = new_epoch;
+			return true;
+		}
+		return false;
+	}
+
+	void reset_stats() {
+		std::lock_guard<std::mutex> lock(mutex);
+		hits = 0;
+		misses = 0;
+	}
+
+	std::size_t size() const {
+		std::lock_guard<std::mutex> lock(mutex);
+		return entries.size();
+	}
+	std::size_t get_capacity() const { return capacity; }
+	void set_capacity(std::size_t capacity_) {
+		std::lock_guard<std::mutex> lock(mutex);
+		capacity = capacity_;
+		while (entries.size() > capacity) {
+			entries.erase(order.front());
+			order.pop_front();
+		}
+	}
+};
+
+// Piecewise cubic Hermite interpolant of a periodic trajectory, sampled uniformly over one period
+class EphemerisTable {
+	double period = 0.0;
+	double step = 0.0;
+	// Samples at k*step for k = 0..segments, the last one closing the period
+	std::vector<vec2> pos;
+	std::vector<vec2> vel;
+
+	template <typename Sampler>
+	void fill(std::size_t segments, Sampler const& sample) {
+		step = period / segments;
+		pos.resize(segments + 1);
+		vel.resize(segments + 1);
+		for (std::size_t k = 0; k <= segments; ++k) {
+			sample(k*step, pos[k], vel[k]);
+		}
+	}
+
+	void interpolate(double tau, vec2* p, vec2* v) const {
+		double t = tau - period*std::floor(tau/period);
+		std::size_t k = std::min(static_cast<std::size_t>(t/step), segments() - 1);
+		double s = (t - k*step) / step;
+		double s2 = s*s;
+		double s3 = s2*s;
+
+		if (p != nullptr) {
+			*p = pos[k]*(2*s3 - 3*s2 + 1) + vel[k]*(step*(s3 - 2*s2 + s)) + pos[k+1]*(-2*s3 + 3*s2) + vel[k+1]*(step*(s3 - s2));
+		}
+		if (v != nullptr) {
+			*v = pos[k]*((6*s2 - 6*s)/step) + vel[k]*(3*s2 - 4*s + 1) + pos[k+1]*((-6*s2 + 6*s)/step) + vel[k+1]*(3*s2 - 2*s);
+		}
+	}
+
+public:
+	// Everything the trajectory depends on, to detect when the table is stale
+	using Key = std::array<double, 6>;
+	Key key = {};
+	// Whether the interpolation error is within the tolerance, otherwise the table should not be used
+	bool accurate = false;
+
+	// Doubles the sampling density until the error at the middle of the segments is below `tolerance`
+	template <typename Sampler>
+	void build(double period_, double tolerance, Sampler const& sample) {
+		period = period_;
+		accurate = false;
+
+		for (std::size_t segments = EPHEMERIS_TABLE_MIN_SEGMENTS; segments <= EPHEMERIS_TABLE_MAX_SEGMENTS; segments *= 2) {
+			fill(segments, sample);
+
+			double error = 0.0;
+			for (std::size_t k = 0; k < segments; ++k) {
+				vec2 exact_pos, exact_vel;
+				sample((k + 0.5)*step, exact_pos, exact_vel);
+				error = std::max(error, (pos_at((k + 0.5)*step) - exact_pos).length());
+			}
+
+			if (error <= tolerance) {
+				accurate = true;
+				return;
+			}
+		}
+	}
+
+	std::size_t segments() const { return pos.empty() ? 0 : pos.size() - 1; }
+
+	vec2 pos_at(double tau) const {
+		vec2 ret;
+		interpolate(tau, &ret, nullptr);
+		return ret;
+	}
+
+	vec2 vel_at(double tau) const {
+		vec2 ret;
+		interpolate(tau, nullptr, &ret);
+		return ret;
+	}
+
+	void state_at(double tau, vec2& pos_, vec2& vel_) const {
+		interpolate(tau, &pos_, &vel_);
+	}
+};
+
+#endif
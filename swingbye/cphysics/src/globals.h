@@ -1,8 +1,17 @@
 #ifndef __GLOBALS_H__
 #define __GLOBALS_H__
 
-double constexpr EPSILON_EULER = 1e-5;
-unsigned int MAX_ITER_EULER = 1000;
+double constexpr KEPLER_TOLERANCE = 1e-12;
+unsigned long constexpr KEPLER_MAX_ITER = 50;
+
+unsigned int constexpr EPHEMERIS_TABLE_MIN_SEGMENTS = 32;
+unsigned int constexpr EPHEMERIS_TABLE_MAX_SEGMENTS = 65536;
+
+// Bounds of the adaptive steps, relative to the requested step
+double constexpr INTEGRATOR_MIN_STEP_FRACTION = 1e-6;
+double constexpr INTEGRATOR_MAX_STEP_FACTOR = 10.0;
+// Rejected attempts in a row after which an adaptive step is kept as it is
+unsigned int constexpr INTEGRATOR_MAX_REJECTIONS = 100;
 
 double constexpr GRAVITY_CST = 1.0;
 double constexpr GRAVITY_SINGULARITY_OFFSET = 1.0;
@@ -3,10 +3,24 @@
 
 #include "vec2.hpp"
 #include "entity.hpp"
+#include "globals.h"
+#include <algorithm>
+#include <cmath>
+#include <map>
+#include <stdexcept>
+#include <string>
+#include <vector>
 
 class World;
 
 namespace Integrator {
+	using ForceFunc = vec2 (*)(Entity const&, World const&, double);
+	// Fixed step integrators advance the entity from `time` to `time + dt`
+	using Stepper = void (*)(Entity&, World const&, ForceFunc, double, double);
+
+	// Changes whenever the forces of `world` at a given time and position may change (defined in world.hpp)
+	unsigned long forces_version(World const& world);
+
 	void Euler(Entity& entity, World const& world, vec2 (*force_func)(Entity const&, World const&, double), double time, double dt) {
 		entity.pos += entity.vel * dt;
 		entity.vel += (*force_func)(entity, world, time) / entity.mass * dt;
@@ -18,9 +32,228 @@ namespace Integrator {
 		entity.pos += entity.vel * dt/2.0;
 		vec2 f_th = (*force_func)(entity, world, time + dt/2.0);
 		entity.pos += entity.vel * dt/2.0;
-		vec2 f_tf = (*force_func)(entity, world, time);
+		vec2 f_tf = (*force_func)(entity, world, time + dt);
 		entity.vel += (f_ti*1.0/6.0 + f_th*4.0/6.0 + f_tf*1.0/6.0) / entity.mass * dt;
 	}
+
+	// Symplectic integrators : the energy error stays bounded instead of drifting over long horizons
+
+	void Verlet(Entity& entity, World const& world, ForceFunc force_func, double time, double dt) {
+		// velocity Verlet (kick-drift-kick). The force of the second kick is the force of the first kick of the next step :
+		// it is kept on the entity, so that consecutive steps cost 1 force evaluation instead of 2. The first step, and any
+		// step after the entity was moved, the world changed or its planets were edited, evaluates both
+		Entity::ForceCache& cache = entity.force_cache;
+		unsigned long version = forces_version(world);
+		bool cached = cache.world == &world && cache.force_func == force_func && cache.version == version
+			&& cache.pos.x == entity.pos.x && cache.pos.y == entity.pos.y && cache.mass == entity.mass
+			// the callers compute the times as t_from + i*dt, which may round differently from the previous time + dt
+			&& std::abs(cache.time - time) <= 1e-12 * std::max(1.0, std::abs(time));
+
+		vec2 force = cached ? cache.force : (*force_func)(entity, world, time);
+		entity.vel += force / entity.mass * (dt/2.0);
+		entity.pos += entity.vel * dt;
+		force = (*force_func)(entity, world, time + dt);
+		entity.vel += force / entity.mass * (dt/2.0);
+
+		cache = Entity::ForceCache{&world, force_func, version, time + dt, entity.pos, entity.mass, force};
+	}
+
+	// Yoshida's 4th order composition of three leapfrog steps (drift-kick form)
+	namespace Yoshida {
+		double const w1 = 1.0 / (2.0 - std::cbrt(2.0));
+		double const w0 = -std::cbrt(2.0) / (2.0 - std::cbrt(2.0));
+		double const c[4] = {w1/2.0, (w0+w1)/2.0, (w0+w1)/2.0, w1/2.0};
+		double const d[3] = {w1, w0, w1};
+	}
+
+	void Yoshida4(Entity& entity, World const& world, ForceFunc force_func, double time, double dt) {
+		double t = time;
+		for (int i = 0; i < 3; ++i) {
+			entity.pos += entity.vel * (Yoshida::c[i]*dt);
+			t += Yoshida::c[i]*dt;
+			entity.vel += (*force_func)(entity, world, t) / entity.mass * (Yoshida::d[i]*dt);
+		}
+		entity.pos += entity.vel * (Yoshida::c[3]*dt);
+	}
+
+	// Dormand-Prince 5(4) tableau
+	namespace DP {
+		double constexpr c[7] = {0.0, 1.0/5, 3.0/10, 4.0/5, 8.0/9, 1.0, 1.0};
+		double constexpr a[7][6] = {
+			{},
+			{1.0/5},
+			{3.0/40, 9.0/40},
+			{44.0/45, -56.0/15, 32.0/9},
+			{19372.0/6561, -25360.0/2187, 64448.0/6561, -212.0/729},
+			{9017.0/3168, -355.0/33, 46732.0/5247, 49.0/176, -5103.0/18656},
+			{35.0/384, 0.0, 500.0/1113, 125.0/192, -2187.0/6784, 11.0/84}
+		};
+		// Difference between the 5th and 4th order weights, the 5th order weights being the last row of `a`
+		double constexpr e[7] = {71.0/57600, 0.0, -71.0/16695, 71.0/1920, -17253.0/339200, 22.0/525, -1.0/40};
+	}
+
+	// One Dormand-Prince attempt from `time` to `time + dt`, given the acceleration `acc` at the start.
+	// On return `entity` holds the 5th order solution, `acc` the acceleration there (first stage of the next step),
+	// and the returned value is the error relative to `tolerance` (the step is acceptable if it is <= 1)
+	double DormandPrince(Entity& entity, World const& world, ForceFunc force_func, double time, double dt, vec2& acc, double tolerance) {
+		vec2 k_pos[7], k_vel[7];
+		Entity stage(entity);
+		vec2 const pos0 = entity.pos;
+		vec2 const vel0 = entity.vel;
+
+		k_pos[0] = vel0;
+		k_vel[0] = acc;
+
+		for (int i = 1; i < 7; ++i) {
+			vec2 dpos, dvel;
+			for (int j = 0; j < i; ++j) {
+				dpos += k_pos[j] * DP::a[i][j];
+				dvel += k_vel[j] * DP::a[i][j];
+			}
+			stage.pos = pos0 + dpos*dt;
+			stage.vel = vel0 + dvel*dt;
+			k_pos[i] = stage.vel;
+			k_vel[i] = (*force_func)(stage, world, time + DP::c[i]*dt) / entity.mass;
+		}
+
+		// The last stage is evaluated at the 5th order solution (first same as last)
+		entity.pos = stage.pos;
+		entity.vel = stage.vel;
+		acc = k_vel[6];
+
+		vec2 err_pos, err_vel;
+		for (int i = 0; i < 7; ++i) {
+			err_pos += k_pos[i] * (DP::e[i]*dt);
+			err_vel += k_vel[i] * (DP::e[i]*dt);
+		}
+
+		return std::max(
+			err_pos.length() / (tolerance * (1 + pos0.length())),
+			err_vel.length() / (tolerance * (1 + vel0.length()))
+		);
+	}
+
+	// Next step size from the relative error of the last attempt
+	double next_dt(double dt, double error) {
+		if (!std::isfinite(error)) {
+			return dt;
+		}
+		double factor = error > 0 ? 0.9 * std::pow(error, -1.0/5) : 5.0;
+		return dt * std::min(5.0, std::max(0.2, factor));
+	}
+
+	// Whether an attempt with the relative error `error` is kept. Attempts that refining cannot improve are kept as they
+	// are : the smallest steps, non-finite errors (from a non-finite state or force) and after too many rejections in a row
+	bool accepted(double error, double h, double min_dt, unsigned int& rejections) {
+		if (error <= 1 || !std::isfinite(error) || std::abs(h) <= min_dt || rejections >= INTEGRATOR_MAX_REJECTIONS) {
+			rejections = 0;
+			return true;
+		}
+		rejections += 1;
+		return false;
+	}
+
+	// Adaptive step integration from `time` to `time + dt`, refining the step where the error is too large
+	void RK45(Entity& entity, World const& world, ForceFunc force_func, double time, double dt, double tolerance) {
+		double const t_end = time + dt;
+		double const min_dt = std::abs(dt) * INTEGRATOR_MIN_STEP_FRACTION;
+		double t = time;
+		double h = dt;
+		unsigned int rejections = 0;
+		vec2 acc = (*force_func)(entity, world, t) / entity.mass;
+
+		while ((t_end - t) * dt > 0) {
+			h = dt > 0 ? std::min(h, t_end - t) : std::max(h, t_end - t);
+			Entity attempt(entity);
+			vec2 attempt_acc = acc;
+			double error = DormandPrince(attempt, world, force_func, t, h, attempt_acc, tolerance);
+
+			if (accepted(error, h, min_dt, rejections)) {
+				entity.pos = attempt.pos;
+				entity.vel = attempt.vel;
+				acc = attempt_acc;
+				t += h;
+			}
+			h = next_dt(h, error);
+		}
+	}
+
+	// Adaptive step integration over `n` samples spaced by `dt`, writing the positions at `time + (i+1)*dt` into `out`.
+	// Steps are not tied to the samples : they can span several samples, which are interpolated with cubic Hermite
+	// polynomials since the velocity is the derivative of the position
+	void RK45_dense(Entity& entity, World const& world, ForceFunc force_func, double time, double dt, unsigned int n, vec2* out, double tolerance) {
+		double const t_end = time + n*dt;
+		double const min_dt = std::abs(dt) * INTEGRATOR_MIN_STEP_FRACTION;
+		double const max_dt = std::abs(dt) * INTEGRATOR_MAX_STEP_FACTOR;
+		double t = time;
+		double h = dt;
+		unsigned int i = 0;
+		unsigned int rejections = 0;
+		vec2 acc = (*force_func)(entity, world, t) / entity.mass;
+
+		while (i < n) {
+			h = dt > 0 ? std::min({h, max_dt, t_end - t}) : std::max({h, -max_dt, t_end - t});
+			Entity attempt(entity);
+			vec2 attempt_acc = acc;
+			double error = DormandPrince(attempt, world, force_func, t, h, attempt_acc, tolerance);
+
+			if (accepted(error, h, min_dt, rejections)) {
+				// Emit the samples covered by this step
+				for (; i < n && (time + (i+1)*dt - (t + h)) * dt <= 0; ++i) {
+					double s = (time + (i+1)*dt - t) / h;
+					double s2 = s*s;
+					double s3 = s2*s;
+					out[i] = entity.pos*(2*s3 - 3*s2 + 1) + entity.vel*(h*(s3 - 2*s2 + s)) + attempt.pos*(-2*s3 + 3*s2) + attempt.vel*(h*(s3 - s2));
+				}
+				entity.pos = attempt.pos;
+				entity.vel = attempt.vel;
+				acc = attempt_acc;
+				t += h;
+
+				// Guard against rounding leaving the last sample just beyond the end of the integration
+				if (i < n && (t_end - t) * dt <= 0) {
+					for (; i < n; ++i) {
+						out[i] = entity.pos;
+					}
+				}
+			}
+			h = next_dt(h, error);
+		}
+	}
+
+	struct Method {
+		Stepper step;   // nullptr for adaptive methods
+		bool adaptive;
+	};
+
+	std::map<std::string, Method> const& methods() {
+		static std::map<std::string, Method> const registry = {
+			{"euler", {&Euler, false}},
+			{"rk4", {&RK4, false}},
+			{"rk45", {nullptr, true}},
+			{"verlet", {&Verlet, false}},
+			{"yoshida4", {&Yoshida4, false}},
+		};
+		return registry;
+	}
+
+	Method const& get(std::string const& name) {
+		auto it = methods().find(name);
+		if (it == methods().end()) {
+			std::string names;
+			for (auto const& method : methods()) {
+				names += (names.empty() ? "" : ", ") + method.first;
+			}
+			throw std::invalid_argument("unknown integrator `" + name + "`, available integrators are " + names);
+		}
+		return it->second;
+	}
+
+	// Integrator selection, with the tolerance used by adaptive methods
+	struct Settings {
+		std::string method = "rk4";
+		double tolerance = 1e-6;
+	};
 }
 
 #endif
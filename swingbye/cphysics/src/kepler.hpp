@@ -0,0 +1,180 @@
+#ifndef __KEPLER_HPP__
+#define __KEPLER_HPP__
+
+#include "globals.h"
+#include <algorithm>
+#include <cmath>
+#include <cstddef>
+#include <vector>
+
+// Solvers of Kepler's equation, for single and batched (M, e) pairs
+//
+// Both branches use Danby's quartic correction (Danby 1987), starting from guesses that are
+// already close for every eccentricity, so a couple of iterations reach KEPLER_TOLERANCE.
+// The batched solvers run each iteration as a branch-free pass over contiguous arrays.
+
+namespace Kepler {
+	struct Stats {
+		unsigned long solves = 0;
+		unsigned long iterations = 0;
+		unsigned long max_iterations = 0;
+		unsigned long nonconverged = 0;
+
+		void add(Stats const& other) {
+			solves += other.solves;
+			iterations += other.iterations;
+			max_iterations = std::max(max_iterations, other.max_iterations);
+			nonconverged += other.nonconverged;
+		}
+	};
+
+	// Wraps M to [-pi, pi], where the starting guesses are valid
+	inline double wrap_angle(double M) {
+		return M - 2*M_PI*std::round(M / (2*M_PI));
+	}
+
+	inline double elliptic_guess(double M, double e) {
+		return M + 0.85*e*(std::sin(M) < 0 ? -1.0 : 1.0);
+	}
+
+	inline double hyperbolic_guess(double M, double e) {
+		return (M < 0 ? -1.0 : 1.0) * std::log(2*std::abs(M)/e + 1.8);
+	}
+
+	// Danby's correction for f(E) = E - e*sin(E) - M
+	inline double elliptic_step(double E, double M, double e) {
+		double esin = e*std::sin(E);
+		double ecos = e*std::cos(E);
+		double f = E - esin - M;
+		double d1 = -f / (1 - ecos);
+		double d2 = -f / (1 - ecos + d1*esin/2);
+		return -f / (1 - ecos + d2*esin/2 + d2*d2*ecos/6);
+	}
+
+	// Danby's correction for f(H) = e*sinh(H) - H - M
+	inline double hyperbolic_step(double H, double M, double e) {
+		double esinh = e*std::sinh(H);
+		double ecosh = e*std::cosh(H);
+		double f = esinh - H - M;
+		double d1 = -f / (ecosh - 1);
+		double d2 = -f / (ecosh - 1 + d1*esinh/2);
+		return -f / (ecosh - 1 + d2*esinh/2 + d2*d2*ecosh/6);
+	}
+
+	// Solve M = E - e*sin(E) for 0 <= e < 1
+	inline double solve_elliptic(double M, double e, Stats* stats = nullptr) {
+		double Mw = wrap_angle(M);
+		double E = elliptic_guess(Mw, e);
+		double dE = KEPLER_TOLERANCE + 1;
+		unsigned long i = 0;
+
+		while (std::abs(dE) > KEPLER_TOLERANCE && i < KEPLER_MAX_ITER) {
+			dE = elliptic_step(E, Mw, e);
+			E += dE;
+			i += 1;
+		}
+
+		if (stats != nullptr) {
+			stats->solves += 1;
+			stats->iterations += i;
+			stats->max_iterations = std::max(stats->max_iterations, i);
+			stats->nonconverged += std::abs(dE) > KEPLER_TOLERANCE;
+		}
+
+		return E + (M - Mw);
+	}
+
+	// Solve M = e*sinh(H) - H for e > 1
+	inline double solve_hyperbolic(double M, double e, Stats* stats = nullptr) {
+		double H = hyperbolic_guess(M, e);
+		double dH = KEPLER_TOLERANCE + 1;
+		unsigned long i = 0;
+
+		while (std::abs(dH) > KEPLER_TOLERANCE*std::max(1.0, std::abs(H)) && i < KEPLER_MAX_ITER) {
+			dH = hyperbolic_step(H, M, e);
+			H += dH;
+			i += 1;
+		}
+
+		if (stats != nullptr) {
+			stats->solves += 1;
+			stats->iterations += i;
+			stats->max_iterations = std::max(stats->max_iterations, i);
+			stats->nonconverged += std::abs(dH) > KEPLER_TOLERANCE*std::max(1.0, std::abs(H));
+		}
+
+		return H;
+	}
+
+	// Batched solve of M[i] = E[i] - e[i]*sin(E[i]), all pairs iterate together until the largest correction is small enough
+	inline void solve_elliptic_many(double const* M, double const* e, double* E, std::size_t n, Stats* stats = nullptr) {
+		std::vector<double> Mw(n);
+		std::vector<double> dE(n);
+
+		for (std::size_t i = 0; i < n; ++i) {
+			Mw[i] = wrap_angle(M[i]);
+			E[i] = elliptic_guess(Mw[i], e[i]);
+		}
+
+		unsigned long iterations = 0;
+		double max_dE = n > 0 ? KEPLER_TOLERANCE + 1 : 0.0;
+		while (max_dE > KEPLER_TOLERANCE && iterations < KEPLER_MAX_ITER) {
+			for (std::size_t i = 0; i < n; ++i) {
+				dE[i] = elliptic_step(E[i], Mw[i], e[i]);
+				E[i] += dE[i];
+			}
+			max_dE = 0.0;
+			for (std::size_t i = 0; i < n; ++i) {
+				max_dE = std::max(max_dE, std::abs(dE[i]));
+			}
+			iterations += 1;
+		}
+
+		for (std::size_t i = 0; i < n; ++i) {
+			E[i] += M[i] - Mw[i];
+		}
+
+		if (stats != nullptr) {
+			stats->solves += n;
+			stats->iterations += iterations*n;
+			stats->max_iterations = std::max(stats->max_iterations, iterations);
+			for (std::size_t i = 0; i < n; ++i) {
+				stats->nonconverged += std::abs(dE[i]) > KEPLER_TOLERANCE;
+			}
+		}
+	}
+
+	// Batched solve of M[i] = e[i]*sinh(H[i]) - H[i]
+	inline void solve_hyperbolic_many(double const* M, double const* e, double* H, std::size_t n, Stats* stats = nullptr) {
+		std::vector<double> dH(n);
+
+		for (std::size_t i = 0; i < n; ++i) {
+			H[i] = hyperbolic_guess(M[i], e[i]);
+		}
+
+		unsigned long iterations = 0;
+		double max_dH = n > 0 ? KEPLER_TOLERANCE + 1 : 0.0;
+		while (max_dH > KEPLER_TOLERANCE && iterations < KEPLER_MAX_ITER) {
+			for (std::size_t i = 0; i < n; ++i) {
+				dH[i] = hyperbolic_step(H[i], M[i], e[i]);
+				H[i] += dH[i];
+			}
+			max_dH = 0.0;
+			for (std::size_t i = 0; i < n; ++i) {
+				max_dH = std::max(max_dH, std::abs(dH[i]) / std::max(1.0, std::abs(H[i])));
+			}
+			iterations += 1;
+		}
+
+		if (stats != nullptr) {
+			stats->solves += n;
+			stats->iterations += iterations*n;
+			stats->max_iterations = std::max(stats->max_iterations, iterations);
+			for (std::size_t i = 0; i < n; ++i) {
+				stats->nonconverged += std::abs(dH[i]) > KEPLER_TOLERANCE*std::max(1.0, std::abs(H[i]));
+			}
+		}
+	}
+}
+
+#endif
@@ -3,15 +3,22 @@
 
 #include "vec2.hpp"
 #include "entity.hpp"
+#include "ephemeris.hpp"
+#include "kepler.hpp"
 #include "globals.h"
+#include <atomic>
 #include <cmath>
-#include <iostream>
 #include <memory>
+#include <vector>
 
 class Planet : public ExplicitEntity {
 private:
 	std::shared_ptr<Planet> parent = nullptr;
 
+	// Maximum interpolation error of the ephemeris table, or 0 to always solve Kepler's equation
+	double table_tolerance = 0.0;
+	mutable std::shared_ptr<EphemerisTable const> table = nullptr;
+
 public:
 	double maxis = 1.0;
 	double ecc = 0.0;
@@ -25,8 +32,27 @@ public:
 		: ExplicitEntity(mass_), maxis(maxis_), ecc(ecc_), time0(time0_), incl(incl_), parg(parg_), anchor(anchor_) {}
 	virtual ~Planet() {}
 
-	void set_parent(std::shared_ptr<Planet> new_parent) { parent = new_parent; }
-	void rm_parent() { parent.reset(); }
+	// Incremented whenever the orbital elements of any planet change, so that cached positions can be invalidated
+	static std::atomic<unsigned long> elements_epoch;
+	void touch() { elements_epoch += 1; }
+
+	double get_maxis() const { return maxis; }
+	double get_ecc() const { return ecc; }
+	double get_time0() const { return time0; }
+	double get_incl() const { return incl; }
+	double get_parg() const { return parg; }
+	vec2 get_anchor() const { return anchor; }
+	void set_mass(double const& mass_) { mass = mass_; touch(); }
+	void set_maxis(double maxis_) { maxis = maxis_; touch(); }
+	void set_ecc(double ecc_) { ecc = ecc_; touch(); }
+	void set_time0(double time0_) { time0 = time0_; touch(); }
+	void set_incl(double incl_) { incl = incl_; touch(); }
+	void set_parg(double parg_) { parg = parg_; touch(); }
+	void set_anchor(vec2 const& anchor_) { anchor = anchor_; touch(); }
+
+	Planet const* get_parent() const { return parent.get(); }
+	void set_parent(std::shared_ptr<Planet> new_parent) { parent = new_parent; touch(); }
+	void rm_parent() { parent.reset(); touch(); }
 
 	virtual vec2 pos_at(double time) const override {
 		vec2 ret = vec2(0, 0);
@@ -43,71 +69,175 @@ public:
 		return ret;
 	}
 
+	// Walks the parent chain once, accumulating each ancestor's relative orbit over all times
+	virtual void pos_at_many(double const* times, vec2* out, std::size_t n) const override {
+		for (std::size_t i = 0; i < n; ++i) {
+			out[i] = vec2(0, 0);
+		}
+
+		const Planet* daddy = this;
+		std::vector<vec2> rel_pos(n);
+
+		while (daddy != nullptr) {
+			daddy->rel_pos_at_many(times, rel_pos.data(), n);
+			for (std::size_t i = 0; i < n; ++i) {
+				out[i] += rel_pos[i];
+			}
+			if (daddy->parent == nullptr) {
+				for (std::size_t i = 0; i < n; ++i) {
+					out[i] += daddy->anchor;
+				}
+			}
+			daddy = daddy->parent.get();
+		}
+	}
+
+	void rel_pos_at_many(double const* times, vec2* out, std::size_t n) const {
+		if (orbit() == Orbit::NONE || served_by_table()) {
+			for (std::size_t i = 0; i < n; ++i) {
+				out[i] = rel_pos_at(times[i]);
+			}
+			return;
+		}
+
+		// Solve Kepler's equation for all times at once
+		std::vector<double> M(n), e(n, ecc), anomaly(n);
+		for (std::size_t i = 0; i < n; ++i) {
+			M[i] = mean_anomaly(times[i]);
+		}
+		if (orbit() == Orbit::ELLIPTIC) {
+			Kepler::solve_elliptic_many(M.data(), e.data(), anomaly.data(), n);
+		} else {
+			Kepler::solve_hyperbolic_many(M.data(), e.data(), anomaly.data(), n);
+		}
+		for (std::size_t i = 0; i < n; ++i) {
+			out[i] = rel_pos_from_anomaly(anomaly[i]);
+		}
+	}
+
 	vec2 rel_pos_at(double time) const {
-		vec2 ret = vec2(0, 0);
+		if (parent == nullptr) {
+			return vec2(0, 0);
+		}
+
+		if (table_tolerance > 0 && 0 <= ecc && ecc < 1) {
+			std::shared_ptr<EphemerisTable const> table = current_table();
+			if (table->accurate) {
+				return table->pos_at(time - time0);
+			}
+		}
+
+		return solve_rel_pos_at(time);
+	}
+
+	// Relative position from the orbital elements, always solving Kepler's equation
+	vec2 solve_rel_pos_at(double time) const {
+		switch (orbit()) {
+			case Orbit::ELLIPTIC:
+				return rel_pos_from_anomaly(Kepler::solve_elliptic(mean_anomaly(time), ecc));
+			case Orbit::HYPERBOLIC:
+				return rel_pos_from_anomaly(Kepler::solve_hyperbolic(mean_anomaly(time), ecc));
+			default:
+				return rel_pos_from_anomaly(0);
+		}
+	}
 
+	enum class Orbit { NONE, ELLIPTIC, HYPERBOLIC };
+
+	Orbit orbit() const {
 		if (parent == nullptr) {
-			return ret;
+			return Orbit::NONE;
+		}
+		if (0 <= ecc && ecc < 1) {
+			return Orbit::ELLIPTIC;
 		}
+		if (1 < ecc) {
+			return Orbit::HYPERBOLIC;
+		}
+		return Orbit::NONE;
+	}
 
+	// Whether the relative position is interpolated from an accurate ephemeris table rather than solved
+	bool served_by_table() const {
+		return table_tolerance > 0 && orbit() == Orbit::ELLIPTIC && current_table()->accurate;
+	}
+
+	// Mean anomaly M at `time`, to be solved for the eccentric (elliptic) or hyperbolic anomaly
+	double mean_anomaly(double time) const {
 		double mu = GRAVITY_CST*(mass + parent->mass);
-		double costheta = 0, sintheta = 0, r = 0;
 
-		if (0 <= ecc && ecc < 1) {
+		if (orbit() == Orbit::ELLIPTIC) {
 			double T = std::sqrt(4 * M_PI*M_PI * maxis*maxis*maxis / mu);
 			double tau = std::fmod(time - time0, T);
 			double n = 2*M_PI/T;
-			double M = n*tau;
-			double E = M;
-			double dE = EPSILON_EULER + 1;
-			unsigned int i = 0;
-
-			// Solve M = E - e*sin(E)
-			while (std::abs(dE) > EPSILON_EULER && i < MAX_ITER_EULER) {
-				dE = (M - E + ecc*std::sin(E)) / (1 - ecc * std::cos(E));
-				E += dE;
-				i += 1;
-			}
-			if (i >= MAX_ITER_EULER) {
-				std::cerr << "Euler equation solving did not escape" << std::endl;
-			}
+			return n*tau;
+		}
+
+		double tau = time - time0;
+		double n = std::sqrt(-mu/(maxis*maxis*maxis));
+		return n*tau;
+	}
+
+	// Mean motion n, the rate of change of the mean anomaly
+	double mean_motion() const {
+		double mu = GRAVITY_CST*(mass + parent->mass);
+		if (orbit() == Orbit::ELLIPTIC) {
+			return std::sqrt(mu/(maxis*maxis*maxis));
+		}
+		return std::sqrt(-mu/(maxis*maxis*maxis));
+	}
+
+	// Relative velocity from the solved eccentric (elliptic) or hyperbolic anomaly, by differentiating the position
+	vec2 rel_vel_from_anomaly(double anomaly) const {
+		vec2 ret = vec2(0, 0);
 
+		if (orbit() == Orbit::ELLIPTIC) {
+			// x = a*(cos(E) - e), y = b*sin(E), and dE/dt = n / (1 - e*cos(E))
+			double E = anomaly;
+			double dE = mean_motion() / (1 - ecc*std::cos(E));
+			ret.x = -maxis*std::sin(E)*dE;
+			ret.y = maxis*std::sqrt(1 - ecc*ecc)*std::cos(E)*dE;
+		}
+
+		else if (orbit() == Orbit::HYPERBOLIC) {
+			// x = a*(cosh(H) - e), y = -a*sqrt(e^2 - 1)*sinh(H), and dH/dt = n / (e*cosh(H) - 1)
+			double H = anomaly;
+			double dH = mean_motion() / (ecc*std::cosh(H) - 1);
+			ret.x = maxis*std::sinh(H)*dH;
+			ret.y = -maxis*std::sqrt(ecc*ecc - 1)*std::cosh(H)*dH;
+		}
+
+		return orient(ret);
+	}
+
+	// Relative position from the solved eccentric (elliptic) or hyperbolic anomaly
+	vec2 rel_pos_from_anomaly(double anomaly) const {
+		double costheta = 0, sintheta = 0, r = 0;
+
+		if (orbit() == Orbit::ELLIPTIC) {
+			double E = anomaly;
 			costheta = (std::cos(E) - ecc) / (1 - ecc*std::cos(E));
 			sintheta = (std::sqrt(1 - ecc*ecc) * std::sin(E)) / (1 - ecc*std::cos(E));
 			r = maxis * (1 - ecc*std::cos(E));
 		}
 
-		else if (1 < ecc) {
-			double tau = time - time0;
-			double n = std::sqrt(-mu/(maxis*maxis*maxis));
-			double M = n*tau;
-			double H = M;
-			double dH = EPSILON_EULER + 1;
-			unsigned int i = 0;
-
-			// Solve M = e*sinh(H) - H
-			while (std::abs(dH) > EPSILON_EULER && i < MAX_ITER_EULER) {
-				dH = (M - ecc*std::sinh(H) + H) / (ecc*std::cosh(H) - 1);
-				H += dH;
-				i += 1;
-			}
-			if (i >= MAX_ITER_EULER) {
-				std::cerr << "Euler equation solving did not escape" << std::endl;
-			}
-
+		else if (orbit() == Orbit::HYPERBOLIC) {
+			double H = anomaly;
 			costheta = (ecc - std::cosh(H)) / (ecc*std::cosh(H) - 1);
 			sintheta = std::copysign(1, H)*std::sin(std::acos(costheta));
 			r = maxis * (1 - ecc*std::cosh(H));
 		}
 
-		ret.x = r*costheta;
-		ret.y = r*sintheta;
+		return orient(vec2(r*costheta, r*sintheta));
+	}
+
+	// Rotates a vector from the periaxis frame by the argument of periaxis, and projects it by the inclination
+	vec2 orient(vec2 const& v) const {
+		vec2 ret;
 
 		// Argument of periaxis
-		double x = ret.x;
-		double y = ret.y;
-		ret.x = x*std::cos(parg) - y*std::sin(parg);
-		ret.y = x*std::sin(parg) + y*std::cos(parg);
+		ret.x = v.x*std::cos(parg) - v.y*std::sin(parg);
+		ret.y = v.x*std::sin(parg) + v.y*std::cos(parg);
 
 		// Inclination
 		ret.x *= std::cos(incl);
@@ -115,9 +245,73 @@ public:
 		return ret;
 	}
 
+	// Relative position and velocity on an elliptic orbit, `tau` after the periaxis passage
+	void elliptic_state(double tau, vec2& pos, vec2& vel) const {
+		double E = Kepler::solve_elliptic(mean_motion()*tau, ecc);
+		pos = rel_pos_from_anomaly(E);
+		vel = rel_vel_from_anomaly(E);
+	}
+
+	// Returns the interpolated ephemeris of the elliptic orbit, rebuilding it if the elements changed
+	std::shared_ptr<EphemerisTable const> current_table() const {
+		std::shared_ptr<EphemerisTable const> current = std::atomic_load(&table);
+		double mu = GRAVITY_CST*(mass + parent->mass);
+		EphemerisTable::Key key = {maxis, ecc, incl, parg, mu, table_tolerance};
+
+		if (current == nullptr || current->key != key) {
+			std::shared_ptr<EphemerisTable> fresh = std::make_shared<EphemerisTable>();
+			fresh->key = key;
+			fresh->build(
+				std::sqrt(4 * M_PI*M_PI * maxis*maxis*maxis / mu),
+				table_tolerance,
+				[this](double tau, vec2& pos, vec2& vel) { elliptic_state(tau, pos, vel); }
+			);
+			current = fresh;
+			std::atomic_store(&table, current);
+		}
+
+		return current;
+	}
+
+	// Relative position and velocity at `time`, solving Kepler's equation once for both
+	void rel_state_at(double time, vec2& pos, vec2& vel) const {
+		if (table_tolerance > 0 && orbit() == Orbit::ELLIPTIC) {
+			std::shared_ptr<EphemerisTable const> table = current_table();
+			if (table->accurate) {
+				table->state_at(time - time0, pos, vel);
+				return;
+			}
+		}
+
+		double anomaly = 0;
+		if (orbit() == Orbit::ELLIPTIC) {
+			anomaly = Kepler::solve_elliptic(mean_anomaly(time), ecc);
+		} else if (orbit() == Orbit::HYPERBOLIC) {
+			anomaly = Kepler::solve_hyperbolic(mean_anomaly(time), ecc);
+		}
+		pos = rel_pos_from_anomaly(anomaly);
+		vel = rel_vel_from_anomaly(anomaly);
+	}
+
+	vec2 rel_vel_at(double time) const {
+		vec2 pos, vel;
+		rel_state_at(time, pos, vel);
+		return vel;
+	}
+
 	virtual vec2 vel_at(double time) const override {
-		double dt = 0.16666;
-		return (pos_at(time+dt/2.0) - pos_at(time-dt/2.0)) / dt;
+		vec2 ret = vec2(0, 0);
+		for (const Planet* daddy = this; daddy != nullptr; daddy = daddy->parent.get()) {
+			ret += daddy->rel_vel_at(time);
+		}
+		return ret;
+	}
+
+	double get_table_tolerance() const { return table_tolerance; }
+	void set_table_tolerance(double tolerance) { table_tolerance = tolerance; touch(); }
+	std::size_t get_table_size() const {
+		std::shared_ptr<EphemerisTable const> current = std::atomic_load(&table);
+		return current == nullptr ? 0 : current->segments();
 	}
 
 	virtual std::string str() const override {
@@ -125,4 +319,6 @@ public:
 	}
 };
 
+std::atomic<unsigned long> Planet::elements_epoch{0};
+
 #endif
@@ -0,0 +1,257 @@
+#ifndef __PLANETARRAYS_HPP__
+#define __PLANETARRAYS_HPP__
+
+#include "vec2.hpp"
+#include "entity.hpp"
+#include "planet.hpp"
+#include "kepler.hpp"
+#include "trace.hpp"
+#include "globals.h"
+#include <algorithm>
+#include <cmath>
+#include <memory>
+#include <numeric>
+#include <unordered_map>
+#include <vector>
+
+// Orbital elements of the planets of a world in contiguous arrays, mirrored from the Planet objects whenever they
+// change. The objects stay the source of truth, the arrays let the kernels compute all the positions in tight loops
+struct PlanetArrays {
+	enum Kind : unsigned char {
+		OBJECT,      // custom orbit : ask the object
+		CHAIN,       // parent outside of the world (or with a custom orbit) : walk the parent chain
+		TABLE,       // interpolated from the ephemeris table of the planet
+		ANCHORED,    // no parent, fixed at its anchor
+		STILL,       // degenerate orbit, at the position of its parent
+		ELLIPTIC,
+		HYPERBOLIC
+	};
+
+	std::vector<unsigned char> kind;
+	std::vector<std::ptrdiff_t> parent;  // index in the world, -1 for OBJECT, CHAIN and ANCHORED
+	std::vector<double> mass, maxis, ecc, time0, incl, parg;
+	std::vector<vec2> anchor;
+
+	// Derived from the elements, so that the kernels don't recompute them
+	std::vector<double> period;       // elliptic only
+	std::vector<double> mean_motion;  // rate of the mean anomaly
+	std::vector<double> minor;        // sqrt(|1 - e^2|)
+	std::vector<double> cos_parg, sin_parg, cos_incl;
+
+	// Planets sorted parents first, and the indices of each kind of orbit
+	std::vector<std::size_t> order;
+	std::vector<std::size_t> elliptic, hyperbolic;
+	std::vector<ExplicitEntity const*> objects;
+	std::vector<Planet const*> planets;  // nullptr for OBJECT
+	std::vector<std::shared_ptr<ExplicitEntity>> owners;  // keeps the planets alive as long as the arrays are in use
+	std::size_t custom = 0;  // planets whose motion is only known by calling `pos_at`
+
+	std::size_t size() const { return kind.size(); }
+
+	void sync(std::vector<std::shared_ptr<ExplicitEntity>> const& planets_ptr) {
+		std::size_t n = planets_ptr.size();
+		owners = planets_ptr;
+		std::unordered_map<ExplicitEntity const*, std::size_t> index_of;
+		for (std::size_t i = 0; i < n; ++i) {
+			index_of[planets_ptr[i].get()] = i;
+		}
+
+		kind.assign(n, OBJECT);
+		parent.assign(n, -1);
+		for (std::vector<double>* column : {&mass, &maxis, &ecc, &time0, &incl, &parg, &period, &mean_motion, &minor, &cos_parg, &sin_parg, &cos_incl}) {
+			column->assign(n, 0.0);
+		}
+		anchor.assign(n, vec2());
+		objects.resize(n);
+		planets.assign(n, nullptr);
+		elliptic.clear();
+		hyperbolic.clear();
+		custom = 0;
+
+		for (std::size_t i = 0; i < n; ++i) {
+			ExplicitEntity const* entity = planets_ptr[i].get();
+			objects[i] = entity;
+			mass[i] = entity->mass;
+
+			Planet const* planet = dynamic_cast<Planet const*>(entity);
+			if (planet == nullptr || planet->custom_orbit) {
+				custom += 1;
+				continue;
+			}
+			planets[i] = planet;
+
+			maxis[i] = planet->maxis;
+			ecc[i] = planet->ecc;
+			time0[i] = planet->time0;
+			incl[i] = planet->incl;
+			parg[i] = planet->parg;
+			anchor[i] = planet->anchor;
+			cos_parg[i] = std::cos(planet->parg);
+			sin_parg[i] = std::sin(planet->parg);
+			cos_incl[i] = std::cos(planet->incl);
+
+			Planet const* daddy = planet->get_parent();
+			if (daddy == nullptr) {
+				kind[i] = ANCHORED;
+				continue;
+			}
+			// A custom parent only knows its own position, its children walk the chain instead
+			auto it = index_of.find(daddy);
+			if (daddy->custom_orbit || it == index_of.end()) {
+				kind[i] = CHAIN;
+				continue;
+			}
+			parent[i] = it->second;
+			if (planet->served_by_table()) {
+				kind[i] = TABLE;
+				continue;
+			}
+
+			double mu = GRAVITY_CST*(planet->mass + daddy->mass);
+			double a3 = planet->maxis*planet->maxis*planet->maxis;
+			minor[i] = std::sqrt(std::abs(1 - planet->ecc*planet->ecc));
+			switch (planet->orbit()) {
+				case Planet::Orbit::ELLIPTIC:
+					kind[i] = ELLIPTIC;
+					period[i] = std::sqrt(4 * M_PI*M_PI * a3 / mu);
+					mean_motion[i] = 2*M_PI/period[i];
+					elliptic.push_back(i);
+					break;
+				case Planet::Orbit::HYPERBOLIC:
+					kind[i] = HYPERBOLIC;
+					mean_motion[i] = std::sqrt(-mu/a3);
+					hyperbolic.push_back(i);
+					break;
+				default:
+					kind[i] = STILL;
+			}
+		}
+
+		// Sorting by depth puts parents before their children (the depth is bounded in case of cycles)
+		std::vector<std::size_t> depth(n, 0);
+		for (std::size_t i = 0; i < n; ++i) {
+			std::ptrdiff_t j = parent[i];
+			while (j >= 0 && depth[i] <= n) {
+				depth[i] += 1;
+				j = parent[j];
+			}
+		}
+		order.resize(n);
+		std::iota(order.begin(), order.end(), 0);
+		std::stable_sort(order.begin(), order.end(), [&depth](std::size_t a, std::size_t b) { return depth[a] < depth[b]; });
+	}
+
+	// Absolute positions of all planets at `time`, and their velocities if `vel` is given. The Kepler solves of the
+	// elliptic and hyperbolic orbits are added to `stats` if given
+	void states_at(double time, vec2* pos, vec2* vel, Kepler::Stats* stats = nullptr) const {
+		std::size_t n = size();
+		std::vector<vec2> rel_pos(n), rel_vel(vel != nullptr ? n : 0);
+
+		// Elliptic orbits : x = a*(cos(E) - e), y = b*sin(E)
+		std::size_t ne = elliptic.size();
+		std::vector<double> M(ne), e(ne), E(ne);
+		for (std::size_t k = 0; k < ne; ++k) {
+			std::size_t i = elliptic[k];
+			M[k] = mean_motion[i] * std::fmod(time - time0[i], period[i]);
+			e[k] = ecc[i];
+		}
+		{
+			Trace::KeplerTimer timer(ne);
+			Kepler::solve_elliptic_many(M.data(), e.data(), E.data(), ne, stats);
+		}
+		for (std::size_t k = 0; k < ne; ++k) {
+			std::size_t i = elliptic[k];
+			double c = std::cos(E[k]), s = std::sin(E[k]);
+			rel_pos[i] = orient(i, maxis[i]*(c - ecc[i]), maxis[i]*minor[i]*s);
+			if (vel != nullptr) {
+				double dE = mean_motion[i] / (1 - ecc[i]*c);
+				rel_vel[i] = orient(i, -maxis[i]*s*dE, maxis[i]*minor[i]*c*dE);
+			}
+		}
+
+		// Hyperbolic orbits : x = a*(cosh(H) - e), y = -a*sqrt(e^2 - 1)*sinh(H)
+		std::size_t nh = hyperbolic.size();
+		M.resize(nh);
+		e.resize(nh);
+		std::vector<double> H(nh);
+		for (std::size_t k = 0; k < nh; ++k) {
+			std::size_t i = hyperbolic[k];
+			M[k] = mean_motion[i] * (time - time0[i]);
+			e[k] = ecc[i];
+		}
+		{
+			Trace::KeplerTimer timer(nh);
+			Kepler::solve_hyperbolic_many(M.data(), e.data(), H.data(), nh, stats);
+		}
+		for (std::size_t k = 0; k < nh; ++k) {
+			std::size_t i = hyperbolic[k];
+			double c = std::cosh(H[k]), s = std::sinh(H[k]);
+			rel_pos[i] = orient(i, maxis[i]*(c - ecc[i]), -maxis[i]*minor[i]*s);
+			if (vel != nullptr) {
+				double dH = mean_motion[i] / (ecc[i]*c - 1);
+				rel_vel[i] = orient(i, maxis[i]*s*dH, -maxis[i]*minor[i]*c*dH);
+			}
+		}
+
+		for (std::size_t i : order) {
+			switch (kind[i]) {
+				case OBJECT:
+					pos[i] = objects[i]->pos_at(time);
+					if (vel != nullptr) {
+						vel[i] = objects[i]->vel_at(time);
+					}
+					break;
+				case CHAIN:
+					pos[i] = planets[i]->Planet::pos_at(time);
+					if (vel != nullptr) {
+						vel[i] = planets[i]->Planet::vel_at(time);
+					}
+					break;
+				case TABLE:
+					if (vel == nullptr) {
+						pos[i] = pos[parent[i]] + planets[i]->rel_pos_at(time);
+					} else {
+						vec2 table_pos, table_vel;
+						planets[i]->rel_state_at(time, table_pos, table_vel);
+						pos[i] = pos[parent[i]] + table_pos;
+						vel[i] = vel[parent[i]] + table_vel;
+					}
+					break;
+				case ANCHORED:
+					pos[i] = anchor[i];
+					if (vel != nullptr) {
+						vel[i] = vec2(0, 0);
+					}
+					break;
+				default:
+					pos[i] = pos[parent[i]] + rel_pos[i];
+					if (vel != nullptr) {
+						vel[i] = vel[parent[i]] + (kind[i] == STILL ? vec2(0, 0) : rel_vel[i]);
+					}
+			}
+		}
+	}
+
+	// Sum of the attractions of `n` planets on an entity, from their positions and masses
+	static vec2 forces_on(vec2 const* planet_pos, double const* planet_mass, std::size_t n, vec2 const& at, double entity_mass) {
+		double fx = 0, fy = 0;
+		for (std::size_t i = 0; i < n; ++i) {
+			double rx = planet_pos[i].x - at.x;
+			double ry = planet_pos[i].y - at.y;
+			double d = std::sqrt(rx*rx + ry*ry);
+			double doff = d + GRAVITY_SINGULARITY_OFFSET;
+			double k = GRAVITY_CST * (entity_mass + planet_mass[i]) / (d*doff*doff);
+			fx += rx*k;
+			fy += ry*k;
+		}
+		return vec2(fx, fy);
+	}
+
+private:
+	// Same as Planet::orient, with the cached cosines and sines
+	vec2 orient(std::size_t i, double x, double y) const {
+		return vec2((x*cos_parg[i] - y*sin_parg[i]) * cos_incl[i], x*sin_parg[i] + y*cos_parg[i]);
+	}
+};
+
+#endif
@@ -1,11 +1,16 @@
 #include <pybind11/smart_holder.h>
 #include <pybind11/operators.h>
 #include <pybind11/stl.h>
+#include <pybind11/numpy.h>
 
 #include "vec2.hpp"
 #include "entity.hpp"
 #include "planet.hpp"
 #include "world.hpp"
+#include "kepler.hpp"
+#include "collisions.hpp"
+#include "trace.hpp"
+#include <optional>
 #include "trampoline.cpp"
 
 namespace py = pybind11;
@@ -14,7 +19,276 @@ PYBIND11_SMART_HOLDER_TYPE_CASTERS(Entity)
 PYBIND11_SMART_HOLDER_TYPE_CASTERS(ExplicitEntity)
 PYBIND11_SMART_HOLDER_TYPE_CASTERS(Planet)
 
+// numpy (n, 2) float64 arrays are reinterpreted as contiguous vec2 buffers
+static_assert(sizeof(vec2) == 2*sizeof(double), "vec2 must be tightly packed to alias numpy buffers");
+
+using times_array = py::array_t<double, py::array::c_style | py::array::forcecast>;
+using states_array = times_array;
+using vec2_array = py::array_t<double, py::array::c_style>;
+
+// Returns `out` if it is a writable C-contiguous float64 array of shape `shape`, or a newly allocated one if `out` is None
+vec2_array make_float64_array(py::object const& out, std::vector<py::ssize_t> const& shape) {
+	if (out.is_none()) {
+		return vec2_array(shape);
+	}
+	if (!vec2_array::check_(out)) {
+		throw std::invalid_argument("`out` must be a C-contiguous numpy array of dtype float64");
+	}
+	vec2_array arr = py::reinterpret_borrow<vec2_array>(out);
+	if (arr.ndim() != py::ssize_t(shape.size()) || !std::equal(shape.begin(), shape.end(), arr.shape())) {
+		std::string str;
+		for (py::ssize_t dim : shape) {
+			str += (str.empty() ? "" : ", ") + std::to_string(dim);
+		}
+		throw std::invalid_argument("`out` must have shape (" + str + ")");
+	}
+	if (!arr.writeable()) {
+		throw std::invalid_argument("`out` must be writeable");
+	}
+	return arr;
+}
+
+// Same for shape (*leading, 2)
+vec2_array make_vec2_array(py::object const& out, std::vector<py::ssize_t> shape) {
+	shape.push_back(2);
+	return make_float64_array(out, shape);
+}
+
+vec2_array make_vec2_array(py::object const& out, py::ssize_t n) {
+	return make_vec2_array(out, std::vector<py::ssize_t>{n});
+}
+
+vec2* vec2_data(vec2_array& arr) {
+	return reinterpret_cast<vec2*>(arr.mutable_data());
+}
+
+py::ssize_t times_count(times_array const& times) {
+	if (times.ndim() != 1) {
+		throw std::invalid_argument("`times` must be a one-dimensional array");
+	}
+	return times.shape(0);
+}
+
+// Releases the GIL for its lifetime if `python_free`. Python overrides re-acquire it by themselves in the trampolines,
+// but keeping it avoids a round trip per call when they are used
+class gil_release_if {
+	std::optional<py::gil_scoped_release> release;
+
+public:
+	explicit gil_release_if(bool python_free) {
+		if (python_free) {
+			release.emplace();
+		}
+	}
+};
+
+// Whether the position of `entity` can be computed without calling python
+bool python_free(ExplicitEntity const& entity) {
+	Planet const* planet = dynamic_cast<Planet const*>(&entity);
+	if (planet == nullptr) {
+		return false;
+	}
+	if (planet->orbit_checked) {
+		return !planet->custom_orbit;
+	}
+	return !py::get_override(planet, "pos_at") && !py::get_override(planet, "vel_at");
+}
+
+// Looks up once whether a python subclass overrides the orbital methods, so that c++ can skip the trampolines otherwise
+void check_orbit_overrides(Planet& planet) {
+	planet.custom_orbit = bool(py::get_override(static_cast<Planet const*>(&planet), "pos_at")) || bool(py::get_override(static_cast<Planet const*>(&planet), "vel_at"));
+	planet.orbit_checked = true;
+}
+
+bool python_free(World const& world) {
+	return !world.has_custom_orbits();
+}
+
+// (x, y, vx, vy) of each entity, as a (n, 4) array
+template <typename T>
+vec2_array states_of(std::vector<std::shared_ptr<T>> const& entities, py::object const& out) {
+	vec2_array ret = make_float64_array(out, {py::ssize_t(entities.size()), 4});
+	double* data = ret.mutable_data();
+	for (std::size_t i = 0; i < entities.size(); ++i) {
+		data[4*i] = entities[i]->pos.x;
+		data[4*i+1] = entities[i]->pos.y;
+		data[4*i+2] = entities[i]->vel.x;
+		data[4*i+3] = entities[i]->vel.y;
+	}
+	return ret;
+}
+
+vec2_array pos_at_many(ExplicitEntity const& entity, times_array const& times, py::object const& out) {
+	vec2_array ret = make_vec2_array(out, times_count(times));
+	vec2* data = vec2_data(ret);
+	gil_release_if nogil(python_free(entity));
+	entity.pos_at_many(times.data(), data, times.size());
+	return ret;
+}
+
+void set_time(World& world, double time) {
+	gil_release_if nogil(python_free(world));
+	world.set_time(time);
+}
+
+// World integrator settings, with the given overrides
+Integrator::Settings integrator_settings(World const& world, std::optional<std::string> const& method, std::optional<double> tolerance) {
+	Integrator::Settings settings = world.integrator;
+	if (method) {
+		Integrator::get(*method);
+		settings.method = *method;
+	}
+	if (tolerance) {
+		if (!(*tolerance > 0)) {
+			throw std::invalid_argument("integrator tolerance must be positive");
+		}
+		settings.tolerance = *tolerance;
+	}
+	return settings;
+}
+
+py::dict collision_dict(World::Collision const& collision) {
+	py::dict ret;
+	ret["entity"] = collision.entity;
+	ret["planet"] = collision.planet;
+	ret["time"] = collision.time;
+	ret["pos"] = collision.pos;
+	return ret;
+}
+
+py::dict kepler_stats_dict(Kepler::Stats const& stats) {
+	py::dict ret;
+	ret["solves"] = stats.solves;
+	ret["iterations"] = stats.iterations;
+	ret["max_iterations"] = stats.max_iterations;
+	ret["nonconverged"] = stats.nonconverged;
+	return ret;
+}
+
+py::dict world_stats_dict(World const& world) {
+	WorldCounters const& counters = world.counters;
+	unsigned long solves = counters.kepler_solves.load(std::memory_order_relaxed);
+	unsigned long iterations = counters.kepler_iterations.load(std::memory_order_relaxed);
+
+	py::dict kepler;
+	kepler["solves"] = solves;
+	kepler["iterations"] = iterations;
+	kepler["mean_iterations"] = solves > 0 ? double(iterations) / solves : 0.0;
+	kepler["max_iterations"] = counters.kepler_max_iterations.load(std::memory_order_relaxed);
+	kepler["nonconverged"] = counters.kepler_nonconverged.load(std::memory_order_relaxed);
+
+	py::dict pos_at;
+	pos_at["cpp"] = counters.pos_at_cpp.load(std::memory_order_relaxed);
+	pos_at["python"] = counters.pos_at_python.load(std::memory_order_relaxed);
+
+	py::dict ret;
+	ret["kepler"] = kepler;
+	ret["forces_on"] = counters.forces_on.load(std::memory_order_relaxed);
+	ret["pos_at"] = pos_at;
+	ret["steps"] = counters.steps.load(std::memory_order_relaxed);
+	ret["prediction_samples"] = counters.prediction_samples.load(std::memory_order_relaxed);
+	return ret;
+}
+
+// Solves the batch of Kepler equations given by `M` and `e` (either one per M, or a single one for all)
+template <void (*solve_many)(double const*, double const*, double*, std::size_t, Kepler::Stats*)>
+py::tuple solve_kepler_many(times_array const& M, times_array const& e) {
+	py::ssize_t n = times_count(M);
+	std::vector<double> e_broadcast;
+	double const* e_data = e.data();
+
+	if (e.size() == 1) {
+		e_broadcast.assign(n, *e.data());
+		e_data = e_broadcast.data();
+	} else if (e.ndim() != 1 || e.shape(0) != n) {
+		throw std::invalid_argument("`e` must be a scalar or have the same shape as `M`");
+	}
+
+	py::array_t<double> anomaly(n);
+	Kepler::Stats stats;
+	solve_many(M.data(), e_data, anomaly.mutable_data(), n, &stats);
+	return py::make_tuple(anomaly, kepler_stats_dict(stats));
+}
+
 PYBIND11_MODULE(cphysics, m) {
+	m.def(
+		"solve_kepler", &solve_kepler_many<Kepler::solve_elliptic_many>,
+		py::arg("M"),
+		py::arg("e"),
+		py::doc("Solves M = E - e*sin(E) for each mean anomaly M, returns the eccentric anomalies E and the iteration statistics")
+	);
+	m.def(
+		"solve_kepler_hyperbolic", &solve_kepler_many<Kepler::solve_hyperbolic_many>,
+		py::arg("M"),
+		py::arg("e"),
+		py::doc("Solves M = e*sinh(H) - H for each mean anomaly M, returns the hyperbolic anomalies H and the iteration statistics")
+	);
+
+	m.def(
+		"available_integrators",
+		[]() {
+			std::vector<std::string> names;
+			for (auto const& method : Integrator::methods()) {
+				names.push_back(method.first);
+			}
+			return names;
+		},
+		py::doc("Names of the integrators accepted by World.integrator and World.get_predictions")
+	);
+
+	m.def(
+		"trampoline_calls",
+		[]() {
+			py::dict ret;
+			ret["fast"] = trampoline_counters.fast.load();
+			ret["python_lookups"] = trampoline_counters.lookups.load();
+			ret["python_overrides"] = trampoline_counters.overrides.load();
+			return ret;
+		},
+		py::doc("Calls to pos_at and vel_at of python subclasses of Planet : straight to c++ (fast), looked up in python, and actually overridden")
+	);
+	m.def("reset_trampoline_calls", []() { trampoline_counters.reset(); });
+
+	m.def(
+		"set_tracing",
+		[](bool enabled) {
+			if (enabled) {
+				Trace::drain();
+			}
+			Trace::enabled = enabled;
+		},
+		py::arg("enabled"),
+		py::doc("Starts or stops recording the spans of the physics, see swingbye.tracing. Starting discards the spans left undrained")
+	);
+	m.def(
+		"drain_trace",
+		[]() {
+			std::vector<Trace::Event> events = Trace::drain();
+			py::list ret(events.size());
+			for (std::size_t i = 0; i < events.size(); ++i) {
+				Trace::Event const& event = events[i];
+				ret[i] = py::make_tuple(event.name, event.start, event.duration, event.thread, event.kepler_solves, event.kepler_duration);
+			}
+			return ret;
+		},
+		py::doc("Removes the recorded spans, as (name, start, duration, thread, kepler_solves, kepler_duration) tuples with times in ns of trace_clock()")
+	);
+	m.def("trace_clock", &Trace::now, py::doc("Clock of the spans, in ns"));
+	m.def("trace_thread_id", &Trace::thread_id, py::doc("Thread of the spans recorded by the calling thread"));
+
+	m.def("collide_disks", &Collisions::disk_disk, py::arg("pos1"), py::arg("radius1"), py::arg("pos2"), py::arg("radius2"));
+	m.def("collide_disk_point", &Collisions::disk_point, py::arg("pos"), py::arg("radius"), py::arg("point"));
+	m.def("collide_rect_point", &Collisions::rect_point, py::arg("pos"), py::arg("dims"), py::arg("point"));
+	m.def(
+		"time_of_impact",
+		[](vec2 const& from1, vec2 const& to1, double radius1, vec2 const& from2, vec2 const& to2, double radius2) -> py::object {
+			double s = Collisions::time_of_impact(from1, to1, radius1, from2, to2, radius2);
+			return s >= 0 ? py::object(py::float_(s)) : py::none();
+		},
+		py::arg("from1"), py::arg("to1"), py::arg("radius1"), py::arg("from2"), py::arg("to2"), py::arg("radius2"),
+		py::doc("Fraction of the step in [0, 1] at which two disks moving linearly first touch, or None if they don't")
+	);
+
 	py::class_<vec2>(m, "vec2")
 		.def_readwrite("x", &vec2::x)
 		.def_readwrite("y", &vec2::y)
@@ -61,6 +335,7 @@ PYBIND11_MODULE(cphysics, m) {
 		.def("_set_pos", &Entity::set_pos)
 		.def("_set_vel", &Entity::set_vel)
 		.def("_set_mass", &Entity::set_mass)
+		.def_property("radius", &Entity::get_radius, &Entity::set_radius, py::doc("Radius of the collision disk, 0 for a point"))
 		.def(py::init<>())
 		.def(
 			py::init<vec2, vec2, double>(),
@@ -80,24 +355,58 @@ PYBIND11_MODULE(cphysics, m) {
 		.def("_get_time", &ExplicitEntity::get_time)  // used for python property override
 		.def("_set_time", &ExplicitEntity::set_time)  // used for python property override
 		.def("pos_at", &ExplicitEntity::pos_at)
-		.def("vel_at", &ExplicitEntity::vel_at);
+		.def("vel_at", &ExplicitEntity::vel_at)
+		.def(
+			"pos_at_many", &pos_at_many,
+			py::arg("times"),
+			py::arg("out") = py::none(),
+			py::doc("Positions at each of `times`, as a (n, 2) array. Fills `out` instead of allocating if provided")
+		);
 
 	py::classh<Planet, PyPlanet, ExplicitEntity, Entity>(m, "Planet")
 		.def_property_readonly("pos", &Planet::get_pos)
 		.def_property_readonly("vel", &Planet::get_vel)
-		.def_readwrite("mass", &Planet::mass)
-		.def_readwrite("maxis", &Planet::maxis)
-		.def_readwrite("ecc", &Planet::ecc)
-		.def_readwrite("time0", &Planet::time0)
-		.def_readwrite("incl", &Planet::incl)
-		.def_readwrite("parg", &Planet::parg)
-		.def_readwrite("anchor", &Planet::anchor)
+		.def_property("mass", &Planet::get_mass, &Planet::set_mass)
+		.def_property("maxis", &Planet::get_maxis, &Planet::set_maxis)
+		.def_property("ecc", &Planet::get_ecc, &Planet::set_ecc)
+		.def_property("time0", &Planet::get_time0, &Planet::set_time0)
+		.def_property("incl", &Planet::get_incl, &Planet::set_incl)
+		.def_property("parg", &Planet::get_parg, &Planet::set_parg)
+		.def_property("anchor", &Planet::get_anchor, &Planet::set_anchor)
 		.def_property("time", &Planet::get_time, &Planet::set_time)
 		.def("_get_time", &Planet::get_time)  // used for python property override
 		.def("_set_time", &Planet::set_time)  // used for python property override
 		.def("pos_at", &Planet::pos_at)
 		.def("rel_pos_at", &Planet::rel_pos_at)
+		.def(
+			"pos_at_many", &pos_at_many,
+			py::arg("times"),
+			py::arg("out") = py::none(),
+			py::doc("Positions at each of `times`, as a (n, 2) array. Fills `out` instead of allocating if provided")
+		)
+		.def(
+			"rel_pos_at_many",
+			[](Planet const& planet, times_array const& times, py::object const& out) {
+				vec2_array ret = make_vec2_array(out, times_count(times));
+				vec2* data = vec2_data(ret);
+				gil_release_if nogil(true);
+				planet.rel_pos_at_many(times.data(), data, times.size());
+				return ret;
+			},
+			py::arg("times"),
+			py::arg("out") = py::none(),
+			py::doc("Positions relative to the parent at each of `times`, as a (n, 2) array. Fills `out` instead of allocating if provided")
+		)
 		.def("vel_at", &Planet::vel_at)
+		.def("rel_vel_at", &Planet::rel_vel_at)
+		.def_property(
+			"ephemeris_tolerance", &Planet::get_table_tolerance, &Planet::set_table_tolerance,
+			py::doc("Maximum error of the interpolated ephemeris of elliptic orbits, or 0 to always solve Kepler's equation")
+		)
+		.def_property_readonly(
+			"ephemeris_table_size", &Planet::get_table_size,
+			py::doc("Number of interpolation segments over one period, or 0 if no table was built")
+		)
 		.def("set_parent", &Planet::set_parent)
 		.def("rm_parent", &Planet::rm_parent)
 		.def(py::init<>())
@@ -136,14 +445,224 @@ PYBIND11_MODULE(cphysics, m) {
 			},
 			py::doc("A list of entities references, identical in memory to get_entity(index)")
 		)
-		.def_property("time", &World::get_time, &World::set_time)
+		.def_property("time", &World::get_time, &set_time)
 		.def("_get_time", &World::get_time)  // used for python property override
-		.def("_set_time", &World::set_time)  // used for python property override
+		.def("_set_time", &set_time)  // used for python property override
+		.def_property(
+			"ephemeris_cache_capacity",
+			[](World const& world) { return world.ephemeris_cache.get_capacity(); },
+			[](World& world, std::size_t capacity) { world.ephemeris_cache.set_capacity(capacity); },
+			py::doc("Maximum number of timestamps for which planet positions are cached")
+		)
+		.def_property_readonly("ephemeris_cache_size", [](World const& world) { return world.ephemeris_cache.size(); })
+		.def_property_readonly("ephemeris_cache_hits", [](World const& world) { return world.ephemeris_cache.hits; })
+		.def_property_readonly("ephemeris_cache_misses", [](World const& world) { return world.ephemeris_cache.misses; })
+		.def("reset_ephemeris_cache_stats", [](World& world) { world.ephemeris_cache.reset_stats(); })
+		.def(
+			"stats", &world_stats_dict,
+			py::doc("Work done since the last reset_stats : Kepler solves of the planet orbits, force evaluations, planet positions computed in c++ or by python overrides, steps of the entities and predicted samples")
+		)
+		.def("reset_stats", [](World& world) { world.counters.reset(); })
+		.def("invalidate_ephemeris", &World::invalidate_ephemeris)
+		.def(
+			"set_ephemeris_tolerance", &World::set_ephemeris_tolerance,
+			py::arg("tolerance"),
+			py::doc("Sets the ephemeris_tolerance of all planets, 0 disables the interpolated ephemerides")
+		)
 		.def("forces_on", &World::forces_on)
-		.def("step", &World::step)
+		.def_property(
+			"integrator",
+			[](World const& world) { return world.integrator.method; },
+			[](World& world, std::string const& method) { world.set_integrator(method, world.integrator.tolerance); },
+			py::doc("Name of the integrator used by step and by default for the predictions, see available_integrators()")
+		)
+		.def_property(
+			"integrator_tolerance",
+			[](World const& world) { return world.integrator.tolerance; },
+			[](World& world, double tolerance) { world.set_integrator(world.integrator.method, tolerance); },
+			py::doc("Relative error tolerance of the adaptive integrators")
+		)
+		.def_property(
+			"barnes_hut_theta",
+			[](World const& world) { return world.barnes_hut_theta; },
+			&World::set_barnes_hut_theta,
+			py::doc("Opening angle of the Barnes-Hut force evaluation, 0 (default) for the direct sum")
+		)
+		.def(
+			"planet_states",
+			[](World const& world, py::object const& out) { return states_of(world.planets_ptr, out); },
+			py::arg("out") = py::none(),
+			py::doc("Current (x, y, vx, vy) of all planets as a (n, 4) array, filling `out` instead of allocating if provided")
+		)
+		.def(
+			"entity_states",
+			[](World const& world, py::object const& out) { return states_of(world.entities_ptr, out); },
+			py::arg("out") = py::none(),
+			py::doc("Current (x, y, vx, vy) of all entities as a (m, 4) array, filling `out` instead of allocating if provided")
+		)
+		.def(
+			"step",
+			[](World& world, double dt) {
+				gil_release_if nogil(python_free(world));
+				world.step(dt);
+			},
+			py::arg("dt")
+		)
+		.def(
+			"tick",
+			[](World& world, double dt, unsigned int n, bool collisions) {
+				World::TickResult result;
+				{
+					gil_release_if nogil(python_free(world));
+					result = world.tick(dt, n, collisions);
+				}
+
+				py::array_t<double> energy({py::ssize_t(result.steps), py::ssize_t(2)});
+				auto e = energy.mutable_unchecked<2>();
+				for (unsigned int i = 0; i < result.steps; ++i) {
+					e(i, 0) = result.kinetic[i];
+					e(i, 1) = result.potential[i];
+				}
+
+				py::dict ret;
+				ret["steps"] = result.steps;
+				ret["time"] = world.get_time();
+				ret["states"] = states_of(world.entities_ptr, py::none());
+				ret["energy"] = energy;
+				ret["collision"] = result.collision ? py::object(collision_dict(*result.collision)) : py::none();
+				return ret;
+			},
+			py::arg("dt"),
+			py::arg("n"),
+			py::arg("collisions") = true,
+			py::doc("Runs up to `n` steps of `dt`, stopping at the first collision between an entity and a planet if `collisions` is set. Returns a dict with the number of `steps` run, the final `time`, the final entity `states` as a (m, 4) array of (x, y, vx, vy), the (kinetic, potential) `energy` after each step as a (steps, 2) array, and the first `collision` (entity and planet indices, time and position of impact) or None. Collisions are swept along the steps, so fast entities cannot tunnel through small planets")
+		)
+		.def("planets_at", &World::planets_at, py::arg("point"), py::doc("Indices of the planets whose disk contains `point`, in order"))
+		.def(
+			"planets_in_disk", &World::planets_in_disk,
+			py::arg("center"),
+			py::arg("radius"),
+			py::doc("Indices of the planets whose disk overlaps the disk of `center` and `radius`, in order. Raises ValueError if `radius` is not finite")
+		)
+		.def(
+			"raycast", &World::raycast,
+			py::arg("origin"),
+			py::arg("direction"),
+			py::arg("max_distance") = std::numeric_limits<double>::infinity(),
+			py::doc("(index, distance) of the first planet hit by the ray from `origin` along `direction` within `max_distance`, or None")
+		)
+		.def(
+			"sweep",
+			[](World const& world, vec2 const& from, vec2 const& to, double radius, double t0, double t1) -> py::object {
+				std::optional<World::Collision> collision = world.sweep(from, to, radius, t0, t1);
+				if (!collision) {
+					return py::none();
+				}
+				py::dict ret = collision_dict(*collision);
+				ret.attr("pop")("entity");
+				return ret;
+			},
+			py::arg("from_"),
+			py::arg("to"),
+			py::arg("radius"),
+			py::arg("t0"),
+			py::arg("t1"),
+			py::doc("Earliest collision with a planet of a disk moving linearly from `from_` at `t0` to `to` at `t1`, as a dict with the `planet` index, `time` and `pos` of impact, or None")
+		)
+		.def(
+			"predict_collision",
+			[](World const& world, Entity const& entity, double t_from, double t_to, unsigned int n, py::object const& out, std::optional<std::string> const& integrator, std::optional<double> tolerance) -> py::tuple {
+				Integrator::Settings settings = integrator_settings(world, integrator, tolerance);
+				vec2_array ret = make_vec2_array(out, n);
+				vec2* data = vec2_data(ret);
+				std::optional<std::pair<unsigned int, World::Collision>> collision;
+				{
+					gil_release_if nogil(python_free(world));
+					world.get_predictions(entity, t_from, t_to, n, data, settings);
+					collision = world.sweep_predictions(entity, t_from, (t_to-t_from) / n, n, data);
+				}
+				if (!collision) {
+					return py::make_tuple(ret, py::none());
+				}
+				py::dict dict = collision_dict(collision->second);
+				dict.attr("pop")("entity");
+				dict["sample"] = collision->first;
+				return py::make_tuple(ret, dict);
+			},
+			py::arg("entity"),
+			py::arg("t_from"),
+			py::arg("t_to"),
+			py::arg("n"),
+			py::arg("out") = py::none(),
+			py::arg("integrator") = py::none(),
+			py::arg("tolerance") = py::none(),
+			py::doc("Like get_predictions, also returning the first collision of `entity` with a planet along the predicted path as a dict with the `sample` ending the segment of impact, the `planet` index, `time` and `pos` of impact, or None")
+		)
 		.def("kinetic_energy", &World::kinetic_energy)
 		.def("potential_energy", &World::potential_energy)
-		.def("get_predictions", &World::get_predictions)
+		.def(
+			"get_predictions",
+			[](World const& world, Entity const& entity, double t_from, double t_to, unsigned int n, py::object const& out, std::optional<std::string> const& integrator, std::optional<double> tolerance) {
+				Integrator::Settings settings = integrator_settings(world, integrator, tolerance);
+				vec2_array ret = make_vec2_array(out, n);
+				vec2* data = vec2_data(ret);
+				gil_release_if nogil(python_free(world));
+				world.get_predictions(entity, t_from, t_to, n, data, settings);
+				return ret;
+			},
+			py::arg("entity"),
+			py::arg("t_from"),
+			py::arg("t_to"),
+			py::arg("n"),
+			py::arg("out") = py::none(),
+			py::arg("integrator") = py::none(),
+			py::arg("tolerance") = py::none(),
+			py::doc("Predicted positions of `entity`, as a (n, 2) array. Fills `out` instead of allocating if provided. `integrator` and `tolerance` override the world settings for this call")
+		)
+		.def(
+			"propagate",
+			[](World const& world, Entity& entity, double t_from, double dt, unsigned int n, py::object const& out, std::optional<std::string> const& integrator, std::optional<double> tolerance) {
+				Integrator::Settings settings = integrator_settings(world, integrator, tolerance);
+				vec2_array ret = make_vec2_array(out, n);
+				vec2* data = vec2_data(ret);
+				gil_release_if nogil(python_free(world));
+				world.propagate(entity, t_from, dt, n, data, settings);
+				return ret;
+			},
+			py::arg("entity"),
+			py::arg("t_from"),
+			py::arg("dt"),
+			py::arg("n"),
+			py::arg("out") = py::none(),
+			py::arg("integrator") = py::none(),
+			py::arg("tolerance") = py::none(),
+			py::doc("Integrates `entity` in place over `n` steps of `dt` from `t_from` as `step` would, adaptive integrators included, returns its positions after each step as a (n, 2) array. Fills `out` instead of allocating if provided")
+		)
+		.def(
+			"get_predictions_batch",
+			[](World const& world, states_array const& states, double t_from, double t_to, unsigned int n, double mass, py::object const& out, std::optional<std::string> const& integrator, std::optional<double> tolerance, unsigned int threads) {
+				if (states.ndim() != 2 || states.shape(1) != 4) {
+					throw std::invalid_argument("`states` must have shape (k, 4)");
+				}
+				Integrator::Settings settings = integrator_settings(world, integrator, tolerance);
+				py::ssize_t k = states.shape(0);
+				vec2_array ret = make_vec2_array(out, {k, py::ssize_t(n)});
+				vec2* data = vec2_data(ret);
+				gil_release_if nogil(python_free(world));
+				world.get_predictions_batch(reinterpret_cast<vec2 const*>(states.data()), k, mass, t_from, t_to, n, data, settings, threads);
+				return ret;
+			},
+			py::arg("states"),
+			py::arg("t_from"),
+			py::arg("t_to"),
+			py::arg("n"),
+			py::arg("mass") = 1.0,
+			py::arg("out") = py::none(),
+			py::arg("integrator") = py::none(),
+			py::arg("tolerance") = py::none(),
+			py::arg("threads") = 1,
+			py::doc("Predicted positions of the entities whose initial states are the rows (x, y, vx, vy) of `states`, as a (k, n, 2) array. The trajectories share the planet positions, and are split over `threads` threads (0 for one per core)")
+		)
 		.def(
 			"get_planet",
 			&World::get_planet
@@ -158,7 +677,13 @@ PYBIND11_MODULE(cphysics, m) {
 			py::arg("parg") = 0.0,
 			py::arg("anchor") = vec2(0, 0)
 		)
-		.def("add_planet_existing", &World::add_planet_existing)
+		.def(
+			"add_planet_existing",
+			[](World& world, std::shared_ptr<Planet> planet) {
+				check_orbit_overrides(*planet);
+				world.add_planet_existing(planet);
+			}
+		)
 		.def("rm_planet", &World::rm_planet)
 		.def(
 			"get_entity",
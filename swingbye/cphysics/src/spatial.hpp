@@ -0,0 +1,229 @@
+#ifndef __SPATIAL_HPP__
+#define __SPATIAL_HPP__
+
+#include "vec2.hpp"
+#include <algorithm>
+#include <cmath>
+#include <cstdint>
+#include <limits>
+#include <optional>
+#include <stdexcept>
+#include <unordered_map>
+#include <utility>
+#include <vector>
+
+// Uniform grid over disks, answering point, disk and ray queries without scanning all of them.
+// Each disk is registered in every cell its bounding box overlaps
+class SpatialGrid {
+	double cell = 1.0;
+	vec2 lower, upper;  // bounding box of all the disks
+	std::vector<vec2> centers;
+	std::vector<double> radii;
+	std::unordered_map<std::uint64_t, std::vector<std::size_t>> cells;
+
+	long long coord(double x) const {
+		return static_cast<long long>(std::floor(x / cell));
+	}
+
+	static std::uint64_t key(long long ix, long long iy) {
+		return (static_cast<std::uint64_t>(ix) << 32) ^ static_cast<std::uint32_t>(iy);
+	}
+
+	std::vector<std::size_t> const* at(long long ix, long long iy) const {
+		auto it = cells.find(key(ix, iy));
+		return it == cells.end() ? nullptr : &it->second;
+	}
+
+	static void sort_unique(std::vector<std::size_t>& indices) {
+		std::sort(indices.begin(), indices.end());
+		indices.erase(std::unique(indices.begin(), indices.end()), indices.end());
+	}
+
+public:
+	void build(std::vector<vec2> const& centers_, std::vector<double> const& radii_) {
+		centers = centers_;
+		radii = radii_;
+		cells.clear();
+		if (centers.empty()) {
+			return;
+		}
+
+		lower = upper = centers[0];
+		double diameters = 0.0;
+		for (std::size_t i = 0; i < centers.size(); ++i) {
+			lower.x = std::min(lower.x, centers[i].x - radii[i]);
+			lower.y = std::min(lower.y, centers[i].y - radii[i]);
+			upper.x = std::max(upper.x, centers[i].x + radii[i]);
+			upper.y = std::max(upper.y, centers[i].y + radii[i]);
+			diameters += 2*radii[i];
+		}
+
+		// About one disk per cell : cells as large as the disks, or as the share of the area of each disk if they are sparse
+		double area = (upper.x - lower.x) * (upper.y - lower.y);
+		cell = std::max(diameters / centers.size(), std::sqrt(area / centers.size()));
+		if (!(cell > 0)) {
+			cell = 1.0;
+		}
+
+		for (std::size_t i = 0; i < centers.size(); ++i) {
+			for (long long ix = coord(centers[i].x - radii[i]); ix <= coord(centers[i].x + radii[i]); ++ix) {
+				for (long long iy = coord(centers[i].y - radii[i]); iy <= coord(centers[i].y + radii[i]); ++iy) {
+					cells[key(ix, iy)].push_back(i);
+				}
+			}
+		}
+	}
+
+	// Indices (sorted) of the disks containing `point`
+	std::vector<std::size_t> query_point(vec2 const& point) const {
+		std::vector<std::size_t> ret;
+		// also false for non-finite points, whose cell coordinates are undefined
+		bool inside = point.x >= lower.x && point.x <= upper.x && point.y >= lower.y && point.y <= upper.y;
+		if (centers.empty() || !inside) {
+			return ret;
+		}
+		std::vector<std::size_t> const* candidates = at(coord(point.x), coord(point.y));
+		if (candidates != nullptr) {
+			for (std::size_t i : *candidates) {
+				if ((centers[i] - point).length() <= radii[i]) {
+					ret.push_back(i);
+				}
+			}
+		}
+		std::sort(ret.begin(), ret.end());
+		return ret;
+	}
+
+	// Indices (sorted) of the disks overlapping the disk of `center` and `radius`
+	std::vector<std::size_t> query_disk(vec2 const& center, double radius) const {
+		if (!std::isfinite(radius)) {
+			throw std::invalid_argument("query radius must be finite");
+		}
+		std::vector<std::size_t> ret;
+		if (centers.empty() || !std::isfinite(center.x) || !std::isfinite(center.y)) {
+			return ret;
+		}
+		auto overlaps = [&](std::size_t i) { return (centers[i] - center).length() <= radii[i] + radius; };
+
+		// Only the cells within the bounding box of the disks can hold any, clipped before converting to cell coordinates
+		// so that large radii neither overflow them nor visit empty cells
+		double x0 = std::max(center.x - radius, lower.x), x1 = std::min(center.x + radius, upper.x);
+		double y0 = std::max(center.y - radius, lower.y), y1 = std::min(center.y + radius, upper.y);
+		if (x0 > x1 || y0 > y1) {
+			return ret;
+		}
+		long long ix0 = coord(x0), ix1 = coord(x1), iy0 = coord(y0), iy1 = coord(y1);
+
+		// A scan of all the disks is cheaper than visiting more cells than there are disks
+		if (static_cast<double>(ix1 - ix0 + 1) * static_cast<double>(iy1 - iy0 + 1) > centers.size()) {
+			for (std::size_t i = 0; i < centers.size(); ++i) {
+				if (overlaps(i)) {
+					ret.push_back(i);
+				}
+			}
+			return ret;
+		}
+
+		for (long long ix = ix0; ix <= ix1; ++ix) {
+			for (long long iy = iy0; iy <= iy1; ++iy) {
+				std::vector<std::size_t> const* candidates = at(ix, iy);
+				if (candidates == nullptr) {
+					continue;
+				}
+				for (std::size_t i : *candidates) {
+					if (overlaps(i)) {
+						ret.push_back(i);
+					}
+				}
+			}
+		}
+		sort_unique(ret);
+		return ret;
+	}
+
+	// First disk hit by the ray from `origin` along `direction`, within `max_distance`, with the distance to the hit
+	std::optional<std::pair<std::size_t, double>> raycast(vec2 const& origin, vec2 const& direction, double max_distance) const {
+		double length = direction.length();
+		if (centers.empty() || length == 0) {
+			return std::nullopt;
+		}
+		vec2 d = direction / length;
+
+		// Clip the ray to the bounding box of the disks (slab test)
+		double t_enter = 0.0;
+		double t_exit = max_distance;
+		for (int axis = 0; axis < 2; ++axis) {
+			double o = axis == 0 ? origin.x : origin.y;
+			double v = axis == 0 ? d.x : d.y;
+			double lo = axis == 0 ? lower.x : lower.y;
+			double hi = axis == 0 ? upper.x : upper.y;
+			if (v == 0) {
+				if (o < lo || o > hi) {
+					return std::nullopt;
+				}
+				continue;
+			}
+			double t0 = (lo - o) / v;
+			double t1 = (hi - o) / v;
+			t_enter = std::max(t_enter, std::min(t0, t1));
+			t_exit = std::min(t_exit, std::max(t0, t1));
+		}
+		if (t_enter > t_exit) {
+			return std::nullopt;
+		}
+
+		// Walk the cells along the ray (Amanatides & Woo), a hit found in a cell is the first one once the ray leaves it
+		vec2 start = origin + d*t_enter;
+		long long ix = coord(start.x);
+		long long iy = coord(start.y);
+		long long step_x = d.x > 0 ? 1 : -1;
+		long long step_y = d.y > 0 ? 1 : -1;
+		double inf = std::numeric_limits<double>::infinity();
+		double delta_x = d.x != 0 ? cell / std::abs(d.x) : inf;
+		double delta_y = d.y != 0 ? cell / std::abs(d.y) : inf;
+		double next_x = d.x != 0 ? t_enter + ((d.x > 0 ? (ix+1)*cell : ix*cell) - start.x) / d.x : inf;
+		double next_y = d.y != 0 ? t_enter + ((d.y > 0 ? (iy+1)*cell : iy*cell) - start.y) / d.y : inf;
+
+		std::optional<std::pair<std::size_t, double>> best;
+		while (true) {
+			std::vector<std::size_t> const* candidates = at(ix, iy);
+			if (candidates != nullptr) {
+				for (std::size_t i : *candidates) {
+					vec2 oc = origin - centers[i];
+					double b = oc.x*d.x + oc.y*d.y;
+					double c = oc.x*oc.x + oc.y*oc.y - radii[i]*radii[i];
+					double t;
+					if (c <= 0) {
+						t = 0.0;
+					} else if (b > 0 || b*b - c < 0) {
+						continue;
+					} else {
+						t = -b - std::sqrt(b*b - c);
+					}
+					if (t <= max_distance && (!best || t < best->second || (t == best->second && i < best->first))) {
+						best = std::make_pair(i, t);
+					}
+				}
+			}
+
+			double t_cell_exit = std::min(next_x, next_y);
+			if ((best && best->second <= t_cell_exit) || t_cell_exit > t_exit) {
+				break;
+			}
+			if (next_x < next_y) {
+				ix += step_x;
+				next_x += delta_x;
+			} else {
+				iy += step_y;
+				next_y += delta_y;
+			}
+		}
+
+		return best;
+	}
+
+	double get_cell() const { return cell; }
+	std::size_t cell_count() const { return cells.size(); }
+};
+
+#endif
@@ -0,0 +1,114 @@
+#ifndef __TRACE_HPP__
+#define __TRACE_HPP__
+
+#include <atomic>
+#include <chrono>
+#include <cstdint>
+#include <functional>
+#include <mutex>
+#include <thread>
+#include <vector>
+
+// Spans of the physics for the trace files of `swingbye.tracing`, off unless tracing. Spans are buffered in memory
+// until python drains them. Kepler solves are too short and too many to be recorded one by one : their time is summed
+// per innermost span, written as a 'Kepler' child span if the span has no children, else as arguments of the span
+namespace Trace {
+	struct Event {
+		char const* name;
+		std::int64_t start;  // in ns, see `now`
+		std::int64_t duration;
+		std::uint64_t thread;
+		unsigned long kepler_solves;  // aggregated into this span
+		std::int64_t kepler_duration;
+	};
+
+	inline std::atomic<bool> enabled{false};
+	inline std::mutex events_mutex;
+	inline std::vector<Event> events;
+
+	inline std::int64_t now() {
+		return std::chrono::duration_cast<std::chrono::nanoseconds>(std::chrono::steady_clock::now().time_since_epoch()).count();
+	}
+
+	inline std::uint64_t thread_id() {
+		thread_local std::uint64_t id = std::hash<std::thread::id>()(std::this_thread::get_id());
+		return id;
+	}
+
+	inline std::vector<Event> drain() {
+		std::vector<Event> drained;
+		std::lock_guard<std::mutex> lock(events_mutex);
+		drained.swap(events);
+		return drained;
+	}
+
+	class Span;
+	inline thread_local Span* current = nullptr;  // innermost open span of the thread
+
+	class Span {
+		char const* name;
+		std::int64_t start = -1;
+		Span* parent = nullptr;
+		bool children = false;
+
+	public:
+		unsigned long kepler_solves = 0;
+		std::int64_t kepler_duration = 0;
+
+		explicit Span(char const* name) : name(name) {
+			if (!enabled.load(std::memory_order_relaxed)) {
+				return;
+			}
+			parent = current;
+			if (parent != nullptr) {
+				parent->children = true;
+			}
+			current = this;
+			start = now();
+		}
+
+		~Span() {
+			if (start < 0) {
+				return;
+			}
+			std::int64_t end = now();
+			current = parent;
+
+			std::lock_guard<std::mutex> lock(events_mutex);
+			if (kepler_solves > 0 && !children) {
+				events.push_back(Event{name, start, end - start, thread_id(), 0, 0});
+				events.push_back(Event{"Kepler", start, kepler_duration, thread_id(), kepler_solves, kepler_duration});
+			} else {
+				events.push_back(Event{name, start, end - start, thread_id(), kepler_solves, kepler_duration});
+			}
+		}
+
+		Span(Span const&) = delete;
+		Span& operator=(Span const&) = delete;
+	};
+
+	// Adds the time of a batch of `solves` Kepler solves to the innermost span, if any
+	class KeplerTimer {
+		std::int64_t start = -1;
+		unsigned long solves;
+
+	public:
+		explicit KeplerTimer(unsigned long solves) : solves(solves) {
+			if (current != nullptr && solves > 0) {
+				start = now();
+			}
+		}
+
+		~KeplerTimer() {
+			if (start >= 0) {
+				current->kepler_solves += solves;
+				current->kepler_duration += now() - start;
+			}
+		}
+
+		KeplerTimer(KeplerTimer const&) = delete;
+		KeplerTimer& operator=(KeplerTimer const&) = delete;
+	};
+}
+
+#endif
@@ -4,6 +4,7 @@
 #include "entity.hpp"
 #include "planet.hpp"
 #include <pybind11/smart_holder.h>
+#include <atomic>
 
 // we need a trampoline class to bridge polymorphism with python
 // https://pybind11.readthedocs.io/en/stable/advanced/classes.html#operator-overloading
@@ -12,6 +13,21 @@
 
 namespace py = pybind11;
 
+// Calls to the orbital methods of python subclasses of Planet, by the path they took
+struct TrampolineCounters {
+	std::atomic<unsigned long> fast{0};       // known not to be overridden, straight to the c++ method
+	std::atomic<unsigned long> lookups{0};    // looked up in python, with the GIL
+	std::atomic<unsigned long> overrides{0};  // of which found and called a python override
+
+	void reset() {
+		fast = 0;
+		lookups = 0;
+		overrides = 0;
+	}
+};
+
+inline TrampolineCounters trampoline_counters;
+
 class PyEntity : public Entity, public py::trampoline_self_life_support {
 public:
 	using Entity::Entity;
@@ -47,11 +63,55 @@ public:
 	}
 
 	virtual vec2 pos_at(double time) const override {
-		PYBIND11_OVERRIDE(vec2, Planet, pos_at, time);
+		if (orbit_checked && !custom_orbit) {
+			trampoline_counters.fast += 1;
+			return Planet::pos_at(time);
+		}
+		return call_override("pos_at", time, [&]() { return Planet::pos_at(time); });
 	}
 
 	virtual vec2 vel_at(double time) const override {
-		PYBIND11_OVERRIDE(vec2, Planet, vel_at, time);
+		if (orbit_checked && !custom_orbit) {
+			trampoline_counters.fast += 1;
+			return Planet::vel_at(time);
+		}
+		return call_override("vel_at", time, [&]() { return Planet::vel_at(time); });
+	}
+
+	// Planet::pos_at_many solves the orbits without calling pos_at, so a python override of pos_at is looked up once
+	// here and called for each time
+	virtual void pos_at_many(double const* times, vec2* out, std::size_t n) const override {
+		if (orbit_checked && !custom_orbit) {
+			trampoline_counters.fast += 1;
+		} else {
+			py::gil_scoped_acquire gil;
+			trampoline_counters.lookups += 1;
+			py::function override = py::get_override(static_cast<Planet const*>(this), "pos_at");
+			if (override) {
+				trampoline_counters.overrides += 1;
+				for (std::size_t i = 0; i < n; ++i) {
+					out[i] = override(times[i]).cast<vec2>();
+				}
+				return;
+			}
+		}
+		Planet::pos_at_many(times, out, n);
+	}
+
+private:
+	// Same as PYBIND11_OVERRIDE, counting the lookups. `base` calls the c++ method non-virtually
+	template <typename Base>
+	vec2 call_override(char const* name, double time, Base base) const {
+		{
+			py::gil_scoped_acquire gil;
+			trampoline_counters.lookups += 1;
+			py::function override = py::get_override(static_cast<Planet const*>(this), name);
+			if (override) {
+				trampoline_counters.overrides += 1;
+				return override(time).cast<vec2>();
+			}
+		}
+		return base();
 	}
 };
 
@@ -6,10 +6,27 @@
 #include "entity.hpp"
 #include "planet.hpp"
 #include "integrator.hpp"
+#include "ephemeris.hpp"
+#include "collisions.hpp"
+#include "spatial.hpp"
+#include "planetarrays.hpp"
+#include "counters.hpp"
+#include "trace.hpp"
 #include <vector>
 #include <string>
 #include <memory>
+#include <numeric>
+#include <algorithm>
+#include <unordered_map>
+#include <stdexcept>
+#include <thread>
+#include <mutex>
+#include <optional>
 
+// Threads : the const methods (forces, ephemerides, predictions) may run on other threads while one thread steps the
+// world or sets its time, they only read immutable snapshots of the planet arrays and ephemerides. The planet objects
+// themselves are shared, so editing the planets (elements, radii, adding or removing some) while another thread
+// reads the world is not supported
 class World {
 	double time = 0.0;
 
@@ -17,35 +34,280 @@ public:
 	std::vector<std::shared_ptr<ExplicitEntity>> planets_ptr;
 	std::vector<std::shared_ptr<Entity>> entities_ptr;
 
+	// Planet states shared by the force evaluations, the time setter and the predictions
+	mutable EphemerisCache ephemeris_cache;
+
+	// Orbital elements and hierarchy of the planets in contiguous arrays, mirrored from the planets when they change.
+	// Planets are evaluated parents first, so that each orbit is solved once per time. The arrays are immutable once
+	// published : a change builds new ones under the mutex, and readers keep using the snapshot they got
+	mutable std::shared_ptr<PlanetArrays const> planet_arrays = std::make_shared<PlanetArrays const>();
+	mutable unsigned long planet_arrays_epoch = 0;  // Planet::elements_epoch when the arrays were built
+	mutable bool hierarchy_dirty = true;
+	mutable std::mutex hierarchy_mutex;
+
+	// Planet disks at the current time, rebuilt lazily after the time, the orbits or the radii change
+	mutable SpatialGrid planet_grid;
+	mutable bool planet_grid_dirty = true;
+	mutable unsigned long planet_grid_epochs[2] = {0, 0};
+	mutable std::mutex planet_grid_mutex;
+
+	// Integrator used by `step`, and by default for the predictions
+	Integrator::Settings integrator;
+
+	// Opening angle of the Barnes-Hut force evaluation, 0 for the direct sum over all planets
+	double barnes_hut_theta = 0.0;
+	// Incremented when the forces change other than through the planet elements, see Integrator::forces_version
+	std::atomic<unsigned long> forces_generation{0};
+
+	// Work done since the last reset, see `stats` in pybind.cpp
+	mutable WorldCounters counters;
+
 	World() = default;
 
 	void step(double dt) {
+		Trace::Span span("World.step");
 		for (std::shared_ptr<Entity>& entity_ptr : entities_ptr) {
-			// TODO : un-hardcode the integrator
-			Integrator::RK4(*entity_ptr, *this, &World::forces_on, time, dt);
+			advance(*entity_ptr, time, dt, integrator);
 		}
+		WorldCounters::add(counters.steps, entities_ptr.size());
 		set_time(time + dt);
 	}
 
+	struct Collision {
+		std::size_t entity;
+		std::size_t planet;
+		double time;
+		vec2 pos;  // of the entity at the time of impact
+	};
+
+	struct TickResult {
+		unsigned int steps = 0;
+		std::optional<Collision> collision;
+		// Sampled after each step
+		std::vector<double> kinetic, potential;
+	};
+
+	// Runs up to `n` steps of `dt`, stopping at the first step during which an entity hits a planet if `collisions` is set
+	TickResult tick(double dt, unsigned int n, bool collisions = true) {
+		Trace::Span span("World.tick");
+		TickResult result;
+		result.kinetic.reserve(n);
+		result.potential.reserve(n);
+		std::vector<vec2> from(entities_ptr.size());
+
+		for (unsigned int i = 0; i < n; ++i) {
+			double t0 = time;
+			for (std::size_t k = 0; k < entities_ptr.size(); ++k) {
+				from[k] = entities_ptr[k]->pos;
+			}
+
+			step(dt);
+			result.steps += 1;
+			result.kinetic.push_back(kinetic_energy());
+			result.potential.push_back(potential_energy());
+
+			if (!collisions) {
+				continue;
+			}
+			for (std::size_t k = 0; k < entities_ptr.size() && !result.collision; ++k) {
+				result.collision = sweep(from[k], entities_ptr[k]->pos, entities_ptr[k]->radius, t0, time);
+				if (result.collision) {
+					result.collision->entity = k;
+				}
+			}
+			if (result.collision) {
+				break;
+			}
+		}
+
+		return result;
+	}
+
+	// Earliest collision of a disk moving linearly from `from` at `t0` to `to` at `t1` with the planets, which also move
+	// linearly between their positions at `t0` and `t1`. Catches the hits that happen between the ends of a step
+	std::optional<Collision> sweep(vec2 const& from, vec2 const& to, double radius, double t0, double t1) const {
+		std::shared_ptr<Ephemeris const> ephemeris0 = ephemeris_at(t0);
+		std::shared_ptr<Ephemeris const> ephemeris1 = ephemeris_at(t1);
+		std::optional<Collision> collision;
+		double first = 2.0;
+
+		for (std::size_t j = 0; j < planets_ptr.size(); ++j) {
+			double s = Collisions::time_of_impact(from, to, radius, ephemeris0->pos[j], ephemeris1->pos[j], planets_ptr[j]->radius);
+			if (s >= 0 && s < first) {
+				first = s;
+				collision = Collision{0, j, t0 + s*(t1-t0), from + (to-from)*s};
+			}
+		}
+
+		return collision;
+	}
+
+	// First collision along the `n` predicted positions of `entity`, sampled every `dt` from `t_from`, along with the
+	// index of the sample ending the segment of impact
+	std::optional<std::pair<unsigned int, Collision>> sweep_predictions(Entity const& entity, double t_from, double dt, unsigned int n, vec2 const* predictions) const {
+		vec2 from = entity.pos;
+		for (unsigned int i = 0; i < n; ++i) {
+			std::optional<Collision> collision = sweep(from, predictions[i], entity.radius, t_from + i*dt, t_from + (i+1)*dt);
+			if (collision) {
+				return std::make_pair(i, *collision);
+			}
+			from = predictions[i];
+		}
+		return std::nullopt;
+	}
+
+	// Integrates `entity` from `t` to `t + dt` with the given integrator
+	void advance(Entity& entity, double t, double dt, Integrator::Settings const& settings) const {
+		advance(entity, t, dt, Integrator::get(settings.method), settings.tolerance);
+	}
+
+	void advance(Entity& entity, double t, double dt, Integrator::Method const& method, double tolerance) const {
+		if (method.adaptive) {
+			Integrator::RK45(entity, *this, &World::forces_on, t, dt, tolerance);
+		} else {
+			method.step(entity, *this, &World::forces_on, t, dt);
+		}
+	}
+
+	void set_integrator(std::string const& method, double tolerance) {
+		Integrator::get(method);
+		if (!(tolerance > 0)) {
+			throw std::invalid_argument("integrator tolerance must be positive");
+		}
+		integrator.method = method;
+		integrator.tolerance = tolerance;
+	}
+
 	void set_time(double new_time) {
 		time = new_time;
-		for (std::shared_ptr<ExplicitEntity>& planet_ptr : planets_ptr) {
-			planet_ptr->set_time(time);
+		std::shared_ptr<Ephemeris const> ephemeris = ephemeris_at(time, true);
+		for (std::size_t i = 0; i < planets_ptr.size(); ++i) {
+			planets_ptr[i]->set_state(time, ephemeris->pos[i], ephemeris->vel[i]);
 		}
+		planet_grid_dirty = true;
+	}
+
+	SpatialGrid const& get_planet_grid() const {
+		std::lock_guard<std::mutex> lock(planet_grid_mutex);
+		if (planet_grid_dirty || planet_grid_epochs[0] != Planet::elements_epoch || planet_grid_epochs[1] != Entity::radius_epoch) {
+			std::vector<vec2> centers(planets_ptr.size());
+			std::vector<double> radii(planets_ptr.size());
+			for (std::size_t i = 0; i < planets_ptr.size(); ++i) {
+				centers[i] = planets_ptr[i]->pos;
+				radii[i] = planets_ptr[i]->radius;
+			}
+			planet_grid.build(centers, radii);
+			planet_grid_dirty = false;
+			planet_grid_epochs[0] = Planet::elements_epoch;
+			planet_grid_epochs[1] = Entity::radius_epoch;
+		}
+		return planet_grid;
+	}
+
+	// Planets whose disk contains `point`, in order
+	std::vector<std::size_t> planets_at(vec2 const& point) const {
+		return get_planet_grid().query_point(point);
+	}
+
+	// Planets whose disk overlaps the disk of `center` and `radius`, in order
+	std::vector<std::size_t> planets_in_disk(vec2 const& center, double radius) const {
+		return get_planet_grid().query_disk(center, radius);
+	}
+
+	// First planet hit by the ray from `origin` along `direction` within `max_distance`, and the distance to the hit
+	std::optional<std::pair<std::size_t, double>> raycast(vec2 const& origin, vec2 const& direction, double max_distance) const {
+		return get_planet_grid().raycast(origin, direction, max_distance);
 	}
 	double get_time() const { return time; }
 
+	// Positions of all planets at `time`, and their velocities if `with_vel` is set, indexed like `planets_ptr`
+	std::shared_ptr<Ephemeris const> ephemeris_at(double time, bool with_vel = false) const {
+		unsigned long epoch = Planet::elements_epoch;
+		ephemeris_cache.sync(epoch);
+		std::shared_ptr<Ephemeris const> cached = ephemeris_cache.find(time);
+		if (cached != nullptr && (!with_vel || cached->vel.size() == cached->pos.size())) {
+			return cached;
+		}
+
+		// Entries may already be shared with other readers, so the ones missing the velocities are replaced
+		unsigned long generation = ephemeris_cache.get_generation();
+		std::shared_ptr<PlanetArrays const> arrays = current_arrays();
+		std::shared_ptr<Ephemeris> ephemeris = std::make_shared<Ephemeris>();
+		states_at(*arrays, time, ephemeris->pos, with_vel ? &ephemeris->vel : nullptr);
+		ephemeris->mass = arrays->mass;
+		ephemeris_cache.insert(time, ephemeris, epoch, generation);
+		return ephemeris;
+	}
+
+	// Absolute positions of all planets at `time`, and their velocities if `vel` is given, indexed like `planets_ptr`
+	void states_at(double time, std::vector<vec2>& pos, std::vector<vec2>* vel = nullptr) const {
+		states_at(*current_arrays(), time, pos, vel);
+	}
+
+	void states_at(PlanetArrays const& arrays, double time, std::vector<vec2>& pos, std::vector<vec2>* vel) const {
+		pos.resize(arrays.size());
+		if (vel != nullptr) {
+			vel->resize(arrays.size());
+		}
+		Kepler::Stats stats;
+		arrays.states_at(time, pos.data(), vel != nullptr ? vel->data() : nullptr, &stats);
+		counters.add_kepler(stats);
+		WorldCounters::add(counters.pos_at_cpp, arrays.size() - arrays.custom);
+		WorldCounters::add(counters.pos_at_python, arrays.custom);
+	}
+
+	// Arrays mirroring the planets, rebuilt if they changed
+	std::shared_ptr<PlanetArrays const> current_arrays() const {
+		std::lock_guard<std::mutex> lock(hierarchy_mutex);
+		unsigned long epoch = Planet::elements_epoch;
+		if (hierarchy_dirty || planet_arrays_epoch != epoch) {
+			std::shared_ptr<PlanetArrays> arrays = std::make_shared<PlanetArrays>();
+			arrays->sync(planets_ptr);
+			planet_arrays = arrays;
+			planet_arrays_epoch = epoch;
+			hierarchy_dirty = false;
+		}
+		return planet_arrays;
+	}
+
+	void set_ephemeris_tolerance(double tolerance) {
+		for (std::shared_ptr<ExplicitEntity>& planet_ptr : planets_ptr) {
+			Planet* planet = dynamic_cast<Planet*>(planet_ptr.get());
+			if (planet != nullptr) {
+				planet->set_table_tolerance(tolerance);
+			}
+		}
+	}
+
+	// Must be called when the orbits change in a way the world cannot see (e.g. python overrides of `pos_at`)
+	void invalidate_ephemeris() {
+		// Dirty before clearing, so that the ephemerides computed after the clear use rebuilt arrays
+		{
+			std::lock_guard<std::mutex> lock(hierarchy_mutex);
+			hierarchy_dirty = true;
+		}
+		{
+			std::lock_guard<std::mutex> lock(planet_grid_mutex);
+			planet_grid_dirty = true;
+		}
+		ephemeris_cache.clear();
+		forces_generation += 1;
+	}
+
 	std::shared_ptr<ExplicitEntity> get_planet(unsigned int index) {
 		return planets_ptr[index];
 	}
 	void add_planet(double mass_, double maxis_, double ecc_, double time0_, double incl_, double parg_, vec2 const& anchor_) {
 		planets_ptr.push_back(std::make_shared<Planet>(mass_, maxis_, ecc_, time0_, incl_, parg_, anchor_));
+		invalidate_ephemeris();
 	}
 	void add_planet_existing(std::shared_ptr<Planet> new_planet) {
 		planets_ptr.push_back(new_planet);
+		invalidate_ephemeris();
 	}
 	void rm_planet(unsigned int index) {
 		planets_ptr.erase(planets_ptr.begin() + index);
+		invalidate_ephemeris();
 	}
 
 	std::shared_ptr<Entity> get_entity(unsigned int index) {
@@ -61,18 +323,101 @@ public:
 		entities_ptr.erase(entities_ptr.begin() + index);
 	}
 
-	std::vector<vec2> get_predictions(Entity const& entity, double t_from, double t_to, unsigned int n) const {
-		double dt = (t_to-t_from) / n;
+	// Writes the `n` predicted positions of `entity` into `predictions`, which must hold at least `n` elements
+	void get_predictions(Entity const& entity, double t_from, double t_to, unsigned int n, vec2* predictions) const {
+		get_predictions(entity, t_from, t_to, n, predictions, integrator);
+	}
+
+	void get_predictions(Entity const& entity, double t_from, double t_to, unsigned int n, vec2* predictions, Integrator::Settings const& settings) const {
+		Trace::Span span("World.get_predictions");
 		Entity dummy(entity);
-		std::vector<vec2> predictions(n);
+		double dt = (t_to-t_from) / n;
+
+		// Adaptive steps are not tied to the sampling
+		if (Integrator::get(settings.method).adaptive) {
+			WorldCounters::add(counters.prediction_samples, n);
+			Integrator::RK45_dense(dummy, *this, &World::forces_on, t_from, dt, n, predictions, settings.tolerance);
+			return;
+		}
+		propagate(dummy, t_from, dt, n, predictions, settings);
+	}
+
+	// Integrates `entity` in place over `n` steps of `dt` from `t_from`, writing its position after each step into `predictions`.
+	// The steps are those of `step`, adaptive integrators included, so that the positions continue the simulation exactly
+	// (see PredictionWindow in logic/prediction.py)
+	void propagate(Entity& entity, double t_from, double dt, unsigned int n, vec2* predictions, Integrator::Settings const& settings) const {
+		Trace::Span span("World.propagate");
+		Integrator::Method const& method = Integrator::get(settings.method);
+		WorldCounters::add(counters.prediction_samples, n);
 
 		for (unsigned int i=0; i < n; ++i) {
 			double t = i*dt + t_from;
-			Integrator::RK4(dummy, *this, &World::forces_on, t, dt);
-			predictions[i] = dummy.pos;
+			advance(entity, t, dt, method, settings.tolerance);
+			predictions[i] = entity.pos;
 		}
+	}
+
+	// Batched predictions of `k` entities of mass `mass`, whose initial (pos, vel) are the consecutive pairs of `states`.
+	// The `n` predicted positions of entity j are written at predictions[j*n .. (j+1)*n]. The trajectories are stepped
+	// together so that they share the planet positions, and split over `threads` threads (0 for one per core)
+	void get_predictions_batch(vec2 const* states, std::size_t k, double mass, double t_from, double t_to, unsigned int n, vec2* predictions, Integrator::Settings const& settings, unsigned int threads = 1) const {
+		Trace::Span span("World.get_predictions_batch");
+		double dt = (t_to-t_from) / n;
+		Integrator::Method const& method = Integrator::get(settings.method);
+
+		auto predict = [&](std::size_t begin, std::size_t end) {
+			Trace::Span span("World.get_predictions_batch.worker");
+			std::vector<Entity> dummies;
+			for (std::size_t j = begin; j < end; ++j) {
+				dummies.emplace_back(states[2*j], states[2*j+1], mass);
+			}
+
+			if (method.adaptive) {
+				for (std::size_t j = begin; j < end; ++j) {
+					Integrator::RK45_dense(dummies[j-begin], *this, &World::forces_on, t_from, dt, n, predictions + j*n, settings.tolerance);
+				}
+				return;
+			}
+
+			for (unsigned int i = 0; i < n; ++i) {
+				double t = i*dt + t_from;
+				for (std::size_t j = begin; j < end; ++j) {
+					method.step(dummies[j-begin], *this, &World::forces_on, t, dt);
+					predictions[j*n + i] = dummies[j-begin].pos;
+				}
+			}
+		};
+
+		// Brings the cache and the hierarchy up to date before they are shared
+		ephemeris_at(t_from);
+		WorldCounters::add(counters.prediction_samples, k*n);
+
+		if (threads == 0) {
+			threads = std::max(1u, std::thread::hardware_concurrency());
+		}
+		// Python orbits can only be evaluated by the thread holding the GIL
+		if (has_custom_orbits()) {
+			threads = 1;
+		}
+		threads = static_cast<unsigned int>(std::min<std::size_t>(threads, k));
 
-		return predictions;
+		if (threads <= 1) {
+			predict(0, k);
+			return;
+		}
+
+		std::vector<std::thread> workers;
+		for (unsigned int w = 0; w < threads; ++w) {
+			workers.emplace_back(predict, k*w/threads, k*(w+1)/threads);
+		}
+		for (std::thread& worker : workers) {
+			worker.join();
+		}
+	}
+
+	// Whether some planet positions are given by overrides of `pos_at` (possibly in python) rather than by orbital elements
+	bool has_custom_orbits() const {
+		return current_arrays()->custom > 0;
 	}
 
 	double kinetic_energy() const {
@@ -94,18 +439,31 @@ public:
 		return u;
 	}
 
+	// Quadtree of the planets at the time of `ephemeris`, built once per ephemeris
+	QuadTree const& tree_of(Ephemeris const& ephemeris) const {
+		std::call_once(ephemeris.tree_once, [&]() {
+			ephemeris.tree = std::make_unique<QuadTree>(ephemeris.pos, ephemeris.mass);
+		});
+		return *ephemeris.tree;
+	}
+
+	void set_barnes_hut_theta(double theta) {
+		if (!(theta >= 0)) {
+			throw std::invalid_argument("Barnes-Hut opening angle must be non-negative");
+		}
+		barnes_hut_theta = theta;
+		forces_generation += 1;
+	}
+
 	static vec2 forces_on(Entity const& entity, World const& world, double time) {
-		vec2 f = vec2(0, 0);
+		WorldCounters::add(world.counters.forces_on, 1);
+		std::shared_ptr<Ephemeris const> ephemeris = world.ephemeris_at(time);
 
-		for (std::shared_ptr<ExplicitEntity> const& planet_ptr : world.planets_ptr) {
-			vec2 r = planet_ptr->pos_at(time) - entity.pos;
-			double d = r.length();
-			vec2 n = r/d;
-			double doff = d + GRAVITY_SINGULARITY_OFFSET;
-			f += n * GRAVITY_CST * (entity.mass + planet_ptr->mass) / (doff*doff);
+		if (world.barnes_hut_theta > 0) {
+			return world.tree_of(*ephemeris).force(entity.pos, entity.mass, world.barnes_hut_theta);
 		}
 
-		return f;
+		return PlanetArrays::forces_on(ephemeris->pos.data(), ephemeris->mass.data(), ephemeris->pos.size(), entity.pos, entity.mass);
 	}
 
 	std::string str() const {
@@ -122,4 +480,9 @@ public:
 	}
 };
 
+unsigned long Integrator::forces_version(World const& world) {
+	// both only increase, so their sum changes whenever one of them does
+	return Planet::elements_epoch + world.forces_generation;
+}
+
 #endif
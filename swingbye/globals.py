@@ -1,7 +1,10 @@
 SHIP_LAUNCH_SPEED = 0.3
 SHIP_PREDICTION_N = 500
+SHIP_PREDICTION_ASYNC = True  # compute the ship predictions of levels on a background thread
+SHIP_PREDICTION_INCREMENTAL = True  # slide the predictions of launched ships instead of recomputing them
 
 PLANET_PREDICTION_N = 69
 PLANET_PREDICTION_DT = 50
 
 PHYSICS_DT = 5
+PHYSICS_INTEGRATOR = 'rk4'  # see swingbye.cphysics.available_integrators()
@@ -0,0 +1,80 @@
+import json
+import logging
+from swingbye.cphysics import vec2
+from swingbye.logic.world import World
+from swingbye.logic.ship import Ship
+from swingbye.logic.planet import Planet
+
+_logger = logging.getLogger(__name__)
+
+SHIP_RADIUS = 10  # same hitbox as swingbye.pygletengine.gameobjects.entities.ShipObject
+
+
+def build_world(level: dict, make_planet, make_ship) -> World:
+	"""Builds the world of a level, walking its tree of planets and ships. The objects are created by
+	`make_planet(child_dict, arguments)` and `make_ship(child_dict, arguments)`, where `arguments` are those of the
+	level entry with the positions converted to vec2, so that the level format is read in one place"""
+
+	world = World()
+	queue = [(child_dict, None) for child_dict in level['world']]
+
+	while queue:
+		child_dict, parent = queue.pop()
+		arguments = dict(child_dict['arguments'])
+
+		# Convert the position list to a vec2
+		if 'pos' in arguments:
+			arguments['pos'] = vec2(*arguments['pos'])
+		if 'anchor' in arguments:
+			arguments['anchor'] = vec2(*arguments['anchor'])
+
+		if child_dict['type'] in ['planet', 'wormhole']:
+			world.add_planet_existing(make_planet(child_dict, arguments))
+			world.planets[-1].set_parent(parent)
+			queue += [(_child_dict, world.planets[-1]) for _child_dict in child_dict['children']]
+
+		elif child_dict['type'] == 'ship':
+			world.add_entity_existing(make_ship(child_dict, arguments))
+			world.entities[-1].parent = parent
+
+		else:
+			_logger.warning(f'type `{child_dict["type"]}` is not recognized.')
+
+	world.time = 0
+
+	return world
+
+
+def load_level(level: dict) -> World:
+	"""Builds the world of a level like `swingbye.levels.parser.parse_level`, with plain logic objects instead of
+	sprites, so that levels can be simulated without a display. Planets keep their `name` and their `kind` (the type
+	of the level entry, 'planet' or 'wormhole')"""
+
+	def make_planet(child_dict, arguments):
+		radius = arguments.pop('radius', 1)
+		planet = Planet(**arguments)
+		planet.radius = radius
+		planet.name = child_dict.get('name', 'planet')
+		planet.kind = child_dict['type']
+		return planet
+
+	def make_ship(child_dict, arguments):
+		arguments.pop('radius', None)
+		ship = Ship(**arguments)
+		ship.radius = SHIP_RADIUS
+		return ship
+
+	return build_world(level, make_planet, make_ship)
+
+
+def load_level_file(path: str) -> World:
+	with open(path) as file:
+		return load_level(json.load(file))
+
+
+if __name__ == '__main__':
+	world = load_level_file('swingbye/levels/level1.json')
+	print(world)
+	for planet in world.planets:
+		print(planet.name, planet.kind, planet.pos, planet.radius)
+	print(world.ship.pos, world.ship.docked)
@@ -1,40 +1,50 @@
-from swingbye.cphysics import vec2
-
-# TODO : rewrite in c++
+from swingbye.cphysics import vec2, collide_disks, collide_disk_point, collide_rect_point
 
 class HitZone():
+	shape = None
+
 	def collides_with(self, other: 'HitZone'):
 		return collides(self, other)
 
 class HitZonePoint(HitZone):
+	shape = 'point'
+
 	def __init__(self, pos=vec2(0, 0)):
 		self.pos = pos
 
 class HitZoneDisk(HitZone):
+	shape = 'disk'
+
 	def __init__(self, radius=1, pos=vec2(0, 0)):
 		self.radius = radius
 		self.pos = pos
 
 
 class HitZoneRect(HitZone):
+	shape = 'rect'
+
 	def __init__(self, pos=vec2(0, 0), dims=vec2(1, 1)):
 		self.pos = pos
 		self.dims = dims
 
 
-def collides(obj1: HitZone, obj2: HitZone, firstcall=True) -> bool:
-	if isinstance(obj1, HitZoneDisk) and isinstance(obj2, HitZoneDisk):
-		return (obj1.pos - obj2.pos).length() <= obj1.radius + obj2.radius
+# The tests are implemented in c++ (see cphysics/src/collisions.hpp)
+_tests = {
+	('disk', 'disk'): lambda disk1, disk2: collide_disks(disk1.pos, disk1.radius, disk2.pos, disk2.radius),
+	('rect', 'point'): lambda rect, point: collide_rect_point(rect.pos, rect.dims, point.pos),
+	('disk', 'point'): lambda disk, point: collide_disk_point(disk.pos, disk.radius, point.pos),
+}
 
-	if isinstance(obj1, HitZoneRect) and isinstance(obj2, HitZonePoint):
-		return (obj1.pos.x <= obj2.pos.x <= obj1.pos.x + obj1.dims.x) and (obj1.pos.y <= obj2.pos.y <= obj1.pos.y + obj1.dims.y)
 
-	if isinstance(obj1, HitZoneDisk) and isinstance(obj2, HitZonePoint):
-		return (obj1.pos - obj2.pos).length() <= obj1.radius
+def collides(obj1: HitZone, obj2: HitZone) -> bool:
+	test = _tests.get((obj1.shape, obj2.shape))
+	if test is not None:
+		return test(obj1, obj2)
 
 	# Collision is commutative, so we need to check both "directions"
-	if firstcall:
-		return collides(obj2, obj1, False)
+	test = _tests.get((obj2.shape, obj1.shape))
+	if test is not None:
+		return test(obj2, obj1)
 
 	raise NotImplementedError(f'collision between {type(obj1)} and {type(obj2)} is not implemented')
 
@@ -11,3 +11,9 @@ class PredictionMixin:
 		self._prediction = prediction
 
 	prediction = property(_get_prediction, _set_prediction)
+
+	def swap_prediction(self, prediction: np.ndarray) -> np.ndarray:
+		"""Replaces the prediction buffer in a single assignment (notifying the subclass setters), returns the previous one"""
+		old = self.prediction
+		self.prediction = prediction
+		return old
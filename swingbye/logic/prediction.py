@@ -0,0 +1,144 @@
+import logging
+import threading
+import numpy as np
+from swingbye.cphysics import Entity as CEntity
+from swingbye.cphysics import vec2
+
+_logger = logging.getLogger(__name__)
+
+class PredictionWorker:
+	"""PredictionWorker computes ship predictions on a background thread, from snapshots of the ship state.
+
+	Requests submitted while the worker is busy are coalesced, only the latest one per ship is computed.
+	Completed predictions are handed over by `poll`, to be called from the thread that renders the ships.
+	The world may be stepped meanwhile, but its planets must not be edited while the worker runs (see world.hpp)."""
+
+	def __init__(self, world):
+		self.world = world
+
+		self._condition = threading.Condition()
+		self._requests = {}  # ship -> (snapshot, t_from, t_to, n)
+		self._results = {}  # ship -> completed prediction buffer
+		self._spares = {}  # ship -> buffer free to be written by the worker
+		self._running = True
+		self._busy = False
+		self._generation = 0  # bumped by `cancel`, so that results in flight are discarded
+
+		self._thread = threading.Thread(target=self._run, name='prediction-worker', daemon=True)
+		self._thread.start()
+
+	def submit(self, ship, pos: vec2, vel: vec2, t_from: float, t_to: float):
+		snapshot = CEntity(pos=vec2(pos), vel=vec2(vel), mass=ship.mass)
+		with self._condition:
+			self._requests[ship] = (snapshot, t_from, t_to, ship.prediction.shape[0])
+			self._condition.notify()
+
+	def poll(self) -> int:
+		"""Swaps the completed predictions into their ships, returns how many were swapped"""
+
+		with self._condition:
+			results, self._results = self._results, {}
+
+		for ship, buffer in results.items():
+			old = ship.swap_prediction(buffer)
+			with self._condition:
+				self._spares[ship] = old
+
+		return len(results)
+
+	def cancel(self, ship):
+		"""Drops the pending request and the completed predictions of `ship`"""
+
+		with self._condition:
+			self._requests.pop(ship, None)
+			self._results.pop(ship, None)
+			self._generation += 1
+
+	def wait(self):
+		"""Blocks until all the submitted requests are computed"""
+
+		with self._condition:
+			self._condition.wait_for(lambda: not self._requests and not self._busy)
+
+	def stop(self):
+		with self._condition:
+			self._running = False
+			self._condition.notify_all()
+		self._thread.join()
+
+	def _run(self):
+		while True:
+			with self._condition:
+				self._condition.wait_for(lambda: self._requests or not self._running)
+				if not self._running:
+					return
+
+				ship, (snapshot, t_from, t_to, n) = self._requests.popitem()
+				buffer = self._spares.pop(ship, None)
+				generation = self._generation
+				self._busy = True
+
+			if buffer is None or buffer.shape != (n, 2):
+				buffer = np.empty((n, 2))
+
+			try:
+				self.world.get_predictions(snapshot, t_from, t_to, n, out=buffer)
+			except Exception:
+				_logger.exception('ship prediction failed')
+				buffer = None
+
+			with self._condition:
+				if buffer is not None and generation == self._generation:
+					self._results[ship] = buffer
+				self._busy = False
+				self._condition.notify_all()
+
+
+class PredictionWindow:
+	"""PredictionWindow slides the prediction of a launched ship along with the simulation.
+
+	The samples are spaced by the physics timestep, so after k steps the first k samples are the part of the trajectory
+	that was just simulated : they are dropped, and only k new samples are integrated at the end of the horizon, from
+	the integrator state kept there. The window is rebuilt whenever the ship leaves the predicted trajectory."""
+
+	def __init__(self, world, ship, dt: float):
+		self.world = world
+		self.ship = ship
+		self.dt = dt
+
+		self.time = None  # world time of the head of the window
+		self.tail = None  # integrator state at the end of the horizon
+		self.tail_time = None
+		self.key = None
+
+	def invalidate(self):
+		self.tail = None
+
+	def update(self) -> int:
+		"""Updates the ship prediction buffer in place, returns the number of integrated steps"""
+
+		prediction = self.ship.prediction
+		n = prediction.shape[0]
+		key = (self.world.integrator, self.world.integrator_tolerance, n, self.dt)
+
+		if self.tail is not None and key == self.key:
+			k = round((self.world.time - self.time) / self.dt)
+			if k == 0 and self.world.time == self.time:
+				return 0
+			if 0 < k <= n and self._on_track(prediction[k-1]):
+				prediction[:n-k] = prediction[k:]
+				self.world.propagate(self.tail, self.tail_time, self.dt, k, out=prediction[n-k:])
+				self.time = self.world.time
+				self.tail_time += k*self.dt
+				return k
+
+		self.key = key
+		self.time = self.world.time
+		self.tail = CEntity(pos=vec2(self.ship.pos), vel=vec2(self.ship.vel), mass=self.ship.mass)
+		self.world.propagate(self.tail, self.time, self.dt, n, out=prediction)
+		self.tail_time = self.time + n*self.dt
+		return n
+
+	def _on_track(self, sample) -> bool:
+		pos = self.ship.pos
+		return abs(pos.x - sample[0]) + abs(pos.y - sample[1]) <= 1e-6*(1 + abs(pos.x) + abs(pos.y))
@@ -2,7 +2,9 @@ import logging
 import numpy
 from swingbye.cphysics import World as CWorld
 from swingbye.cphysics import vec2
-from swingbye.globals import PLANET_PREDICTION_DT, PHYSICS_DT, SHIP_LAUNCH_SPEED
+from swingbye.logic.prediction import PredictionWorker, PredictionWindow
+from swingbye.tracing import tracer
+from swingbye.globals import PLANET_PREDICTION_DT, PHYSICS_DT, PHYSICS_INTEGRATOR, SHIP_LAUNCH_SPEED, SHIP_PREDICTION_INCREMENTAL
 from enum import Enum, auto
 from typing import Optional
 
@@ -17,6 +19,12 @@ class World(CWorld):
 		CWorld.__init__(self)
 		self.state = WorldStates.PRE_LAUNCH
 		self.autoupdate_predictions = True
+		self.integrator = PHYSICS_INTEGRATOR
+		self.prediction_worker = None
+		self.incremental_predictions = SHIP_PREDICTION_INCREMENTAL
+		self.prediction_windows = {}
+		self.states_dirty = True
+		self._synced_states = {}  # 'planets' / 'entities' -> states at the last sync
 		self.time = 0.0
 
 	# Time handling
@@ -29,11 +37,9 @@ class World(CWorld):
 
 		for ship in self.entities:
 			ship.time = time  # ship subclasses cphysics.Entity to have a time property
-			ship.pos = ship.pos  # HACK : trigger the position setter
-			ship.vel = ship.vel  # HACK : trigger the position setter
 
-		for planet in self.planets:
-			planet.pos = planet.pos  # HACK : trigger the position setter
+		# the python side of the bodies catches up in `sync_states`, once per rendered frame
+		self.states_dirty = True
 
 		if self.autoupdate_predictions:
 			self.update_predictions()
@@ -52,6 +58,43 @@ class World(CWorld):
 		# restore state
 		self.autoupdate_predictions = old_autoupdate_predictions
 
+	def tick(self, dt: float, n: int, collisions: bool = True) -> dict:
+		"""Runs up to `n` steps in c++ (see `cphysics.World.tick`), the python side catches up in `sync_states`"""
+		result = CWorld.tick(self, dt, n, collisions)
+
+		for ship in self.entities:
+			ship.time = result['time']
+		self.states_dirty = True
+
+		return result
+
+	def sync_states(self) -> int:
+		"""Syncs the python side (e.g. sprites, see `SpriteMixin.sync_sprite`) of the bodies whose state changed in c++
+		since the last call, returns how many were synced. Meant to be called once per rendered frame.
+
+		The states are read as one array per kind of body, and compared to the ones of the last sync"""
+		if not self.states_dirty:
+			return 0
+		self.states_dirty = False
+
+		synced = 0
+		for key, bodies, states in (('planets', self.planets, self.planet_states()), ('entities', self.entities, self.entity_states())):
+			previous = self._synced_states.get(key)
+			if previous is None or previous.shape != states.shape:
+				changed = range(len(bodies))
+			else:
+				changed = numpy.flatnonzero((states != previous).any(axis=1))
+
+			for i in changed:
+				sync_sprite = getattr(bodies[i], 'sync_sprite', None)
+				if sync_sprite is not None:
+					sync_sprite()
+					synced += 1
+
+			self._synced_states[key] = states
+
+		return synced
+
 	# Game logic
 
 	def launch_ship(self):
@@ -74,34 +117,64 @@ class World(CWorld):
 		self.ship.pointing = pointing
 		self.update_ships_prediction()
 
+	@tracer.traced('World.update_predictions')
 	def update_predictions(self):
 		self.update_ships_prediction()
 		self.update_planets_prediction()
 
+	# Asynchronous predictions
+
+	def start_prediction_worker(self):
+		"""Ship predictions are then computed in the background, and only shown once `poll_predictions` is called"""
+		if self.prediction_worker is None:
+			self.prediction_worker = PredictionWorker(self)
+
+	def stop_prediction_worker(self):
+		if self.prediction_worker is not None:
+			self.prediction_worker.stop()
+			self.prediction_worker = None
+
+	def poll_predictions(self):
+		if self.prediction_worker is not None:
+			self.prediction_worker.poll()
+
 	def update_ships_prediction(self):
 		for ship in self.entities:
 			# if not ship.docked:
 			# 	_logger.warning('ship prediction doesn\'t need to be updated since ship is launched')
 			# 	return
 
-			# TODO : prevent copy by STL vector -> numpy array
+			if not ship.docked and self.incremental_predictions:
+				if ship not in self.prediction_windows:
+					if self.prediction_worker is not None:
+						self.prediction_worker.cancel(ship)
+					self.prediction_windows[ship] = PredictionWindow(self, ship, PHYSICS_DT)
+				if self.prediction_windows[ship].update() > 0:
+					ship.prediction = ship.prediction  # HACK : update the vertices in swingbye.pygletengine.gameobjects.utils.PathMixin
+				continue
+
+			t_to = self.time + (ship.prediction.shape[0]-1)*PHYSICS_DT
+
+			if self.prediction_worker is not None:
+				vel = ship.pointing*(SHIP_LAUNCH_SPEED + ship.parent.vel.length()) if ship.docked else ship.vel
+				self.prediction_worker.submit(ship, ship.pos, vel, self.time, t_to)
+				continue
+
+			# The prediction is written in place into the ship's buffer
 			if ship.docked:
 				old_vel = self.ship.vel
 				self.ship.vel = self.ship.pointing*(SHIP_LAUNCH_SPEED + self.ship.parent.vel.length())
-				c_prediction = self.get_predictions(self.ship, self.time, self.time + (self.ship.prediction.shape[0]-1)*PHYSICS_DT, self.ship.prediction.shape[0])
+				self.get_predictions(self.ship, self.time, t_to, self.ship.prediction.shape[0], out=ship.prediction)
 				self.ship.vel = old_vel
 			else:
-				c_prediction = self.get_predictions(self.ship, self.time, self.time + (self.ship.prediction.shape[0]-1)*PHYSICS_DT, self.ship.prediction.shape[0])
-
-			for i, sample in enumerate(c_prediction):
-				ship.prediction[i, :] = tuple(sample)
+				self.get_predictions(self.ship, self.time, t_to, self.ship.prediction.shape[0], out=ship.prediction)
 
-			ship.prediction = ship.prediction
+			ship.prediction = ship.prediction  # HACK : update the vertices in swingbye.pygletengine.gameobjects.utils.PathMixin
 
 	def update_planets_prediction(self):
 		for planet in self.planets:
-			for i, t in enumerate(numpy.linspace(self.time, self.time + planet.prediction.shape[0]*PLANET_PREDICTION_DT, planet.prediction.shape[0])):
-				planet.prediction[i, :] = tuple(planet.pos_at(t))  # Doesn't call the setter
+			times = numpy.linspace(self.time, self.time + planet.prediction.shape[0]*PLANET_PREDICTION_DT, planet.prediction.shape[0])
+			planet.pos_at_many(times, out=planet.prediction)  # Fills the buffer in place, doesn't call the setter
 
 			planet.prediction = planet.prediction  # HACK : update the vertices in swingbye.pygletengine.gameobjects.utils.PathMixin
 
@@ -0,0 +1,139 @@
+"""Per-phase frame timings, shown in game by `swingbye.pygletengine.components.profiler.ProfilerOverlay`
+
+Code is timed with `with frame_profiler.phase('physics'):` or the `@frame_profiler.profiled('graph')` decorator. The time
+spent in each phase is summed over a frame, and `end_frame` pushes the totals into fixed-size ring buffers, so that the
+statistics are over the last frames. Phases can nest, the time of a phase includes the one of the phases it contains.
+While disabled, the phases cost one attribute check."""
+
+import functools
+import numpy as np
+from time import perf_counter
+
+
+class RingBuffer:
+	"""Keeps the last `size` appended values"""
+
+	def __init__(self, size: int):
+		self.samples = np.zeros(size)
+		self.index = 0  # where the next value goes
+		self.count = 0
+
+	def __len__(self):
+		return self.count
+
+	def append(self, value: float):
+		self.samples[self.index] = value
+		self.index = (self.index + 1) % self.samples.shape[0]
+		self.count = min(self.count + 1, self.samples.shape[0])
+
+	def values(self) -> np.ndarray:
+		"""The kept values, oldest first"""
+		if self.count < self.samples.shape[0]:
+			return self.samples[:self.count]
+		return np.roll(self.samples, -self.index)
+
+	def clear(self):
+		self.index = 0
+		self.count = 0
+
+
+class _Phase:
+	__slots__ = ('profiler', 'name', 'start')
+
+	def __init__(self, profiler, name: str):
+		self.profiler = profiler
+		self.name = name
+
+	def __enter__(self):
+		self.start = perf_counter()
+
+	def __exit__(self, exception_type, exception_value, traceback):
+		self.profiler.record(self.name, perf_counter() - self.start)
+
+
+class _NoPhase:
+	__slots__ = ()
+
+	def __enter__(self):
+		pass
+
+	def __exit__(self, exception_type, exception_value, traceback):
+		pass
+
+
+_NO_PHASE = _NoPhase()
+
+
+class FrameProfiler:
+
+	def __init__(self, size: int = 240, enabled: bool = False):
+		self.size = size  # frames kept
+		self.enabled = enabled
+		self.buffers = {}  # phase name -> RingBuffer of the time per frame, in seconds
+		self.pending = {}  # phase name -> time spent in the current frame
+		self.frame_start = None
+
+	def phase(self, name: str):
+		"""Context manager timing its body as part of the phase `name`"""
+		if not self.enabled:
+			return _NO_PHASE
+		return _Phase(self, name)
+
+	def profiled(self, name: str):
+		"""Decorator timing the calls as part of the phase `name`"""
+		def decorator(func):
+			@functools.wraps(func)
+			def wrap_func(*args, **kwargs):
+				if not self.enabled:
+					return func(*args, **kwargs)
+				start = perf_counter()
+				try:
+					return func(*args, **kwargs)
+				finally:
+					self.record(name, perf_counter() - start)
+			return wrap_func
+		return decorator
+
+	def record(self, name: str, seconds: float):
+		self.pending[name] = self.pending.get(name, 0.0) + seconds
+
+	def end_frame(self):
+		"""Pushes the time spent in each phase during the frame, phases that didn't run count as 0. The whole frame, from
+		the previous call, is the 'frame' phase"""
+		if not self.enabled:
+			return
+		now = perf_counter()
+		if self.frame_start is not None:
+			self.pending['frame'] = now - self.frame_start
+		self.frame_start = now
+
+		for name in self.pending:
+			if name not in self.buffers:
+				self.buffers[name] = RingBuffer(self.size)
+		for name, buffer in self.buffers.items():
+			buffer.append(self.pending.get(name, 0.0))
+		self.pending.clear()
+
+	def stats(self) -> dict:
+		"""{phase name: {'p50', 'p95', 'max', 'last'}} over the kept frames, in seconds"""
+		stats = {}
+		for name, buffer in self.buffers.items():
+			if len(buffer) == 0:
+				continue
+			values = buffer.values()
+			p50, p95 = np.percentile(values, [50, 95])
+			stats[name] = {'p50': float(p50), 'p95': float(p95), 'max': float(values.max()), 'last': float(values[-1])}
+		return stats
+
+	def reset(self):
+		self.buffers.clear()
+		self.pending.clear()
+		self.frame_start = None
+
+	def set_enabled(self, enabled: bool):
+		"""Starts or stops collecting, starting over from empty buffers"""
+		self.enabled = enabled
+		self.reset()
+
+
+frame_profiler = FrameProfiler()
@@ -3,6 +3,7 @@ import glooey
 from swingbye.pygletengine.components.paths import LinePath
 from swingbye.pygletengine.utils import lerp
 from numpy import interp, inf
+from swingbye.profiler import frame_profiler
 
 
 class LineTHICKENER(pyglet.graphics.OrderedGroup):
@@ -166,6 +167,7 @@ class LineGraph(glooey.Widget):
 		self.max_label.text = f'{self.max_y:.1f}'
 		self.min_label.text = f'{self.min_y:.1f}'
 
+	@frame_profiler.profiled('graph')
 	def update_data(self, dt):
 		if self.loaded:
 			# First, get the data
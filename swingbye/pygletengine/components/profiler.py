@@ -0,0 +1,53 @@
+import pyglet
+import glooey
+import swingbye.pygletengine.components.theme as theme
+from swingbye.profiler import frame_profiler
+
+
+class ProfilerOverlay:
+	"""Rolling p50/p95/max of the phases timed by `swingbye.profiler.frame_profiler`, drawn over the scene like
+	`pyglet.window.FPSDisplay`. The profiler only collects while the overlay is shown"""
+
+	def __init__(self, window, budget: float = 1/60.0, refresh_rate: float = 1/4):
+		self.window = window
+		self.budget = budget  # phases slower than this at p95 are flagged
+		self.refresh_rate = refresh_rate
+		self.visible = False
+		self.label = pyglet.text.Label(
+			'',
+			font_name=theme.FONT, font_size=10,
+			x=10, y=window.height-80,
+			width=360, multiline=True,
+			anchor_x='left', anchor_y='top',
+			color=glooey.drawing.Color.from_anything(theme.TEXT).get_tuple()
+		)
+
+	def show(self):
+		self.visible = True
+		frame_profiler.set_enabled(True)
+		pyglet.clock.schedule_interval(self.refresh, self.refresh_rate)
+
+	def hide(self):
+		self.visible = False
+		frame_profiler.set_enabled(False)
+		pyglet.clock.unschedule(self.refresh)
+
+	def toggle(self):
+		if self.visible:
+			self.hide()
+		else:
+			self.show()
+
+	def refresh(self, dt=None):
+		lines = [f'{"phase (ms)":14s}{"p50":>8s}{"p95":>8s}{"max":>8s}   budget {self.budget*1e3:.1f}']
+		for name, stats in frame_profiler.stats().items():
+			flag = ' !' if stats['p95'] > self.budget else ''
+			lines.append(f'{name:14s}{stats["p50"]*1e3:8.2f}{stats["p95"]*1e3:8.2f}{stats["max"]*1e3:8.2f}{flag}')
+		self.label.text = '\n'.join(lines)
+
+	def on_resize(self, width, height):
+		self.label.y = height-80
+
+	def draw(self):
+		if self.visible:
+			self.label.draw()
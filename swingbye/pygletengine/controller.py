@@ -8,6 +8,10 @@ from swingbye.pygletengine.scenes.optionsmenu import OptionsMenu
 from swingbye.pygletengine.scenes.dvd import DVD
 from swingbye.pygletengine.scenes.testing import Test
 from swingbye.pygletengine.scenes.editor import Editor
+from swingbye.pygletengine.components.profiler import ProfilerOverlay
+from swingbye.profiler import frame_profiler
+from swingbye.tracing import tracer
+from datetime import datetime
 import swingbye.pygletengine.globals as g
 
 
@@ -29,6 +33,11 @@ class ViewController(pyglet.window.Window):
 			self.fps_display = pyglet.window.FPSDisplay(self)
 			self.fps_display.label.x, self.fps_display.label.y = 0, g.WINDOW_HEIGHT-50
 
+		# Per-phase timings, toggled with F3
+		self.profiler_overlay = ProfilerOverlay(self, budget=self.frame_rate)
+		if g.DEBUG_PERF:
+			self.profiler_overlay.show()
+
 		self.gui = glooey.Gui(self, batch=self.gui_batch, group=self.gui_group)
 
 		self.scenes = {
@@ -60,6 +69,10 @@ class ViewController(pyglet.window.Window):
 			self.transition_to_scene('MainMenu')
 		if symbol == key.F4 and modifier & key.MOD_ALT:
 			pyglet.app.exit()
+		if symbol == key.F3:
+			self.profiler_overlay.toggle()
+		if symbol == key.F2:
+			tracer.toggle(datetime.now().strftime('swingbye-%Y%m%d-%H%M%S.trace.json'))
 
 		# For testing only
 		if symbol == key._0:
@@ -78,15 +91,21 @@ class ViewController(pyglet.window.Window):
 			self.dispatch_event('on_click', x, y)
 
 	def on_draw(self):
-		self.clear()
-		self.scenes[self.current_scene].draw()
-		if g.DEBUG_PERF:
-			self.fps_display.draw()
+		with frame_profiler.phase('draw'):
+			self.clear()
+			with tracer.span('Scene.draw', scene=self.current_scene):
+				self.scenes[self.current_scene].draw()
+			if g.DEBUG_PERF:
+				self.fps_display.draw()
+			self.profiler_overlay.draw()
+		frame_profiler.end_frame()
 
 	def on_resize(self, width, height):
 		super().on_resize(width, height)
 		g.WINDOW_WIDTH = width
 		g.WINDOW_HEIGHT = height
+		self.profiler_overlay.on_resize(width, height)
 
 	def update(self, dt):
-		self.scenes[self.current_scene].run(dt)
+		with frame_profiler.phase('update'):
+			self.scenes[self.current_scene].run(dt)
@@ -38,14 +38,12 @@ class ShipObject(SpriteMixin, PathMixin, HitZoneDisk, Ship):
 		else:
 			PathMixin.__init__(self, path=LinePath(point_count=SHIP_PREDICTION_N))
 
-		if 'radius' in kwargs:
-			HitZoneDisk.__init__(self, radius=kwargs['radius'])
-			del kwargs['radius']
-		else:
-			HitZoneDisk.__init__(self)
+		radius = kwargs.pop('radius', 1)
 
 		Ship.__init__(self, *args, **kwargs)
 
+		# the radius lives in c++, so the hitbox is initialized after the entity
+		HitZoneDisk.__init__(self, radius=radius, pos=self.pos)
 		self.radius = 10  # set ship hitbox
 		scale = self.radius / (self.sprite.width//2)
 		self.sprite.update(x=self.pos.x, y=self.pos.y, scale=scale)
@@ -72,6 +70,10 @@ class ShipObject(SpriteMixin, PathMixin, HitZoneDisk, Ship):
 
 	pointing = property(_get_pointing, Ship._set_pointing_safe)
 
+	def sync_sprite(self):
+		super().sync_sprite()
+		self._set_pointing(self._get_pointing())
+
 	def delete(self):
 		self.sprite.delete()
 		self.path.delete()
@@ -95,11 +97,7 @@ class PlanetObject(SpriteMixin, PathMixin, HitZoneDisk, Planet):
 			# read from the prediction mixin to init the LinePath
 			PathMixin.__init__(self, path=LinePath(point_count=PLANET_PREDICTION_N))
 
-		if 'radius' in kwargs:
-			HitZoneDisk.__init__(self, radius=kwargs['radius'])
-			del kwargs['radius']
-		else:
-			HitZoneDisk.__init__(self)
+		radius = kwargs.pop('radius', 1)
 
 		if 'game_entity' in kwargs:
 			self.game_entity = GameEntity.PLANET
@@ -113,6 +111,9 @@ class PlanetObject(SpriteMixin, PathMixin, HitZoneDisk, Planet):
 
 		Planet.__init__(self, *args, **kwargs)
 
+		# the radius lives in c++, so the hitbox is initialized after the entity
+		HitZoneDisk.__init__(self, radius=radius, pos=self.pos)
+
 		scale = self.radius / (self.sprite.height//2)
 		self.sprite.update(x=self.pos.x, y=self.pos.y, scale=scale)
 		self.sprite.update(x=self.pos[0], y=self.pos[1], scale=scale)
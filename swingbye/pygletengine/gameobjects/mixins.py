@@ -2,6 +2,7 @@ import pyglet
 from typing import Optional
 from swingbye.pygletengine.utils import create_sprite
 from swingbye.pygletengine.components.paths import Path, LinePath
+from swingbye.profiler import frame_profiler
 
 class SpriteMixin:
 	"""SpriteMixin adds a sprite to a `physics.entity.ExplicitEntity` or `physics.entity.ImplicitEntity` class, and intercepts the position setter to update its own sprite position"""
@@ -18,6 +19,11 @@ class SpriteMixin:
 
 	pos = property(_get_pos, _set_pos)
 
+	def sync_sprite(self):
+		"""Moves the sprite to the current position, after it changed in c++ (see `logic.world.World.sync_states`)"""
+		pos = self.pos
+		self.sprite.position = (pos.x, pos.y)
+
 
 class PathMixin:
 	# TODO : union LinePath and PointPath
@@ -30,6 +36,7 @@ class PathMixin:
 
 	def _set_prediction(self, prediction):
 		super()._set_prediction(prediction)
-		self.path.vertices = prediction
+		with frame_profiler.phase('paths'):
+			self.path.vertices = prediction
 
 	prediction = property(_get_prediction, _set_prediction)
@@ -3,7 +3,6 @@ import json
 import logging
 from swingbye.levels.parser import parse_level
 from swingbye.logic.world import WorldStates
-from swingbye.logic.collisions import HitZonePoint
 from swingbye.pygletengine.components.overlays import OptionsOverlay
 from swingbye.pygletengine.utils import point_in_rect, create_sprite
 from swingbye.pygletengine.scenes.level import Level
@@ -20,6 +19,8 @@ _logger = logging.getLogger(__name__)
 
 
 class Editor(Level):
+	# The worker reads the planets while predicting, they must not be edited meanwhile
+	prediction_async = False
 
 	def __init__(self, *args, **kwargs):
 		super().__init__(*args, **kwargs)
@@ -102,6 +103,7 @@ class Editor(Level):
 		self.open_add_context_menu()
 
 	def draw(self):
+		self.world.sync_states()
 		self.batch.draw()
 		with self.camera:
 			self.world_batch.draw()
@@ -340,17 +342,12 @@ class Editor(Level):
 		self.camera.set_parent(None)
 
 	def is_over_planet(self, x, y):
-		mouse = HitZonePoint(self.camera.screen_to_world(x, y))
-		for planet in self.world.planets:
-			if planet.collides_with(mouse):
-				return True
-		return False
+		return len(self.world.planets_at(self.camera.screen_to_world(x, y))) > 0
 
 	def get_planet_at(self, x, y):
-		pos = HitZonePoint(self.camera.screen_to_world(x, y))
-		for index, planet in enumerate(self.world.planets):
-			if planet.collides_with(pos):
-				return planet, index
+		indices = self.world.planets_at(self.camera.screen_to_world(x, y))
+		if indices:
+			return self.world.planets[indices[0]], indices[0]
 		return None, 0
 
 	def launch_ship(self):
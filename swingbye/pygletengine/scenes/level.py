@@ -9,11 +9,14 @@ from swingbye.pygletengine.scenes.layers.camera import Camera
 from swingbye.pygletengine.gameobjects.backgroundobject import BackgroundObject
 from swingbye.pygletengine.gameobjects.hudobject import HudObject
 from swingbye.pygletengine.globals import WINDOW_WIDTH, WINDOW_HEIGHT, DEBUG_CAMERA, DEBUG_COLLISION, TEST_COLLISIONS, GameState, GameEntity
-from swingbye.globals import PHYSICS_DT
+from swingbye.globals import PHYSICS_DT, SHIP_PREDICTION_ASYNC
+from swingbye.profiler import frame_profiler
+from swingbye.tracing import tracer
 
 _logger = logging.getLogger(__name__)
 
 class Level(Scene):
+	prediction_async = SHIP_PREDICTION_ASYNC
 
 	def __init__(self, *args, **kwargs):
 		super().__init__(*args, **kwargs)
@@ -144,6 +147,9 @@ class Level(Scene):
 		_logger.debug(f'parsing level from file `{self.levels[self.level_index]}`')
 
 		self.world = parse_level(level, self.world_batch, self.world_group)
+		if self.prediction_async:
+			self.world.start_prediction_worker()
+			self.world.update_ships_prediction()
 
 	def load(self):
 		self.batch = pyglet.graphics.Batch()
@@ -172,6 +178,7 @@ class Level(Scene):
 
 	def end(self):
 		if self.world is not None:
+			self.world.stop_prediction_worker()
 			for planet in self.world.planets:
 				planet.delete()
 			# TODO: handle shipless worlds
@@ -183,6 +190,8 @@ class Level(Scene):
 			self.hud.close_overlays()
 
 	def draw(self):
+		with frame_profiler.phase('sprites'):
+			self.world.sync_states()
 		self.batch.draw()
 		with self.camera:
 			self.world_batch.draw()
@@ -192,19 +201,25 @@ class Level(Scene):
 				pyglet.shapes.Circle(*self.world.ship.pos, self.world.ship.radius).draw()
 		self.gui.batch.draw()
 
+	@tracer.traced('Level.run')
 	def run(self, dt):
 		self.camera.update(dt)
 
 		if self.game_state == GameState.RUNNING:
 			if self.world.state == WorldStates.POST_LAUNCH:
-				for i in range(self.simulation_speed):
-					self.world.step(PHYSICS_DT, update_predictions=False)
-
-					if TEST_COLLISIONS:
-						self.check_collision()
+				# the whole frame is simulated in c++, the sprites are synced once
+				with frame_profiler.phase('physics'):
+					result = self.world.tick(PHYSICS_DT, self.simulation_speed, collisions=TEST_COLLISIONS)
+				with frame_profiler.phase('collisions'):
+					self.check_collision(result['collision'])
 
 				# manually update the predictions to prevent updating them each simulated (but not always rendered) step
-				self.world.update_predictions()
+				with frame_profiler.phase('predictions'):
+					self.world.update_predictions()
+
+		# show the predictions completed in the background
+		with frame_profiler.phase('predictions'):
+			self.world.poll_predictions()
 
 		if DEBUG_CAMERA:
 			# WARNING: lines are always late by 1 frame
@@ -219,13 +234,15 @@ class Level(Scene):
 		self.world.launch_ship()
 		self.hud.show_graph()
 
-	def check_collision(self):
-		for planet in self.world.planets:
-			if self.world.ship.collides_with(planet):
-				if planet.game_entity == GameEntity.PLANET:
-					self.dispatch_event('on_lose')
-				elif planet.game_entity == GameEntity.WORMHOLE:
-					self.dispatch_event('on_win')
+	def check_collision(self, collision):
+		if collision is None:
+			return
+
+		planet = self.world.planets[collision['planet']]
+		if planet.game_entity == GameEntity.PLANET:
+			self.dispatch_event('on_lose')
+		elif planet.game_entity == GameEntity.WORMHOLE:
+			self.dispatch_event('on_win')
 
 	def reset(self):
 		# TODO:
@@ -234,6 +251,7 @@ class Level(Scene):
 		self.hud.hide_graph()
 		self.camera.set_parent(None)
 
+		self.world.stop_prediction_worker()
 		for planet in self.world.planets:
 			planet.delete()
 		# TODO: handle shipless worlds
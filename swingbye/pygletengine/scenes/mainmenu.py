@@ -3,7 +3,6 @@ import json
 import numpy as np
 from pyglet.app import exit
 from swingbye.levels.parser import parse_level
-from swingbye.logic.collisions import HitZonePoint
 from swingbye.pygletengine.scenes.scene import Scene
 from swingbye.pygletengine.scenes.layers.camera import Camera
 from swingbye.pygletengine.components.buttons import MainMenuButton
@@ -42,12 +41,10 @@ class MainMenu(Scene):
 
 	def on_click(self, x, y):
 		# self.button_container.explode(500, 1)
-		world_pos = HitZonePoint(self.camera.screen_to_world(x, y))
-		for planet in self.world.planets:
-			if planet.collides_with(world_pos):
-				self.track_new_planet(planet=planet)
-				self.total_time = 0
-				return
+		indices = self.world.planets_at(self.camera.screen_to_world(x, y))
+		if indices:
+			self.track_new_planet(planet=self.world.planets[indices[0]])
+			self.total_time = 0
 
 	def on_resize(self, width, height):
 		self.camera.on_resize(width, height)
@@ -142,6 +139,7 @@ class MainMenu(Scene):
 			self.camera = None
 
 	def draw(self):
+		self.world.sync_states()
 		self.batch.draw()
 		with self.camera:
 			self.world_batch.draw()
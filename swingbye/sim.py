@@ -0,0 +1,102 @@
+"""Headless simulation of a level : `python -m swingbye.sim [level.json] --steps 2000 --launch-time 100 --pointing 0 1`
+
+Loads the level without sprites (see `swingbye.levels.loader`), launches the ship at the given time and direction, then
+runs the physics until a collision or the number of steps, printing the trajectory, the outcome and the timings."""
+
+import argparse
+import logging
+import math
+from time import perf_counter
+from swingbye.cphysics import vec2, available_integrators
+from swingbye.levels.loader import load_level_file
+from swingbye.globals import PHYSICS_DT, PHYSICS_INTEGRATOR
+from swingbye.tracing import tracer
+
+
+def simulate(world, steps: int, dt: float, every: int, launch_time: float, pointing=None):
+	"""Launches the ship of `world` at `launch_time` pointing towards `pointing` (the level's default if None), and runs
+	up to `steps` steps of `dt`. Returns the trajectory sampled every `every` steps as (time, x, y, vx, vy) tuples, the
+	collision dict (see `cphysics.World.tick`) or None, and the number of steps run"""
+
+	world.autoupdate_predictions = False
+	world.time = launch_time
+	if pointing is not None:
+		world.ship.pointing = pointing
+	world.launch_ship()
+
+	trajectory = [(world.time, *world.ship.pos, *world.ship.vel)]
+	collision = None
+	done = 0
+	while done < steps and collision is None:
+		result = world.tick(dt, min(every, steps - done))
+		done += result['steps']
+		collision = result['collision']
+		trajectory.append((result['time'], *result['states'][0]))
+
+	return trajectory, collision, done
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(prog='python -m swingbye.sim', description='Simulates a level without a display')
+	parser.add_argument('level', nargs='?', default='swingbye/levels/level1.json', help='level file (default: %(default)s)')
+	parser.add_argument('--steps', type=int, default=2000, help='maximum number of physics steps (default: %(default)s)')
+	parser.add_argument('--dt', type=float, default=PHYSICS_DT, help='physics timestep (default: %(default)s)')
+	parser.add_argument('--launch-time', type=float, default=0.0, help='world time at which the ship is launched (default: %(default)s)')
+	pointing = parser.add_mutually_exclusive_group()
+	pointing.add_argument('--pointing', type=float, nargs=2, metavar=('X', 'Y'), help='launch direction (default: the level\'s)')
+	pointing.add_argument('--angle', type=float, help='launch direction in degrees, counterclockwise from the x axis')
+	parser.add_argument('--integrator', choices=available_integrators(), default=PHYSICS_INTEGRATOR, help='(default: %(default)s)')
+	parser.add_argument('--every', type=int, default=100, help='print the trajectory every this many steps (default: %(default)s)')
+	parser.add_argument('--quiet', action='store_true', help='don\'t print the trajectory')
+	parser.add_argument('--trace', metavar='FILE', help='write a Chrome trace of the simulation (see swingbye.tracing)')
+	args = parser.parse_args(argv)
+
+	logging.basicConfig(level=logging.WARNING)
+
+	if args.angle is not None:
+		args.pointing = (math.cos(math.radians(args.angle)), math.sin(math.radians(args.angle)))
+	if args.pointing is not None:
+		norm = math.hypot(*args.pointing)
+		if norm == 0:
+			parser.error('the pointing direction cannot be zero')
+		args.pointing = vec2(args.pointing[0]/norm, args.pointing[1]/norm)
+
+	if args.trace:
+		tracer.start(args.trace)
+
+	start = perf_counter()
+	with tracer.span('load_level', level=args.level):
+		world = load_level_file(args.level)
+	world.integrator = args.integrator
+	t_load = perf_counter() - start
+
+	if len(world.entities) == 0:
+		if args.trace:
+			tracer.stop()
+		parser.error(f'level `{args.level}` has no ship to launch')
+
+	start = perf_counter()
+	with tracer.span('simulate'):
+		trajectory, collision, steps = simulate(world, args.steps, args.dt, max(1, args.every), args.launch_time, args.pointing)
+	t_run = perf_counter() - start
+
+	if args.trace:
+		tracer.stop()
+
+	if not args.quiet:
+		print(f'{"time":>12s} {"x":>12s} {"y":>12s} {"vx":>12s} {"vy":>12s}')
+		for sample in trajectory:
+			print(' '.join(f'{value:12.4f}' for value in sample))
+
+	if collision is None:
+		print(f'no collision after {steps} steps')
+	else:
+		planet = world.planets[collision['planet']]
+		outcome = 'win' if planet.kind == 'wormhole' else 'lose'
+		print(f'{outcome} : collided with `{planet.name}` at time {collision["time"]:.4f}, {collision["pos"]}, after {steps} steps')
+
+	print(f'load {t_load*1e3:.2f} ms, simulation {t_run*1e3:.2f} ms ({steps/t_run if t_run > 0 else float("inf"):.0f} steps/s)')
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,89 @@
+if __name__ == '__main__':
+	from swingbye.cphysics import World, Entity, vec2
+	import numpy as np
+	from time import time
+
+	def make_world(n, seed=0):
+		rng = np.random.default_rng(seed)
+		world = World()
+		world.add_planet(mass=1000.0)
+		for _ in range(n):
+			world.add_planet(mass=rng.uniform(0.01, 1.0), maxis=rng.uniform(200, 5000), ecc=rng.uniform(0, 0.5), parg=rng.uniform(0, 2*np.pi), time0=rng.uniform(0, 1000))
+			world.planets[-1].set_parent(world.planets[0])
+		return world
+
+	def forces(world, probes, time):
+		return np.array([[*World.forces_on(probe, world, time)] for probe in probes])
+
+	rng = np.random.default_rng(1)
+	probes = [Entity(pos=vec2(*p), vel=vec2(0, 0), mass=1.0) for p in rng.uniform(-6000, 6000, (200, 2))]
+
+	print('>>> theta = 0 is the direct sum, and the default')
+	world = make_world(300)
+	assert(world.barnes_hut_theta == 0.0)
+	direct = forces(world, probes, 12.0)
+	world.barnes_hut_theta = 1e-12
+	assert(np.allclose(forces(world, probes, 12.0), direct, rtol=1e-12, atol=0))
+	try:
+		world.barnes_hut_theta = -1.0
+		assert(False)
+	except ValueError:
+		pass
+	print('OK')
+
+	print('>>> the tree follows the planets')
+	world.barnes_hut_theta = 0.5
+	world.planets[1].mass = 500.0
+	world.planets[1].maxis = 100.0
+	approx = forces(world, probes, 12.0)
+	world.barnes_hut_theta = 0.0
+	direct = forces(world, probes, 12.0)
+	assert(np.max(np.linalg.norm(approx - direct, axis=1) / np.linalg.norm(direct, axis=1)) < 0.05)
+	print('OK')
+
+	print('>>> accuracy versus speed against the direct sum, 200 probes')
+	for n in [100, 1000, 5000]:
+		world = make_world(n)
+		times = np.linspace(0, 100, 20)
+
+		world.barnes_hut_theta = 0.0
+		for t in times:
+			forces(world, probes[:1], t)  # fill the ephemeris cache, timed apart
+		start = time()
+		direct = [forces(world, probes, t) for t in times]
+		t_direct = time() - start
+		print(f'n={n:5d} direct           : {t_direct:.4f}s')
+
+		medians = []
+		for theta in [0.3, 0.5, 0.8, 1.2]:
+			world.barnes_hut_theta = theta
+			world.invalidate_ephemeris()
+			for t in times:
+				forces(world, probes[:1], t)  # builds the trees
+			start = time()
+			approx = [forces(world, probes, t) for t in times]
+			t_tree = time() - start
+			# Relative errors per probe, the largest ones are where the attractions nearly cancel out
+			errors = np.concatenate([np.linalg.norm(a - d, axis=1) / np.linalg.norm(d, axis=1) for a, d in zip(approx, direct)])
+			print(f'n={n:5d} theta={theta:.1f} : {t_tree:.4f}s, relative error median {np.median(errors):.2e} max {np.max(errors):.2e}')
+			medians.append(np.median(errors))
+			if theta <= 0.5:
+				assert(np.median(errors) < 2e-2)
+		assert(medians == sorted(medians))
+
+	print('>>> predictions of 256 ships over 100 steps among 5000 planets')
+	# Solving the orbits of the planets at each evaluated time is shared by both methods, the tree pays off once
+	# enough ships are evaluated against each ephemeris
+	states = np.column_stack([rng.uniform(-3000, 3000, (256, 2)), rng.uniform(-1, 1, (256, 2))])
+	world.barnes_hut_theta = 0.0
+	world.invalidate_ephemeris()
+	start = time()
+	world.get_predictions_batch(states[:1], 0.0, 10.0, 100)
+	t_ephemeris = time() - start
+	print(f'ephemerides alone : {t_ephemeris:.4f}s')
+	for theta in [0.0, 0.5]:
+		world.barnes_hut_theta = theta
+		world.invalidate_ephemeris()
+		start = time()
+		world.get_predictions_batch(states, 0.0, 10.0, 100)
+		print(f'theta={theta:.1f}         : {time()-start:.4f}s')
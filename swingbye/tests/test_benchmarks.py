@@ -0,0 +1,27 @@
+if __name__ == '__main__':
+	from swingbye.benchmarks import benchmarks, run_all, compare, save, load
+	import os
+	import tempfile
+
+	print('>>> running a few benchmarks')
+	benches = benchmarks(['pos_at/circular/depth1', 'get_predictions/100samples', 'LineGraph.update_data/*'])
+	assert([bench.name for bench in benches] == ['pos_at/circular/depth1', 'get_predictions/100samples', 'LineGraph.update_data/3lines'])
+	results = run_all(benches, repeat=5, warmup=1)
+	for stats in results['results'].values():
+		assert(0 < stats['min'] <= stats['median'] <= stats['p95'] <= stats['max'])
+		assert(stats['repeat'] == 5)
+	assert(len(results['results']) + len(results['skipped']) == 3)
+	print('OK')
+
+	print('>>> results round trip through JSON, and compare to a baseline')
+	path = os.path.join(tempfile.mkdtemp(), 'results.json')
+	save(results, path)
+	baseline = load(path)
+	assert(baseline['results'] == results['results'])
+	rows = compare(results, baseline)
+	assert(all(ratio == 1.0 and not regressed for _, _, _, ratio, regressed in rows))
+	for stats in baseline['results'].values():
+		stats['min'] /= 2
+	assert(all(regressed for *_, regressed in compare(results, baseline, tolerance=0.5)))
+	assert(not any(regressed for *_, regressed in compare(results, baseline, tolerance=1.5)))
+	print('OK')
@@ -0,0 +1,69 @@
+if __name__ == '__main__':
+	from swingbye.cphysics import World, Entity, vec2, time_of_impact
+	from swingbye.logic.collisions import HitZoneDisk, HitZonePoint, collides
+	from time import time
+
+	print('>>> time of impact of moving disks')
+	assert(time_of_impact(vec2(-10, 0), vec2(10, 0), 1, vec2(0, 0), vec2(0, 0), 1) == 0.4)
+	assert(time_of_impact(vec2(-10, 0), vec2(10, 0), 1, vec2(0, 5), vec2(0, 5), 1) is None)  # passes by
+	assert(time_of_impact(vec2(-10, 0), vec2(-5, 0), 1, vec2(0, 0), vec2(0, 0), 1) is None)  # stops short
+	assert(time_of_impact(vec2(0, 0), vec2(10, 0), 1, vec2(1, 0), vec2(20, 0), 1) is None)  # touching, moving apart
+	assert(time_of_impact(vec2(0, 0), vec2(10, 0), 1, vec2(1, 0), vec2(5, 0), 1) == 0.0)  # touching, moving closer
+	assert(time_of_impact(vec2(0, 0), vec2(0.1, 0), 1, vec2(1, 0), vec2(1.5, 0), 1) == 0.0)  # moving apart, still overlapping at the end
+	assert(time_of_impact(vec2(0, 0), vec2(0, 0), 1, vec2(0, 10), vec2(0, -10), 1) == 0.4)  # the planet moves
+	print('OK')
+
+	print('>>> a fast ship cannot tunnel through a small planet')
+	world = World()
+	world.add_planet(mass=1.0, anchor=vec2(100.0, 0.0))
+	world.planets[0].radius = 5.0
+	world.add_entity(pos=vec2(0.0, 0.0), vel=vec2(15.0, 0.0))
+	world.entities[0].radius = 1.0
+	world.time = 0
+
+	ship = Entity(pos=vec2(0.0, 0.0), vel=vec2(15.0, 0.0))
+	ship.radius = 1.0
+	predictions, collision = world.predict_collision(ship, 0, 100, 20)
+	discrete = [(vec2(*p) - world.planets[0].pos).length() <= 6.0 for p in predictions]
+	print(f'discrete checks hit : {any(discrete)}, swept : {collision}')
+	assert(not any(discrete))
+	assert(collision['planet'] == 0 and abs(collision['pos'].x - 94.0) < 1.0)
+
+	result = world.tick(5, 20)
+	print(result['collision'])
+	assert(result['collision']['planet'] == 0 and abs(result['collision']['time'] - collision['time']) < 0.1)
+	print('OK')
+
+	print('>>> benchmark against the former python path')
+
+	def collides_python(obj1, obj2):
+		# former isinstance dispatch of logic/collisions.py, disks only
+		if isinstance(obj1, HitZoneDisk) and isinstance(obj2, HitZoneDisk):
+			return (obj1.pos - obj2.pos).length() <= obj1.radius + obj2.radius
+
+	disks = [HitZoneDisk(radius=5, pos=vec2(10.0*i, 3.0)) for i in range(10)]
+	ship = HitZoneDisk(radius=10, pos=vec2(1000.0, 0.0))
+	n = 10000
+	start = time()
+	for _ in range(n):
+		for disk in disks:
+			collides_python(ship, disk)
+	print(f'python, {n}x10 disk tests   : {time()-start:.6f}s')
+	start = time()
+	for _ in range(n):
+		for disk in disks:
+			collides(ship, disk)
+	print(f'c++ tests from python       : {time()-start:.6f}s')
+
+	world = World()
+	for i in range(10):
+		world.add_planet(mass=0.0, anchor=vec2(10.0*i, 3.0))
+		world.planets[-1].radius = 5.0
+	world.add_entity(pos=vec2(1000.0, 0.0), vel=vec2(1.0, 0.0))
+	world.entities[0].radius = 10.0
+	start = time()
+	assert(world.tick(5, n)['steps'] == n)
+	print(f'{n} swept steps in c++   : {time()-start:.6f}s (including the integration)')
+	start = time()
+	world.tick(5, n, collisions=False)
+	print(f'{n} steps without collisions : {time()-start:.6f}s')
@@ -0,0 +1,51 @@
+if __name__ == '__main__':
+	import numpy as np
+	from time import time
+	from swingbye.cphysics import Planet, vec2
+
+	sun = Planet(mass=20, anchor=vec2(0.0, 0.0))
+	comet = Planet(mass=1, maxis=800, ecc=0.9, parg=1.2, incl=0.3)
+	comet.set_parent(sun)
+	moon = Planet(mass=1, maxis=30, ecc=0.2)
+	moon.set_parent(comet)
+
+	print('>>> interpolated positions are within the tolerance')
+	times = np.random.default_rng(0).uniform(-1e5, 1e5, 10000)
+	direct = moon.pos_at_many(times)
+	for planet in (comet, moon):
+		planet.ephemeris_tolerance = 1e-6
+	interpolated = moon.pos_at_many(times)
+	error = np.abs(interpolated - direct).max()
+	print(f'max error {error:.3e}, table sizes {comet.ephemeris_table_size} and {moon.ephemeris_table_size}')
+	assert(error < 2e-6)  # both orbits of the chain are interpolated
+	print('OK')
+
+	print('>>> interpolated velocities match finite differences')
+	for t in times[:10]:
+		dt = 1e-3
+		finite_difference = (moon.pos_at(t + dt/2) - moon.pos_at(t - dt/2)) / dt
+		assert((moon.vel_at(t) - finite_difference).length() < 1e-3)
+	print('OK')
+
+	print('>>> tables are rebuilt when the orbital elements change')
+	size = comet.ephemeris_table_size
+	comet.ecc = 0.1
+	comet.ephemeris_tolerance = 0
+	direct = comet.pos_at(1234.5)
+	comet.ephemeris_tolerance = 1e-6
+	assert((comet.pos_at(1234.5) - direct).length() < 1e-6)
+	print(f'table size went from {size} to {comet.ephemeris_table_size}')
+	assert(comet.ephemeris_table_size != size)
+	print('OK')
+
+	print('>>> timing 100000 positions, direct solver against interpolated ephemeris')
+	times = np.random.default_rng(1).uniform(-1e5, 1e5, 100000)
+	out = np.empty((times.shape[0], 2))
+	for tolerance in (0, 1e-3, 1e-6, 1e-9):
+		for planet in (comet, moon):
+			planet.ephemeris_tolerance = tolerance
+		moon.pos_at_many(times[:10], out=out[:10])  # build the tables outside of the timing
+		start = time()
+		moon.pos_at_many(times, out=out)
+		end = time()
+		print(f'tolerance={tolerance:g}: {end-start:.6f}s (table sizes {comet.ephemeris_table_size}, {moon.ephemeris_table_size})')
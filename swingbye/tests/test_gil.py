@@ -0,0 +1,83 @@
+if __name__ == '__main__':
+	from swingbye.cphysics import World, Entity, Planet, vec2
+	import numpy as np
+	import threading
+
+	def python_progress_during(func):
+		# counts how far a python thread gets while `func` runs
+		count = 0
+		running = True
+		def count_up():
+			nonlocal count
+			while running:
+				count += 1
+		thread = threading.Thread(target=count_up)
+		thread.start()
+		start = count
+		func()
+		progress = count - start
+		running = False
+		thread.join()
+		return progress
+
+	world = World()
+	world.add_planet(mass=1000.0)
+	world.add_planet(mass=20.0, maxis=400.0, ecc=0.2)
+	world.planets[1].set_parent(world.planets[0])
+	ship = Entity(pos=vec2(-600.0, -300.0), vel=vec2(1.2, 0.4))
+	states = np.tile([-600.0, -300.0, 1.2, 0.4], (16, 1))
+
+	print('>>> python threads run during the simulation')
+	for name, func in [
+		('get_predictions', lambda: world.get_predictions(ship, 0, 100000, 100000)),
+		('get_predictions_batch', lambda: world.get_predictions_batch(states, 0, 10000, 10000)),
+		('pos_at_many', lambda: world.planets[1].pos_at_many(np.linspace(0, 1e6, 1000000))),
+	]:
+		world.invalidate_ephemeris()
+		progress = python_progress_during(func)
+		print(f'{name} : {progress}')
+		assert(progress > 0)
+
+	print('>>> python orbits keep the GIL, and still work from other threads')
+	class FixedPlanet(Planet):
+		def pos_at(self, time):
+			return vec2(-100.0, 50.0)
+
+	world.add_planet_existing(FixedPlanet(mass=50.0))
+	expected = world.get_predictions(ship, 0, 1000, 200)
+	results = []
+	threads = [threading.Thread(target=lambda: results.append(world.get_predictions(ship, 0, 1000, 200))) for _ in range(4)]
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+	assert(all(np.array_equal(result, expected) for result in results))
+	print('OK')
+
+	print('>>> predictions from another thread while the world is stepped and invalidated')
+	world = World()
+	world.add_planet(mass=1000.0)
+	for maxis, ecc in [(300.0, 0.1), (700.0, 0.6), (-500.0, 1.4)]:
+		world.add_planet(mass=5.0, maxis=maxis, ecc=ecc)
+		world.planets[-1].set_parent(world.planets[0])
+	world.add_entity(pos=vec2(-600.0, -300.0), vel=vec2(1.2, 0.4), mass=1.0)
+	world.ephemeris_cache_capacity = 64  # evictions and replacements all along
+	expected = world.get_predictions(ship, 0, 2000, 400)
+
+	mismatches = []
+	done = threading.Event()
+	def predict():
+		while not done.is_set():
+			if not np.array_equal(world.get_predictions(ship, 0, 2000, 400), expected):
+				mismatches.append(1)
+	thread = threading.Thread(target=predict)
+	thread.start()
+	for i in range(300):
+		world.tick(5.0, 4)
+		world.time = (i % 50) * 5.0
+		if i % 20 == 0:
+			world.invalidate_ephemeris()
+	done.set()
+	thread.join()
+	assert(mismatches == [])
+	print('OK')
@@ -0,0 +1,137 @@
+if __name__ == '__main__':
+	from swingbye.cphysics import World, Entity, vec2, available_integrators
+	import numpy as np
+
+	print('>>> available integrators')
+	print(available_integrators())
+	assert({'rk4', 'rk45', 'verlet', 'yoshida4'} <= set(available_integrators()))
+
+	world = World()
+	world.add_planet(mass=1000.0, anchor=vec2(0.0, 0.0))
+	world.add_planet(mass=20.0, maxis=400.0, ecc=0.2)
+	world.planets[1].set_parent(world.planets[0])
+	ship = Entity(pos=vec2(-600.0, -300.0), vel=vec2(1.2, 0.4))
+
+	def force_evaluations(method, n, tolerance=None):
+		# each force evaluation reads the planet positions once
+		world.reset_ephemeris_cache_stats()
+		prediction = world.get_predictions(ship, 0, 2500, n, integrator=method, tolerance=tolerance)
+		return prediction, world.ephemeris_cache_hits + world.ephemeris_cache_misses
+
+	print('>>> reference trajectory (rk45, tolerance 1e-12)')
+	reference, _ = force_evaluations('rk45', 500, 1e-12)
+
+	print('>>> error against force evaluations')
+	for method, n, tolerance in [('rk4', 500, None), ('rk4', 5000, None), ('rk45', 500, 1e-6), ('rk45', 500, 1e-8)]:
+		prediction, evaluations = force_evaluations(method, n, tolerance)
+		error = np.abs(prediction[n//500-1::n//500] - reference).max()
+		print(f'{method:5s} n={n:5d} tolerance={tolerance} : error {error:.3e}, {evaluations} force evaluations')
+		if method == 'rk45':
+			assert(error < 1e3*tolerance*np.abs(reference).max())
+
+	print('>>> rk45 samples do not depend on the sampling')
+	coarse = world.get_predictions(ship, 0, 2500, 50, integrator='rk45', tolerance=1e-10)
+	fine = world.get_predictions(ship, 0, 2500, 500, integrator='rk45', tolerance=1e-10)
+	print(np.abs(coarse - fine[9::10]).max())
+	assert(np.abs(coarse - fine[9::10]).max() < 1e-3)
+
+	print('>>> stepping with the world integrator')
+	for method in available_integrators():
+		world.integrator = method
+		world.time = 0
+		world.add_entity(pos=vec2(-600.0, -300.0), vel=vec2(1.2, 0.4))
+		for _ in range(500):
+			world.step(5)
+		print(method, world.entities[0].pos)
+		world.rm_entity(0)
+	world.integrator = 'rk4'
+
+	print('>>> symplectic integrators do not drift in energy')
+	import math
+	world = World()
+	world.add_planet(mass=1000.0, anchor=vec2(0.0, 0.0))
+	world.add_entity(pos=vec2(200.0, 0.0), vel=vec2(0.0, 1.1*math.sqrt(1001/200)*200/201))
+	ship = world.entities[0]
+	initial_pos, initial_vel = vec2(ship.pos), vec2(ship.vel)
+
+	def energy(entity):
+		# energy per unit mass matching the softened force of World.forces_on
+		return 0.5*entity.vel.length()**2 - (world.planets[0].mass + entity.mass)/(entity.pos.length() + 1)
+
+	for method in ['rk4', 'verlet', 'yoshida4']:
+		world.integrator = method
+		world.time = 0
+		ship.pos, ship.vel = vec2(initial_pos), vec2(initial_vel)
+		energies = []
+		for _ in range(20000):
+			world.step(5)
+			energies.append(energy(ship))
+		energies = np.array(energies)
+		drift = energies[-2000:].mean() - energies[:2000].mean()
+		print(f'{method:8s} : energy oscillation {np.ptp(energies):.3e}, drift {drift:.3e}')
+		if method != 'rk4':
+			assert(abs(drift) < 0.05*np.ptp(energies))
+
+	print('>>> verlet reuses the force at the end of the previous step')
+	world.integrator = 'verlet'
+	world.time = 0
+	ship.pos, ship.vel = vec2(initial_pos), vec2(initial_vel)
+	world.reset_stats()
+	for _ in range(100):
+		world.step(5)
+	chained = vec2(ship.pos)
+	print(world.stats()['forces_on'], 'force evaluations for 100 steps')
+	assert(world.stats()['forces_on'] == 100 + 1)
+
+	# same steps without the reuse : changing the world between the steps discards the force
+	world.time = 0
+	ship.pos, ship.vel = vec2(initial_pos), vec2(initial_vel)
+	world.reset_stats()
+	for _ in range(100):
+		world.invalidate_ephemeris()
+		world.step(5)
+	assert(world.stats()['forces_on'] == 2*100)
+	assert(abs(ship.pos.x - chained.x) < 1e-9 and abs(ship.pos.y - chained.y) < 1e-9)
+
+	world.reset_stats()
+	world.get_predictions(Entity(pos=initial_pos, vel=initial_vel), 0, 500, 100, integrator='verlet')
+	assert(world.stats()['forces_on'] == 100 + 1)
+
+	# moving the entity or editing a planet discards the force
+	world.reset_stats()
+	world.step(5)  # continues the previous steps
+	ship.pos = ship.pos + vec2(1.0, 0.0)
+	world.step(5)
+	world.planets[0].mass = 1001.0
+	world.step(5)
+	assert(world.stats()['forces_on'] == 1 + 2 + 2)
+	world.integrator = 'rk4'
+	print('OK')
+
+	print('>>> rk45 gives up on non-finite states instead of refining forever')
+	nan_world = World()
+	nan_world.add_planet(mass=100.0)
+	nan_ship = Entity(pos=vec2(float('nan'), 0.0), vel=vec2(1.0, 0.0))
+	for method in ['rk4', 'rk45']:
+		prediction = nan_world.get_predictions(nan_ship, 0, 10, 5, integrator=method)
+		assert(np.isnan(prediction[:, 0]).all())
+	batch = nan_world.get_predictions_batch(np.array([[float('nan'), 0.0, 1.0, 0.0], [300.0, 0.0, 0.0, 1.0]]), 0, 10, 5, integrator='rk45')
+	assert(np.isnan(batch[0, :, 0]).all() and np.isfinite(batch[1]).all())
+	nan_world.integrator = 'rk45'
+	nan_world.add_entity(pos=vec2(float('nan'), 0.0), vel=vec2(1.0, 0.0))
+	nan_world.step(1.0)
+	assert(math.isnan(nan_world.entities[0].pos.x))
+	print('OK')
+
+	print('>>> unknown integrators are rejected')
+	try:
+		world.integrator = 'leapfrog'
+		assert(False)
+	except ValueError as e:
+		print(e)
+	try:
+		world.get_predictions(ship, 0, 10, 10, tolerance=-1)
+		assert(False)
+	except ValueError as e:
+		print(e)
+	print('OK')
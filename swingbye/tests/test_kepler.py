@@ -0,0 +1,42 @@
+if __name__ == '__main__':
+	import numpy as np
+	from time import time
+	from swingbye.cphysics import solve_kepler, solve_kepler_hyperbolic
+
+	rng = np.random.default_rng(0)
+
+	print('>>> elliptic solutions satisfy M = E - e*sin(E), even at high eccentricity')
+	M = rng.uniform(-20, 20, 100000)
+	e = rng.uniform(0, 0.999, 100000)
+	E, stats = solve_kepler(M, e)
+	print(stats)
+	assert(np.abs(E - e*np.sin(E) - M).max() < 1e-10)
+	assert(stats['nonconverged'] == 0)
+	print('OK')
+
+	print('>>> a single eccentricity is broadcast')
+	E, stats = solve_kepler(M, 0.99)
+	assert(np.abs(E - 0.99*np.sin(E) - M).max() < 1e-10)
+	print(stats)
+	print('OK')
+
+	print('>>> hyperbolic solutions satisfy M = e*sinh(H) - H')
+	M = rng.uniform(-50, 50, 100000)
+	e = rng.uniform(1.001, 5, 100000)
+	H, stats = solve_kepler_hyperbolic(M, e)
+	print(stats)
+	assert(np.abs((e*np.sinh(H) - H - M) / np.maximum(1, np.abs(M))).max() < 1e-10)
+	assert(stats['nonconverged'] == 0)
+	print('OK')
+
+	print('>>> timing 100000 elliptic solves at e=0.9, batched against one call each')
+	M = rng.uniform(-np.pi, np.pi, 100000)
+	start = time()
+	solve_kepler(M, 0.9)
+	end = time()
+	print(f'batched: {end-start:.6f}s')
+	start = time()
+	for m in M[:10000]:
+		solve_kepler([m], 0.9)
+	end = time()
+	print(f'one call each (10000 only): {end-start:.6f}s')
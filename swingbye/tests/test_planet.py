@@ -20,6 +20,32 @@ if __name__ == '__main__':
 	print(p2.pos_at(1))
 	print(p3.pos_at(1))
 
+	print('>>> batched positions match single positions')
+	import numpy as np
+	times = np.linspace(0, 100, 1000)
+	positions = p3.pos_at_many(times)
+	assert(positions.shape == (1000, 2))
+	for t, pos in zip(times[::100], positions[::100]):
+		assert(np.allclose(tuple(p3.pos_at(t)), pos))
+	rel_positions = p3.rel_pos_at_many(times)
+	assert(np.allclose(tuple(p3.rel_pos_at(times[1])), rel_positions[1]))
+	out = np.empty((1000, 2))
+	assert(p3.pos_at_many(times, out=out) is out)
+	assert(np.array_equal(out, positions))
+	print('OK')
+
+	print('>>> analytic velocities match finite differences')
+	comet = Planet(maxis=-400.0, ecc=1.3, parg=0.5)
+	comet.set_parent(p1)
+	eccentric = Planet(maxis=50.0, ecc=0.8, incl=0.4)
+	eccentric.set_parent(p3)
+	for planet in (p2, p3, comet, eccentric):
+		for t in (-150.0, 0.5, 3.0, 77.0):
+			dt = 1e-4
+			finite_difference = (planet.pos_at(t + dt/2) - planet.pos_at(t - dt/2)) / dt
+			assert((planet.vel_at(t) - finite_difference).length() < 1e-5 * max(1.0, finite_difference.length()))
+	print('OK')
+
 	print('>>> timing 1000 position computation at random times')
 	from time import time
 	from random import uniform
@@ -28,3 +54,10 @@ if __name__ == '__main__':
 		p3.pos_at(uniform(0, 100))
 	end = time()
 	print(f'{end-start:.6f}s')
+
+	print('>>> timing 1000 batched position computation at random times')
+	times = np.random.uniform(0, 100, 1000)
+	start = time()
+	p3.pos_at_many(times, out=out)
+	end = time()
+	print(f'{end-start:.6f}s')
@@ -0,0 +1,79 @@
+if __name__ == '__main__':
+	from swingbye.logic.world import World
+	from swingbye.logic.planet import Planet
+	from swingbye.logic.ship import Ship
+	from swingbye.cphysics import Entity, vec2, available_integrators
+	from swingbye.globals import PHYSICS_DT
+	import numpy as np
+	from time import time
+
+	class SpritelessPlanet(Planet):
+		# stands in for SpriteMixin, which provides the position setter of the planets
+		def _get_pos(self):
+			return super().pos
+
+		def _set_pos(self, pos):
+			super()._set_pos(pos)
+
+		pos = property(_get_pos, _set_pos)
+
+	world = World()
+	world.add_planet_existing(SpritelessPlanet(mass=1000.0))
+	world.add_planet_existing(SpritelessPlanet(mass=20.0, maxis=400.0, ecc=0.2))
+	world.planets[1].set_parent(world.planets[0])
+	world.add_entity_existing(Ship())
+	world.ship.parent = world.planets[1]
+	world.ship.radius = 5.0
+	world.planets[1].radius = 10.0
+	world.time = 0
+	world.point_ship(vec2(-1000.0, 300.0))
+	world.launch_ship()
+
+	def fresh_prediction():
+		ship = Entity(pos=vec2(world.ship.pos), vel=vec2(world.ship.vel), mass=world.ship.mass)
+		return world.propagate(ship, world.time, PHYSICS_DT, world.ship.prediction.shape[0])
+
+	print('>>> the window slides along with the simulation')
+	world.update_ships_prediction()
+	window = world.prediction_windows[world.ship]
+	for speed in [1, 1, 3, 10, 0, 7]:
+		for _ in range(speed):
+			world.step(PHYSICS_DT, update_predictions=False)
+		steps = window.update()
+		error = np.abs(world.ship.prediction - fresh_prediction()).max()
+		print(f'speed {speed:2d} : integrated {steps} steps, error {error:.3e}')
+		assert(steps == speed)
+		assert(error < 1e-6)
+
+	print('>>> jumping in time rebuilds the window')
+	world.autoupdate_predictions = False
+	world.time = world.time + 1.0
+	assert(window.update() == world.ship.prediction.shape[0])
+	assert(np.array_equal(world.ship.prediction, fresh_prediction()))
+	print('OK')
+
+	print('>>> the window slides with every integrator')
+	world.autoupdate_predictions = True
+	for method in available_integrators():
+		world.integrator = method
+		window.update()
+		counts = []
+		for _ in range(10):
+			for _ in range(3):
+				world.step(PHYSICS_DT, update_predictions=False)
+			counts.append(window.update())
+		print(f'{method:8s} : integrated {counts}')
+		assert(counts == [3]*10)
+		assert(np.abs(world.ship.prediction - fresh_prediction()).max() < 1e-6)
+	world.integrator = 'rk4'
+	print('OK')
+
+	print('>>> timing 100 frames at speed 5')
+	for incremental in [False, True]:
+		world.incremental_predictions = incremental
+		start = time()
+		for _ in range(100):
+			for _ in range(5):
+				world.step(PHYSICS_DT, update_predictions=False)
+			world.update_ships_prediction()
+		print(f'incremental={incremental} : {time()-start:.6f}s')
@@ -0,0 +1,78 @@
+if __name__ == '__main__':
+	from swingbye.logic.world import World
+	from swingbye.logic.planet import Planet
+	from swingbye.logic.ship import Ship
+	from swingbye.cphysics import vec2
+	import numpy as np
+	from time import time
+
+	class SpritelessPlanet(Planet):
+		# stands in for SpriteMixin, which provides the position setter of the planets
+		def _get_pos(self):
+			return super().pos
+
+		def _set_pos(self, pos):
+			super()._set_pos(pos)
+
+		pos = property(_get_pos, _set_pos)
+
+	class RecordingShip(Ship):
+		# stands in for PathMixin, which updates the rendered path in the prediction setter
+		def _set_prediction(self, prediction):
+			super()._set_prediction(prediction)
+			self.shown = getattr(self, 'shown', 0) + 1
+
+		prediction = property(Ship._get_prediction, _set_prediction)
+
+	def make_world():
+		world = World()
+		world.add_planet_existing(SpritelessPlanet(mass=1000.0))
+		world.add_planet_existing(SpritelessPlanet(mass=20.0, maxis=400.0, ecc=0.2))
+		world.planets[1].set_parent(world.planets[0])
+		world.add_entity_existing(RecordingShip())
+		world.ship.parent = world.planets[1]
+		world.ship.radius = 5.0
+		world.planets[1].radius = 10.0
+		world.time = 0
+		return world
+
+	print('>>> background predictions match the synchronous ones')
+	sync_world = make_world()
+	async_world = make_world()
+	async_world.start_prediction_worker()
+
+	for pointing in [vec2(1.0, 0.0), vec2(0.0, -1.0), vec2(-0.6, 0.8)]:
+		sync_world.point_ship(pointing*1000)
+		async_world.point_ship(pointing*1000)
+		async_world.prediction_worker.wait()
+		front = async_world.ship.prediction
+		async_world.poll_predictions()
+		assert(async_world.ship.prediction is not front)
+		assert(np.array_equal(async_world.ship.prediction, sync_world.ship.prediction))
+	print('OK')
+
+	print('>>> launched ship')
+	sync_world.launch_ship()
+	async_world.launch_ship()
+	for _ in range(10):
+		sync_world.step(5, update_predictions=False)
+		async_world.step(5, update_predictions=False)
+	sync_world.update_predictions()
+	async_world.update_predictions()
+	async_world.prediction_worker.wait()
+	async_world.poll_predictions()
+	assert(np.array_equal(async_world.ship.prediction, sync_world.ship.prediction))
+	print('OK')
+
+	print('>>> requests are coalesced, polling never blocks')
+	shown = async_world.ship.shown
+	start = time()
+	for _ in range(100):
+		async_world.update_ships_prediction()
+		async_world.poll_predictions()
+	print(f'100 frames : {time()-start:.6f}s, {async_world.ship.shown - shown} predictions shown')
+	async_world.prediction_worker.wait()
+	async_world.poll_predictions()
+	assert(np.array_equal(async_world.ship.prediction, sync_world.ship.prediction))
+	async_world.stop_prediction_worker()
+	print('OK')
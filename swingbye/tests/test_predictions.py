@@ -27,9 +27,18 @@ if __name__ == '__main__':
 	ship = Entity(pos=vec2(100.0, 100.0))
 	print(world.get_predictions(ship, 0, 40, 4))
 
+	print('>>> predictions are written into a provided buffer')
+	import numpy as np
+	out = np.empty((4, 2))
+	predictions = world.get_predictions(ship, 0, 40, 4, out=out)
+	assert(predictions is out)
+	assert(np.array_equal(out, world.get_predictions(ship, 0, 40, 4)))
+	print('OK')
+
 	print('>>> timing 1000 entity predictions')
 	from time import time
+	out = np.empty((1000, 2))
 	start = time()
-	world.get_predictions(ship, 0, 40, 1000)
+	world.get_predictions(ship, 0, 40, 1000, out=out)
 	end = time()
 	print(f'{end-start:.6f}s')
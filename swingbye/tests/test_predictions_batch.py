@@ -0,0 +1,65 @@
+if __name__ == '__main__':
+	from swingbye.cphysics import World, Entity, vec2
+	import numpy as np
+	from time import time
+
+	world = World()
+	world.add_planet(mass=1000.0, anchor=vec2(0.0, 0.0))
+	world.add_planet(mass=20.0, maxis=400.0, ecc=0.2)
+	world.add_planet(mass=5.0, maxis=60.0, ecc=0.1)
+	world.planets[1].set_parent(world.planets[0])
+	world.planets[2].set_parent(world.planets[1])
+
+	print('>>> a fan of launch directions from the same point')
+	rng = np.random.default_rng(0)
+	k = 64
+	angles = rng.uniform(0, 2*np.pi, k)
+	states = np.column_stack([np.full(k, -600.0), np.full(k, -300.0), 1.2*np.cos(angles), 1.2*np.sin(angles)])
+
+	print('>>> batch predictions match individual predictions')
+	for integrator in ['rk4', 'yoshida4', 'rk45']:
+		batch = world.get_predictions_batch(states, 0, 2500, 500, integrator=integrator)
+		threaded = world.get_predictions_batch(states, 0, 2500, 500, integrator=integrator, threads=4)
+		assert(batch.shape == (k, 500, 2))
+		for j in range(k):
+			ship = Entity(pos=vec2(*states[j, :2]), vel=vec2(*states[j, 2:]))
+			assert(np.array_equal(batch[j], world.get_predictions(ship, 0, 2500, 500, integrator=integrator)))
+		assert(np.array_equal(batch, threaded))
+		print(integrator, 'OK')
+
+	print('>>> predictions are written into a provided buffer')
+	out = np.empty((k, 500, 2))
+	assert(world.get_predictions_batch(states, 0, 2500, 500, out=out) is out)
+	try:
+		world.get_predictions_batch(states, 0, 2500, 500, out=np.empty((k, 499, 2)))
+		assert(False)
+	except ValueError as e:
+		print(e)
+
+	print('>>> python orbits are evaluated by the calling thread')
+	from swingbye.cphysics import Planet
+
+	class FixedPlanet(Planet):
+		def pos_at(self, time):
+			return vec2(-100.0, 50.0)
+
+	custom_world = World()
+	custom_world.add_planet_existing(Planet(mass=1000.0))
+	custom_world.add_planet_existing(FixedPlanet(mass=50.0))
+	batch = custom_world.get_predictions_batch(states[:8], 0, 500, 100, threads=4)
+	ship = Entity(pos=vec2(*states[3, :2]), vel=vec2(*states[3, 2:]))
+	assert(np.array_equal(batch[3], custom_world.get_predictions(ship, 0, 500, 100)))
+	print('OK')
+
+	print('>>> timing 64 trajectories of 500 steps')
+	start = time()
+	for j in range(k):
+		ship = Entity(pos=vec2(*states[j, :2]), vel=vec2(*states[j, 2:]))
+		world.invalidate_ephemeris()
+		world.get_predictions(ship, 0, 2500, 500)
+	print(f'one by one (cold cache)   : {time()-start:.6f}s')
+	for threads in [1, 4, 0]:
+		world.invalidate_ephemeris()
+		start = time()
+		world.get_predictions_batch(states, 0, 2500, 500, out=out, threads=threads)
+		print(f'batched, threads={threads}      : {time()-start:.6f}s')
@@ -0,0 +1,66 @@
+if __name__ == '__main__':
+	from swingbye.profiler import FrameProfiler, RingBuffer
+	import numpy as np
+	import time
+
+	print('>>> ring buffer keeps the last values, oldest first')
+	buffer = RingBuffer(4)
+	assert(len(buffer) == 0 and buffer.values().shape == (0,))
+	for value in range(3):
+		buffer.append(value)
+	assert(list(buffer.values()) == [0, 1, 2])
+	for value in range(3, 10):
+		buffer.append(value)
+	assert(len(buffer) == 4)
+	assert(list(buffer.values()) == [6, 7, 8, 9])
+	buffer.clear()
+	assert(len(buffer) == 0)
+	print('OK')
+
+	print('>>> disabled profiler records nothing')
+	profiler = FrameProfiler(size=10)
+	with profiler.phase('physics'):
+		pass
+	profiler.end_frame()
+	assert(profiler.stats() == {})
+	print('OK')
+
+	print('>>> phases are summed per frame, and count as 0 in frames they didn\'t run')
+	profiler.set_enabled(True)
+
+	@profiler.profiled('graph')
+	def update_graph():
+		return 42
+
+	for frame in range(20):
+		for _ in range(2):
+			profiler.record('physics', 1e-3)
+		if frame % 10 == 9:
+			profiler.record('predictions', 5e-3)
+			assert(update_graph() == 42)
+		profiler.end_frame()
+
+	stats = profiler.stats()
+	assert(set(stats) == {'physics', 'predictions', 'graph', 'frame'})
+	assert(np.isclose(stats['physics']['p50'], 2e-3) and np.isclose(stats['physics']['max'], 2e-3))
+	assert(stats['predictions']['p50'] == 0 and np.isclose(stats['predictions']['max'], 5e-3))
+	assert(np.isclose(stats['predictions']['last'], 5e-3))
+	assert(len(profiler.buffers['physics']) == 10)  # only the last 10 frames are kept
+	assert(len(profiler.buffers['predictions']) == 10)
+	assert(0 < stats['graph']['max'])
+	print('OK')
+
+	print('>>> phases time their body')
+	profiler.reset()
+	with profiler.phase('sleep'):
+		time.sleep(0.01)
+	profiler.end_frame()
+	assert(0.01 <= profiler.stats()['sleep']['max'] < 0.1)
+	try:
+		with profiler.phase('raise'):
+			raise ValueError()
+	except ValueError:
+		pass
+	profiler.end_frame()
+	assert('raise' in profiler.stats())
+	print('OK')
@@ -0,0 +1,28 @@
+if __name__ == '__main__':
+	from swingbye.sim import main
+	import contextlib
+	import io
+
+	print('>>> simulating a level')
+	output = io.StringIO()
+	with contextlib.redirect_stdout(output):
+		main(['swingbye/levels/level1.json', '--steps', '300', '--launch-time', '100', '--angle', '45', '--every', '50'])
+	lines = output.getvalue().splitlines()
+	print('\n'.join(lines[-2:]))
+	assert(lines[0].split() == ['time', 'x', 'y', 'vx', 'vy'])
+	assert(lines[-2].startswith(('win', 'lose', 'no collision')))
+	assert(lines[-1].startswith('load'))
+	print('OK')
+
+	print('>>> levels without a ship are reported, not simulated')
+	errors = io.StringIO()
+	with contextlib.redirect_stderr(errors):
+		try:
+			main(['swingbye/levels/editor_test.json', '--steps', '10'])
+		except SystemExit as exit:
+			assert(exit.code == 2)
+		else:
+			assert(False)
+	print(errors.getvalue().splitlines()[-1])
+	assert('has no ship' in errors.getvalue())
+	print('OK')
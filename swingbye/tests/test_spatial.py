@@ -0,0 +1,93 @@
+if __name__ == '__main__':
+	from swingbye.cphysics import World, vec2
+	import numpy as np
+	from time import time
+
+	rng = np.random.default_rng(0)
+	world = World()
+	world.add_planet(mass=1000.0)
+	world.planets[0].radius = 100.0
+	for _ in range(500):
+		world.add_planet(mass=0.1, maxis=rng.uniform(200, 5000), ecc=rng.uniform(0, 0.5), parg=rng.uniform(0, 2*np.pi), time0=rng.uniform(0, 1000))
+		world.planets[-1].set_parent(world.planets[0])
+		world.planets[-1].radius = rng.uniform(2, 40)
+	world.time = 123.0
+
+	centers = np.array([[*planet.pos] for planet in world.planets])
+	radii = np.array([planet.radius for planet in world.planets])
+
+	def brute_disk(center, radius):
+		return list(np.flatnonzero(np.hypot(*(centers - center).T) <= radii + radius))
+
+	def brute_ray(origin, direction):
+		direction = direction / np.linalg.norm(direction)
+		best = None
+		for i, (c, r) in enumerate(zip(centers, radii)):
+			oc = origin - c
+			b, cc = oc @ direction, oc @ oc - r*r
+			if cc <= 0:
+				t = 0.0
+			elif b > 0 or b*b - cc < 0:
+				continue
+			else:
+				t = -b - np.sqrt(b*b - cc)
+			if best is None or t < best[1]:
+				best = (i, t)
+		return best
+
+	print('>>> queries match a linear scan')
+	points = rng.uniform(-5000, 5000, (1000, 2))
+	for point in points:
+		assert(world.planets_at(vec2(*point)) == brute_disk(point, 0))
+		assert(world.planets_in_disk(vec2(*point), 300.0) == brute_disk(point, 300))
+	for point in points[:200]:
+		direction = rng.normal(size=2)
+		hit = world.raycast(vec2(*point), vec2(*direction))
+		expected = brute_ray(point, direction)
+		assert((hit is None) == (expected is None))
+		if hit is not None:
+			assert(hit[0] == expected[0] and abs(hit[1] - expected[1]) < 1e-9)
+	print('OK')
+
+	print('>>> large and non-finite queries')
+	start = time()
+	for radius in [1e5, 1e6, 1e300]:
+		assert(world.planets_in_disk(vec2(0.0, 0.0), radius) == list(range(len(world.planets))))
+	assert(world.planets_in_disk(vec2(1e300, 0.0), 1.0) == [])
+	assert(world.planets_in_disk(vec2(float('nan'), 0.0), 1.0) == [])
+	assert(world.planets_at(vec2(float('nan'), 0.0)) == [])
+	assert(world.planets_at(vec2(-1e300, 1e300)) == [])
+	print(f'{time()-start:.6f}s')
+	assert(time() - start < 1.0)
+	for radius in [float('nan'), float('inf')]:
+		try:
+			world.planets_in_disk(vec2(0.0, 0.0), radius)
+			assert(False)
+		except ValueError as e:
+			print(e)
+	print('OK')
+
+	print('>>> the index follows the planets')
+	index = world.planets_at(world.planets[42].pos)
+	assert(42 in index)
+	world.time = 500.0
+	assert(42 in world.planets_at(world.planets[42].pos))
+	world.planets[42].radius = 0.0
+	assert(world.planets_at(world.planets[42].pos + vec2(0.1, 0.0)).count(42) == 0)
+	world.planets[42].maxis = 7000.0
+	world.time = 500.0
+	assert(42 in world.planets_at(world.planets[42].pos))
+	print('OK')
+
+	print('>>> timing 1000 picks among 501 planets')
+	from swingbye.logic.collisions import HitZonePoint, HitZoneDisk, collides
+	disks = [HitZoneDisk(radius=planet.radius, pos=planet.pos) for planet in world.planets]
+	start = time()
+	for point in points:
+		mouse = HitZonePoint(vec2(*point))
+		[disk for disk in disks if collides(disk, mouse)]
+	print(f'linear scan : {time()-start:.6f}s')
+	start = time()
+	for point in points:
+		world.planets_at(vec2(*point))
+	print(f'grid        : {time()-start:.6f}s')
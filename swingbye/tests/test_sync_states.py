@@ -0,0 +1,67 @@
+if __name__ == '__main__':
+	from swingbye.cphysics import vec2
+	from swingbye.logic.world import World
+	from swingbye.logic.planet import Planet
+	from swingbye.logic.ship import Ship
+	import numpy as np
+	from time import time
+
+	class Sprite:
+		def __init__(self):
+			self.position = None
+			self.moves = 0
+
+	class SpritePlanet(Planet):
+		"""Stands in for PlanetObject, which needs a display"""
+		def __init__(self, *args, **kwargs):
+			super().__init__(*args, **kwargs)
+			self.sprite = Sprite()
+
+		def sync_sprite(self):
+			self.sprite.position = (self.pos.x, self.pos.y)
+			self.sprite.moves += 1
+
+	world = World()
+	world.autoupdate_predictions = False
+	world.add_planet_existing(SpritePlanet(mass=1000.0))
+	world.add_planet_existing(SpritePlanet(mass=10.0, maxis=300.0))
+	world.planets[1].set_parent(world.planets[0])
+	world.add_planet_existing(Planet(mass=10.0, maxis=500.0))  # no sprite
+	world.planets[2].set_parent(world.planets[0])
+	world.add_entity_existing(Ship(pos=vec2(-600.0, 0.0), vel=vec2(0.0, 1.0)))
+
+	print('>>> states are read in bulk')
+	world.time = 3.0
+	states = world.planet_states()
+	assert(states.shape == (3, 4))
+	for state, planet in zip(states, world.planets):
+		assert(np.array_equal(state, [*planet.pos, *planet.vel]))
+	out = np.empty((1, 4))
+	assert(world.entity_states(out=out) is out)
+	assert(np.array_equal(out[0], [-600.0, 0.0, 0.0, 1.0]))
+	print('OK')
+
+	print('>>> only the moving bodies are synced, once per frame')
+	assert(world.sync_states() == 2)
+	assert(world.sync_states() == 0)  # nothing changed since
+	world.time = 10.0
+	world.time = 20.0
+	assert(world.sync_states() == 1)  # the sun stays put
+	assert(world.planets[0].sprite.moves == 1 and world.planets[1].sprite.moves == 2)
+	assert(world.planets[1].sprite.position == (world.planets[1].pos.x, world.planets[1].pos.y))
+	world.tick(1.0, 10)
+	assert(world.sync_states() == 1)
+	assert(world.entities[0].time == world.time == 30.0)
+	print('OK')
+
+	print('>>> timing 1000 frames of 10 steps among 200 planets')
+	for _ in range(200):
+		world.add_planet_existing(SpritePlanet(mass=1.0, maxis=np.random.uniform(100, 1000)))
+		world.planets[-1].set_parent(world.planets[0])
+	world.time = world.time
+	world.sync_states()
+	start = time()
+	for _ in range(1000):
+		world.tick(1.0, 10)
+		world.sync_states()
+	print(f'{time()-start:.4f}s')
@@ -0,0 +1,56 @@
+if __name__ == '__main__':
+	from swingbye.cphysics import World, vec2
+	import numpy as np
+	from time import time
+
+	def make_world():
+		world = World()
+		world.add_planet(mass=1000.0)
+		world.add_planet(mass=20.0, maxis=400.0, ecc=0.2)
+		world.planets[1].set_parent(world.planets[0])
+		world.planets[0].radius = 30.0
+		world.planets[1].radius = 5.0
+		world.add_entity(pos=vec2(-600.0, -300.0), vel=vec2(1.2, 0.4))
+		world.entities[0].radius = 10.0
+		world.time = 0
+		return world
+
+	print('>>> tick runs the same steps as step')
+	stepped = make_world()
+	ticked = make_world()
+	energies = []
+	for _ in range(50):
+		stepped.step(5)
+		energies.append((stepped.kinetic_energy(), stepped.potential_energy()))
+	result = ticked.tick(5, 50, collisions=False)
+	print({key: value for key, value in result.items() if key != 'energy'})
+	assert(result['steps'] == 50 and result['collision'] is None)
+	assert(result['time'] == stepped.time == ticked.time)
+	assert(np.array_equal(result['states'][0], [*stepped.entities[0].pos, *stepped.entities[0].vel]))
+	assert(np.array_equal(result['energy'], energies))
+	assert(ticked.planets[1].pos.x == stepped.planets[1].pos.x)
+	print('OK')
+
+	print('>>> tick stops at the first collision')
+	world = make_world()
+	world.entities[0].pos = vec2(0.0, 100.0)
+	world.entities[0].vel = vec2(0.0, 0.0)
+	result = world.tick(5, 1000)
+	print(result['collision'], result['steps'])
+	assert(result['collision']['entity'] == 0 and result['collision']['planet'] == 0)
+	assert(result['steps'] < 1000 and result['energy'].shape == (result['steps'], 2))
+	assert((world.entities[0].pos - world.planets[0].pos).length() <= 40.0)
+	print('OK')
+
+	print('>>> timing 1000 steps')
+	world = make_world()
+	start = time()
+	for _ in range(1000):
+		world.step(5)
+		world.kinetic_energy()
+		world.potential_energy()
+	print(f'step loop : {time()-start:.6f}s')
+	world = make_world()
+	start = time()
+	world.tick(5, 1000, collisions=False)
+	print(f'tick      : {time()-start:.6f}s')
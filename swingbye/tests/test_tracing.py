@@ -0,0 +1,94 @@
+if __name__ == '__main__':
+	from swingbye.tracing import Tracer
+	from swingbye.cphysics import World, Entity, vec2
+	import numpy as np
+	import os
+	import json
+	import tempfile
+	import threading
+
+	def make_world():
+		world = World()
+		world.add_planet(mass=1000.0)
+		world.add_planet(mass=1.0, maxis=200.0, ecc=0.5)
+		world.planets[1].set_parent(world.planets[0])
+		world.add_entity(pos=vec2(300.0, 0.0), vel=vec2(0.0, 1.0), mass=1.0)
+		return world
+
+	def within(inner, outer):
+		return inner['tid'] == outer['tid'] and outer['ts'] <= inner['ts'] and inner['ts'] + inner['dur'] <= outer['ts'] + outer['dur'] + 1e-3
+
+	path = os.path.join(tempfile.mkdtemp(), 'trace.json')
+	tracer = Tracer(flush_interval=0.01)
+
+	print('>>> nothing is recorded while not tracing')
+	with tracer.span('outside'):
+		make_world().step(1.0)
+	assert(len(tracer._events) == 0)
+	print('OK')
+
+	print('>>> python and cphysics spans are written to a trace file')
+	tracer.start(path)
+
+	@tracer.traced('predict')
+	def predict(world):
+		out = np.empty((100, 2))
+		world.get_predictions(world.entities[0], world.time, world.time + 100.0, 100, out=out)
+
+	world = make_world()
+	with tracer.span('frame', index=0):
+		world.tick(1.0, 3)
+		predict(world)
+
+	def background():
+		with tracer.span('background'):
+			world.get_predictions_batch(np.tile([300.0, 0.0, 0.0, 1.0], (4, 1)), 0.0, 100.0, 50, threads=2)
+	thread = threading.Thread(target=background, name='background')
+	thread.start()
+	thread.join()
+
+	tracer.stop()
+	tracer.stop()  # stopping twice is harmless
+
+	with open(path) as file:
+		events = json.load(file)
+	spans = [event for event in events if event['ph'] == 'X']
+	names = [span['name'] for span in spans]
+	print(sorted(set(names)))
+	by_name = lambda name: [span for span in spans if span['name'] == name]
+
+	frame, = by_name('frame')
+	assert(frame['args'] == {'index': 0})
+	tick, = by_name('World.tick')
+	assert(within(tick, frame))
+	assert(len(by_name('World.step')) == 3)
+	assert(all(within(step, tick) for step in by_name('World.step')))
+	get_predictions, = by_name('World.get_predictions')
+	assert(within(get_predictions, by_name('predict')[0]))
+	print('OK')
+
+	print('>>> Kepler solves are aggregated per span')
+	keplers = by_name('Kepler')
+	assert(len(keplers) > 0)
+	for kepler in keplers:
+		assert(kepler['args']['kepler_solves'] > 0)
+		assert(any(within(kepler, span) for span in spans if span['cat'] == 'cphysics' and span is not kepler))
+	print('OK')
+
+	print('>>> threads are told apart and named')
+	background_span, = by_name('background')
+	assert(background_span['tid'] != frame['tid'])
+	workers = by_name('World.get_predictions_batch.worker')
+	assert(len(workers) == 2)
+	thread_names = {event['tid']: event['args']['name'] for event in events if event['name'] == 'thread_name'}
+	assert(thread_names[frame['tid']] == threading.main_thread().name)
+	assert(thread_names[background_span['tid']] == 'background')
+	print('OK')
+
+	print('>>> a new trace starts empty')
+	tracer.start(path)
+	tracer.stop()
+	with open(path) as file:
+		events = json.load(file)
+	assert(all(event['ph'] == 'M' for event in events))
+	print('OK')
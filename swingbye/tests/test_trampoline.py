@@ -0,0 +1,81 @@
+if __name__ == '__main__':
+	from swingbye.cphysics import World, Planet, vec2, trampoline_calls, reset_trampoline_calls
+	from time import time
+	import numpy as np
+
+	class PropertyPlanet(Planet):
+		"""Like the game planets : python attributes, but no orbital override"""
+		def __init__(self, *args, **kwargs):
+			super().__init__(*args, **kwargs)
+			self.name = 'plain'
+
+	class PosPlanet(Planet):
+		def pos_at(self, time):
+			return vec2(1.0, 2.0)
+
+	class VelPlanet(Planet):
+		def vel_at(self, time):
+			return vec2(3.0, 4.0)
+
+	world = World()
+	world.add_planet(mass=100.0)
+	planets = [PropertyPlanet(maxis=10.0), PosPlanet(maxis=10.0), VelPlanet(maxis=10.0)]
+	for planet in planets:
+		planet.set_parent(world.planets[0])
+
+	print('>>> unregistered subclasses are looked up in python')
+	reset_trampoline_calls()
+	planets[0].pos_at(1.0)
+	planets[0].vel_at(1.0)
+	print(trampoline_calls())
+	assert(trampoline_calls() == {'fast': 0, 'python_lookups': 2, 'python_overrides': 0})
+	print('OK')
+
+	print('>>> overrides are detected when added to a world')
+	for planet in planets:
+		world.add_planet_existing(planet)
+	reset_trampoline_calls()
+	world.time = 1.0
+	reference = Planet(maxis=10.0)
+	reference.set_parent(world.planets[0])
+	assert((planets[0].pos - reference.pos_at(1.0)).length() < 1e-12)
+	assert(planets[1].pos.x == 1.0 and planets[1].pos.y == 2.0)
+	assert(planets[2].vel.x == 3.0 and planets[2].vel.y == 4.0)
+	print(trampoline_calls())
+	assert(trampoline_calls()['python_overrides'] == 2)
+	print('OK')
+
+	print('>>> subclasses without overrides skip python')
+	reset_trampoline_calls()
+	planets[0].pos_at(1.0)
+	planets[0].vel_at(1.0)
+	planets[0].time = 2.0
+	print(trampoline_calls())
+	assert(trampoline_calls() == {'fast': 4, 'python_lookups': 0, 'python_overrides': 0})
+	print('OK')
+
+	print('>>> pos_at_many follows the overrides of pos_at')
+	class MovingPlanet(Planet):
+		def pos_at(self, time):
+			return vec2(time + 1000.0, 0.0)
+
+	times = np.array([0.0, 3.0, 7.5])
+	unregistered = MovingPlanet(maxis=10.0)
+	unregistered.set_parent(world.planets[0])
+	registered = MovingPlanet(maxis=10.0)
+	world.add_planet_existing(registered)
+	registered.set_parent(world.planets[0])
+	for planet in [unregistered, registered, planets[0]]:
+		many = planet.pos_at_many(times)
+		single = np.array([tuple(planet.pos_at(t)) for t in times])
+		assert(np.allclose(many, single, rtol=0, atol=1e-12))
+	assert(np.array_equal(registered.pos_at_many(times)[:, 0], times + 1000.0))
+	print('OK')
+
+	print('>>> timing 100000 pos_at calls from python')
+	for label, planet in [('unregistered', PropertyPlanet(maxis=10.0)), ('registered', planets[0])]:
+		planet.set_parent(world.planets[0])
+		start = time()
+		for i in range(100000):
+			planet.pos_at(i*0.01)
+		print(f'{label:12s} : {time()-start:.4f}s')
@@ -98,3 +98,70 @@ if __name__ == '__main__':
 	print(world.planets[0].pos)
 	print(world.planets[1].pos)
 	print(world.planets[2].pos)
+
+	print('>>> ephemeris cache is shared between steps and invalidated by orbital changes')
+	world.reset_ephemeris_cache_stats()
+	world.step(0.25)
+	world.step(0.25)
+	print(f'hits={world.ephemeris_cache_hits}, misses={world.ephemeris_cache_misses}, size={world.ephemeris_cache_size}')
+	assert(world.ephemeris_cache_hits > 0)
+	world.planets[1].maxis = 10.0
+	world.time = world.time
+	assert(world.planets[1].pos_at(world.time).x == world.planets[1].pos.x)
+	assert(world.ephemeris_cache_size == 1)
+	print('OK')
+
+	print('>>> planets are evaluated parents first, python overrides of pos_at are honoured')
+
+	class FixedPlanet(Planet):
+		def pos_at(self, time):
+			return vec2(42.0, 42.0)
+
+	world = World()
+	world.add_planet_existing(Planet(anchor=vec2(1.0, 2.0)))
+	moon = Planet(maxis=3.0, ecc=0.2)
+	world.add_planet_existing(moon)  # added before its parent
+	world.add_planet_existing(Planet(maxis=30.0))
+	world.planets[2].set_parent(world.planets[0])
+	moon.set_parent(world.planets[2])
+	world.add_planet_existing(FixedPlanet())
+	world.time = 12.3
+	for planet in world.planets:
+		print(planet.pos, planet.pos_at(12.3))
+		assert((planet.pos - planet.pos_at(12.3)).length() < 1e-9)
+	print('OK')
+
+	print('>>> orbital elements mirrored in the world match the planets, for every kind of orbit')
+	world = World()
+	world.add_planet_existing(Planet(mass=100.0, anchor=vec2(5.0, -3.0)))
+	sun = world.planets[0]
+	outsider = Planet(mass=10.0, maxis=50.0)  # not in the world
+	outsider.set_parent(sun)
+	fixed = FixedPlanet(mass=10.0)
+	kinds = [
+		dict(maxis=20.0, ecc=0.3, parg=0.4, incl=0.2, time0=1.0, parent=sun),
+		dict(maxis=-20.0, ecc=1.5, parg=1.0, time0=-3.0, parent=sun),
+		dict(maxis=20.0, ecc=1.0, parent=sun),
+		dict(maxis=5.0, ecc=0.1, parent=outsider),
+		dict(maxis=5.0, ecc=0.1, parent=fixed),
+		dict(maxis=30.0, ecc=0.5, parent=sun, table=1e-9),
+	]
+	world.add_planet_existing(fixed)
+	for kind in kinds:
+		parent, table = kind.pop('parent'), kind.pop('table', 0.0)
+		planet = Planet(mass=1.0, **kind)
+		planet.set_parent(parent)
+		planet.ephemeris_tolerance = table
+		world.add_planet_existing(planet)
+	world.add_planet_existing(Planet(mass=0.1, maxis=2.0, ecc=0.2))
+	world.planets[-1].set_parent(world.planets[2])  # moon of the hyperbolic planet
+	for t in [0.0, 7.5, 123.4]:
+		world.time = t
+		for planet in world.planets:
+			assert((planet.pos - planet.pos_at(t)).length() < 1e-9*(1 + planet.pos.length()))
+			assert((planet.vel - planet.vel_at(t)).length() < 1e-6*(1 + planet.vel.length()))
+	sun.mass = 200.0
+	world.planets[1].ecc = 0.6
+	world.time = 10.0
+	assert((world.planets[1].pos - world.planets[1].pos_at(10.0)).length() < 1e-9)
+	print('OK')
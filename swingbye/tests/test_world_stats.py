@@ -0,0 +1,71 @@
+if __name__ == '__main__':
+	from swingbye.cphysics import World, Planet, Entity, vec2
+	import numpy as np
+
+	class PosPlanet(Planet):
+		def pos_at(self, time):
+			return vec2(500.0, 0.0)
+
+	def make_world():
+		world = World()
+		world.add_planet(mass=1000.0)
+		world.add_planet(mass=1.0, maxis=200.0, ecc=0.5)
+		world.add_planet(mass=1.0, maxis=-200.0, ecc=1.5)
+		for planet in world.planets[1:]:
+			planet.set_parent(world.planets[0])
+		world.add_entity(pos=vec2(300.0, 0.0), vel=vec2(0.0, 1.0), mass=1.0)
+		world.time = 0.0
+		return world
+
+	print('>>> counters start at 0 after a reset')
+	world = make_world()
+	world.reset_stats()
+	stats = world.stats()
+	print(stats)
+	assert(stats == {
+		'kepler': {'solves': 0, 'iterations': 0, 'mean_iterations': 0.0, 'max_iterations': 0, 'nonconverged': 0},
+		'forces_on': 0,
+		'pos_at': {'cpp': 0, 'python': 0},
+		'steps': 0,
+		'prediction_samples': 0,
+	})
+	print('OK')
+
+	print('>>> steps solve the orbits and evaluate the forces')
+	world.integrator = 'rk4'
+	world.step(1.0)
+	one = world.stats()
+	for _ in range(9):
+		world.step(1.0)
+	stats = world.stats()
+	print(stats)
+	assert(stats['steps'] == 10)
+	assert(one['forces_on'] > 0 and stats['forces_on'] == 10*one['forces_on'])
+	# each evaluation of the planets solves the 2 orbits, and places the 3 planets
+	assert(stats['kepler']['solves'] > 0 and stats['kepler']['solves'] % 2 == 0)
+	assert(stats['pos_at'] == {'cpp': stats['kepler']['solves']//2*3, 'python': 0})
+	assert(1 <= stats['kepler']['mean_iterations'] <= stats['kepler']['max_iterations'])
+	assert(stats['kepler']['iterations'] == stats['kepler']['solves']*stats['kepler']['mean_iterations'])
+	assert(stats['kepler']['nonconverged'] == 0)
+	print('OK')
+
+	print('>>> predictions count their samples')
+	world.reset_stats()
+	out = np.empty((100, 2))
+	world.get_predictions(world.entities[0], 0.0, 100.0, 100, out=out)
+	world.get_predictions_batch(np.tile([300.0, 0.0, 0.0, 1.0], (3, 1)), 0.0, 100.0, 100)
+	stats = world.stats()
+	print(stats)
+	assert(stats['prediction_samples'] == 100 + 3*100)
+	assert(stats['forces_on'] == 100*one['forces_on'] + 3*100*one['forces_on'])
+	print('OK')
+
+	print('>>> custom orbits are counted as python positions')
+	world = make_world()
+	world.add_planet_existing(PosPlanet(maxis=10.0))
+	world.reset_stats()
+	world.time = 1.0
+	stats = world.stats()
+	print(stats)
+	assert(stats['pos_at'] == {'cpp': 3, 'python': 1})
+	print('OK')
@@ -0,0 +1,191 @@
+"""Chrome trace-event export of the frame and physics spans, to open in https://ui.perfetto.dev or chrome://tracing
+
+	tracer.start('swingbye.trace.json')
+	...
+	tracer.stop()
+
+Python code is traced with `with tracer.span('Level.run'):` or the `@tracer.traced('Level.run')` decorator, the spans
+of the physics are recorded by cphysics (see trace.hpp). Recording only appends to in-memory buffers, a background
+thread drains them into the file every `flush_interval` seconds, so that writing doesn't happen within the frames."""
+
+import atexit
+import collections
+import functools
+import json
+import logging
+import os
+import threading
+from time import perf_counter_ns
+from swingbye import cphysics
+
+_logger = logging.getLogger(__name__)
+
+
+class _Span:
+	__slots__ = ('tracer', 'name', 'args', 'start')
+
+	def __init__(self, tracer, name: str, args: dict):
+		self.tracer = tracer
+		self.name = name
+		self.args = args
+
+	def __enter__(self):
+		self.start = perf_counter_ns()
+
+	def __exit__(self, exception_type, exception_value, traceback):
+		self.tracer.record(self.name, self.start, perf_counter_ns() - self.start, self.args)
+
+
+class _NoSpan:
+	__slots__ = ()
+
+	def __enter__(self):
+		pass
+
+	def __exit__(self, exception_type, exception_value, traceback):
+		pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+class Tracer:
+
+	def __init__(self, flush_interval: float = 0.5):
+		self.flush_interval = flush_interval
+		self.enabled = False
+		self.path = None
+
+		self._events = collections.deque()  # (name, start, duration, thread, args), in ns of perf_counter_ns
+		self._local = threading.local()
+		self._file = None
+		self._writer = None
+		self._stopping = threading.Event()
+		self._tids = {}  # thread id of cphysics -> tid in the file
+		self._exit_registered = False
+
+	def start(self, path: str):
+		"""Starts recording into a new trace file at `path`"""
+		if self.enabled:
+			raise RuntimeError(f'already tracing into `{self.path}`')
+
+		self.path = path
+		self._file = open(path, 'w')
+		self._file.write('[\n')
+		self._first = True
+		self._tids.clear()
+		self._events.clear()
+		self._local = threading.local()
+
+		# both clocks are read at the same instant, the events are written relative to it
+		self._py_origin = perf_counter_ns()
+		self._cpp_origin = cphysics.trace_clock()
+		self._write_event({'name': 'process_name', 'ph': 'M', 'pid': os.getpid(), 'args': {'name': 'swingbye'}})
+
+		self._stopping.clear()
+		self.enabled = True
+		cphysics.set_tracing(True)
+		self._writer = threading.Thread(target=self._write_loop, name='trace writer', daemon=True)
+		self._writer.start()
+
+		if not self._exit_registered:
+			atexit.register(self.stop)
+			self._exit_registered = True
+		_logger.info(f'tracing into `{path}`')
+
+	def stop(self):
+		"""Stops recording, writes the remaining events and closes the file"""
+		if not self.enabled:
+			return
+		self.enabled = False
+		self._stopping.set()
+		self._writer.join()
+		cphysics.set_tracing(False)
+		self._flush()
+		self._file.write('\n]\n')
+		self._file.close()
+		self._file = None
+		self._writer = None
+		_logger.info(f'trace written to `{self.path}`')
+
+	def toggle(self, path: str):
+		if self.enabled:
+			self.stop()
+		else:
+			self.start(path)
+
+	def span(self, name: str, **args):
+		"""Context manager recording its body as a span, `args` are shown with it"""
+		if not self.enabled:
+			return _NO_SPAN
+		return _Span(self, name, args)
+
+	def traced(self, name: str):
+		"""Decorator recording the calls as spans"""
+		def decorator(func):
+			@functools.wraps(func)
+			def wrap_func(*args, **kwargs):
+				if not self.enabled:
+					return func(*args, **kwargs)
+				start = perf_counter_ns()
+				try:
+					return func(*args, **kwargs)
+				finally:
+					self.record(name, start, perf_counter_ns() - start)
+			return wrap_func
+		return decorator
+
+	def record(self, name: str, start: int, duration: int, args: dict = None):
+		self._events.append((name, start, duration, self._thread(), args))
+
+	def _thread(self) -> int:
+		"""Thread id of the calling thread, shared with the spans recorded by cphysics"""
+		try:
+			return self._local.thread
+		except AttributeError:
+			thread = cphysics.trace_thread_id()
+			self._local.thread = thread
+			self._events.append(('thread_name', None, None, thread, {'name': threading.current_thread().name}))
+			return thread
+
+	# Writer
+
+	def _write_loop(self):
+		while not self._stopping.wait(self.flush_interval):
+			self._flush()
+
+	def _flush(self):
+		pid = os.getpid()
+
+		for _ in range(len(self._events)):
+			name, start, duration, thread, args = self._events.popleft()
+			if start is None:
+				self._write_event({'name': name, 'ph': 'M', 'pid': pid, 'tid': self._tid(thread), 'args': args})
+				continue
+			event = {'name': name, 'cat': 'python', 'ph': 'X', 'ts': (start - self._py_origin) / 1e3, 'dur': duration / 1e3, 'pid': pid, 'tid': self._tid(thread)}
+			if args:
+				event['args'] = args
+			self._write_event(event)
+
+		for name, start, duration, thread, kepler_solves, kepler_duration in cphysics.drain_trace():
+			event = {'name': name, 'cat': 'cphysics', 'ph': 'X', 'ts': (start - self._cpp_origin) / 1e3, 'dur': duration / 1e3, 'pid': pid, 'tid': self._tid(thread)}
+			if kepler_solves > 0:
+				event['args'] = {'kepler_solves': kepler_solves, 'kepler_ms': kepler_duration / 1e6}
+			self._write_event(event)
+
+		self._file.flush()
+
+	def _tid(self, thread: int) -> int:
+		# the ids of cphysics are hashes, too large for the viewers
+		if thread not in self._tids:
+			self._tids[thread] = len(self._tids) + 1
+		return self._tids[thread]
+
+	def _write_event(self, event: dict):
+		if not self._first:
+			self._file.write(',\n')
+		self._first = False
+		self._file.write(json.dumps(event))
+
+
+tracer = Tracer()